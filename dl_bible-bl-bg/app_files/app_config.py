@@ -0,0 +1,35 @@
+#!/usr/bin/env python3
+"""
+options.cfg settings for the downloaders and the converter.
+
+The file is parsed on first use and kept for the rest of the process, so
+modules that import each other share one parse. Environment variables
+still take precedence; the scripts read them next to each setting.
+"""
+
+import configparser
+from pathlib import Path
+
+CONFIG_FILE = Path(__file__).resolve().parent.parent / 'options.cfg'
+
+_config = None
+
+def load_config():
+    """The parsed options.cfg (empty if it is missing or unreadable)"""
+    global _config
+    if _config is None:
+        config = configparser.ConfigParser()
+        if CONFIG_FILE.exists():
+            try:
+                config.read(str(CONFIG_FILE))
+            except configparser.ParsingError:
+                pass
+        _config = config
+    return _config
+
+def get_config_value(section, key, default):
+    config = load_config()
+    try:
+        return config.get(section, key) if config.has_section(section) else config.get('DEFAULT', key, fallback=default)
+    except configparser.Error:
+        return default
@@ -0,0 +1,199 @@
+#!/usr/bin/env python3
+"""
+Converter benchmark on a synthetic (or copied) json_bibles tree.
+
+  python3 benchmark_converter.py --languages 12 --versions 3 --runs 2 --report before.json
+  python3 benchmark_converter.py --languages 12 --versions 3 --runs 2 --compare before.json
+
+Generates a corpus with synthetic_corpus.py (or copies --corpus DIR/json_bibles)
+into a scratch directory, then runs convert_bibles_json_to_txt.main() there
+--runs times, each in a fresh interpreter. The first run converts everything;
+later runs show the cost when outputs are unchanged. For each run it records:
+
+  - wall time of main(), and total/count/max of convert_translation() and
+    process_chapter_file()
+  - input files per second
+  - peak RSS (ru_maxrss) and the RSS before main() ran
+  - read/write syscalls and bytes from /proc/self/io, block I/O and context
+    switches from getrusage
+
+--report saves the results as JSON and --compare prints the change against
+an earlier report, run by run.
+"""
+
+import argparse
+import json
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+from memory_tracking import current_rss_mb
+from synthetic_corpus import LAYOUTS, generate_corpus
+
+PROC_IO_FIELDS = ('syscr', 'syscw', 'rchar', 'wchar', 'read_bytes', 'write_bytes')
+
+# (report key, label, format) of the figures printed and compared
+FIGURES = (
+    ('wall_s', 'main()', '{:.2f}s'),
+    ('convert_translation_s', 'convert_translation()', '{:.2f}s'),
+    ('process_chapter_file_s', 'process_chapter_file()', '{:.2f}s'),
+    ('files_per_s', 'input files/s', '{:.0f}'),
+    ('peak_rss_mb', 'peak RSS', '{:.1f} MB'),
+    ('syscr', 'read syscalls', '{:,d}'),
+    ('syscw', 'write syscalls', '{:,d}'),
+    ('rchar', 'bytes read', '{:,d}'),
+    ('wchar', 'bytes written', '{:,d}'),
+)
+
+def read_proc_io():
+    """Counters of /proc/self/io, or {} where it does not exist"""
+    try:
+        with open('/proc/self/io', 'r') as f:
+            return {name: int(value) for name, value in (line.split(':') for line in f if ':' in line)}
+    except OSError:
+        return {}
+
+def timed_function(function, timings):
+    """Wrap a converter function to add its calls to timings ([count, total seconds, max seconds])"""
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return function(*args, **kwargs)
+        finally:
+            elapsed = time.perf_counter() - start
+            timings[0] += 1
+            timings[1] += elapsed
+            timings[2] = max(timings[2], elapsed)
+    return wrapper
+
+def measure(output_dir, result_file):
+    """Run the converter once in this process and write the measurements to result_file"""
+    os.environ['OUTPUT_DIR'] = output_dir
+    os.environ['METRICS_LOG'] = 'off'
+    import convert_bibles_json_to_txt as converter
+
+    timings = {}
+    for name in ('convert_translation', 'process_chapter_file'):
+        timings[name] = [0, 0.0, 0.0]
+        setattr(converter, name, timed_function(getattr(converter, name), timings[name]))
+    input_files = sum(len(files) for _, _, files in os.walk(Path(output_dir) / 'json_bibles'))
+
+    sys.argv = [converter.__file__]
+    rss_before = current_rss_mb()
+    io_before = read_proc_io()
+    usage_before = resource.getrusage(resource.RUSAGE_SELF)
+    start = time.perf_counter()
+    converter.main()
+    wall = time.perf_counter() - start
+    usage = resource.getrusage(resource.RUSAGE_SELF)
+    io_after = read_proc_io()
+
+    result = {
+        'wall_s': round(wall, 3),
+        'input_files': input_files,
+        'files_per_s': round(input_files / wall, 1) if wall else 0.0,
+        'peak_rss_mb': round(usage.ru_maxrss / 1024, 1),
+        'rss_before_main_mb': round(rss_before, 1),
+        'block_reads': usage.ru_inblock - usage_before.ru_inblock,
+        'block_writes': usage.ru_oublock - usage_before.ru_oublock,
+        'voluntary_switches': usage.ru_nvcsw - usage_before.ru_nvcsw,
+        'involuntary_switches': usage.ru_nivcsw - usage_before.ru_nivcsw,
+    }
+    for name, (count, total, longest) in timings.items():
+        result[f"{name}_calls"] = count
+        result[f"{name}_s"] = round(total, 3)
+        result[f"{name}_max_ms"] = round(longest * 1000, 2)
+    for field in PROC_IO_FIELDS:
+        if field in io_after:
+            result[field] = io_after[field] - io_before.get(field, 0)
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+
+def run_once(scratch, run):
+    """Measure one converter run in a fresh interpreter"""
+    result_file = scratch / f"run-{run}.json"
+    with open(scratch / f"run-{run}.log", 'w', encoding='utf-8') as log:
+        completed = subprocess.run([sys.executable, __file__, '--measure', str(scratch), str(result_file)],
+                                   cwd=str(Path(__file__).resolve().parent), stdout=log, stderr=subprocess.STDOUT)
+    if completed.returncode != 0 or not result_file.exists():
+        raise SystemExit(f"Converter run {run} failed, see {scratch / f'run-{run}.log'}")
+    with open(result_file, 'r', encoding='utf-8') as f:
+        return json.load(f)
+
+def print_run(run, result, previous=None):
+    print(f"\nRun {run} ({'converts everything' if run == 1 else 'outputs unchanged'}):")
+    for key, label, fmt in FIGURES:
+        if key not in result:
+            continue
+        line = f"  {label:<24} {fmt.format(result[key]):>16}"
+        calls = key[:-2] + '_calls' if key.endswith('_s') else None
+        if calls in result:
+            line += f"  ({result[calls]:,d} calls, max {result[key[:-2] + '_max_ms']:.1f} ms)"
+        if previous and previous.get(key):
+            line += f"  {(result[key] - previous[key]) * 100 / previous[key]:+.1f}%"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark convert_bibles_json_to_txt on a synthetic corpus')
+    parser.add_argument('--languages', type=int, default=4, help='Languages to generate (default: %(default)s)')
+    parser.add_argument('--versions', type=int, default=2, help='Translations per language (default: %(default)s)')
+    parser.add_argument('--books', type=int, default=66, help='Books per translation (default: %(default)s)')
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help='Layouts to cycle through (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1, help='Corpus seed (default: %(default)s)')
+    parser.add_argument('--corpus', help='Benchmark a copy of DIR/json_bibles instead of a synthetic tree')
+    parser.add_argument('--runs', type=int, default=2, help='Converter runs on the same tree (default: %(default)s)')
+    parser.add_argument('--report', help='Write the results as JSON to this file')
+    parser.add_argument('--compare', help='Earlier --report file to compare against')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directory')
+    parser.add_argument('--measure', nargs=2, metavar=('OUTPUT_DIR', 'RESULT_FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(*args.measure)
+        return
+
+    scratch = Path(tempfile.mkdtemp(prefix='bible-converter-benchmark-'))
+    try:
+        start = time.perf_counter()
+        if args.corpus:
+            shutil.copytree(Path(args.corpus) / 'json_bibles', scratch / 'json_bibles')
+            corpus = {'corpus': str(args.corpus)}
+            print(f"Copied {args.corpus}/json_bibles in {time.perf_counter() - start:.1f}s")
+        else:
+            layouts = tuple(layout.strip() for layout in args.layouts.split(',') if layout.strip())
+            written = generate_corpus(scratch, args.languages, args.versions, args.books, layouts, args.seed)
+            corpus = {'languages': args.languages, 'versions': args.versions, 'books': args.books,
+                      'layouts': list(layouts), 'seed': args.seed}
+            print(f"Generated {len(written)} translation(s), {sum(entry[3] for entry in written):,d} file(s) "
+                  f"in {time.perf_counter() - start:.1f}s")
+
+        previous_runs = []
+        if args.compare:
+            with open(args.compare, 'r', encoding='utf-8') as f:
+                previous = json.load(f)
+            previous_runs = previous.get('runs', [])
+            if previous.get('corpus') != corpus:
+                print(f"Note: {args.compare} was measured on a different corpus {previous.get('corpus')}")
+
+        runs = []
+        for run in range(1, args.runs + 1):
+            runs.append(run_once(scratch, run))
+            print_run(run, runs[-1], previous_runs[run - 1] if run <= len(previous_runs) else None)
+
+        if args.report:
+            with open(args.report, 'w', encoding='utf-8') as f:
+                json.dump({'corpus': corpus, 'python': sys.version.split()[0], 'runs': runs}, f, indent=2)
+            print(f"\nReport: {args.report}")
+    finally:
+        if args.keep:
+            print(f"Scratch directory: {scratch}")
+        else:
+            shutil.rmtree(scratch, ignore_errors=True)
+
+if __name__ == '__main__':
+    main()
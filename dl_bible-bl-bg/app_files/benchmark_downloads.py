@@ -0,0 +1,176 @@
+#!/usr/bin/env python3
+"""
+End-to-end downloader benchmark against the local stand-in upstream.
+
+Starts fake_upstream.py in-process, runs the real downloaders against it as
+subprocesses (BIBLEGATEWAY_BASE / BLUELETTER_BIBLE_BASE point at the stand-in,
+OUTPUT_DIR and METRICS_LOG at a scratch directory) and reports for each:
+
+  - chapters/s over the downloader's wall time
+  - request latency p50/p95/p99/max and retries, from its metrics log
+  - statuses as sent by the stand-in
+  - correctness: every chapter file compared verse by verse with the
+    synthetic chapter the stand-in served
+
+  python3 benchmark_downloads.py --book ruth
+  python3 benchmark_downloads.py --source blueletterbible --throttle-rate 0.1 --retry-after 1
+  python3 benchmark_downloads.py --report before.json
+
+The downloaders keep their own pacing (rate-limit sleeps, retry delays), so
+the numbers show what a change to that pacing, to retries or to concurrency
+does to a real run. Exits non-zero, keeping the scratch directory, if a
+downloader fails or any chapter is missing or wrong.
+"""
+
+import argparse
+import json
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from pathlib import Path
+
+from fake_upstream import add_fault_arguments, start_server, synthetic_chapter
+from metrics import load_events, percentile
+from version_languages import get_language_for_version
+
+APP_DIR = Path(__file__).resolve().parent
+
+SOURCES = {
+    'biblegateway': 'bible_gateway_downloader.py',
+    'blueletterbible': 'bible_blueletter_downloader.py',
+}
+
+# Canonical book order, for the chapter file names (NN-book)
+BOOK_ORDER = [
+    'genesis', 'exodus', 'leviticus', 'numbers', 'deuteronomy', 'joshua', 'judges', 'ruth',
+    '1-samuel', '2-samuel', '1-kings', '2-kings', '1-chronicles', '2-chronicles', 'ezra', 'nehemiah',
+    'esther', 'job', 'psalms', 'proverbs', 'ecclesiastes', 'song-of-solomon', 'isaiah', 'jeremiah',
+    'lamentations', 'ezekiel', 'daniel', 'hosea', 'joel', 'amos', 'obadiah', 'jonah', 'micah', 'nahum',
+    'habakkuk', 'zephaniah', 'haggai', 'zechariah', 'malachi', 'matthew', 'mark', 'luke', 'john', 'acts',
+    'romans', '1-corinthians', '2-corinthians', 'galatians', 'ephesians', 'philippians', 'colossians',
+    '1-thessalonians', '2-thessalonians', '1-timothy', '2-timothy', 'titus', 'philemon', 'hebrews', 'james',
+    '1-peter', '2-peter', '1-john', '2-john', '3-john', 'jude', 'revelation',
+]
+
+def downloader_command(source, version, book):
+    script = str(APP_DIR / SOURCES[source])
+    if source == 'biblegateway':
+        return [sys.executable, script, version, '--book', book]
+    return [sys.executable, script, '--version', version, '--book', book]
+
+def check_chapters(json_base, version, book):
+    """(ok, wrong, missing) chapter counts of a downloaded book against the synthetic pages"""
+    book_num = BOOK_ORDER.index(book) + 1
+    book_dir = Path(json_base) / get_language_for_version(version) / version / f"{version}_{book_num:02d}-{book}"
+    counts = Counter()
+    for chapter_file in sorted(book_dir.glob('*_chapter-*.json')) if book_dir.exists() else []:
+        with open(chapter_file, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+        got = [(verse['verse'], verse['text']) for verse in data['verses']]
+        counts['ok' if got == synthetic_chapter(version, book, data['chapter']) else 'wrong'] += 1
+    return counts['ok'], counts['wrong']
+
+def run_source(source, args, base, scratch):
+    """Run one downloader against the stand-in and return its report"""
+    output_dir = scratch / source
+    metrics_log = scratch / f"{source}.jsonl"
+    log_file = scratch / f"{source}.log"
+    env = dict(os.environ,
+               BIBLEGATEWAY_BASE=base, BLUELETTER_BIBLE_BASE=base,
+               OUTPUT_DIR=str(output_dir), METRICS_LOG=str(metrics_log),
+               PROMETHEUS_TEXTFILE='', STATUS_PORT='')
+
+    start = time.perf_counter()
+    with open(log_file, 'w', encoding='utf-8') as log:
+        result = subprocess.run(downloader_command(source, args.version, args.book), cwd=str(APP_DIR), env=env,
+                                stdout=log, stderr=subprocess.STDOUT, stdin=subprocess.DEVNULL)
+    wall = time.perf_counter() - start
+
+    events = load_events(metrics_log) if metrics_log.exists() else []
+    requests = [event for event in events if event.get('event') == 'request']
+    latencies = sorted(event['total_ms'] for event in requests)
+    outcomes = Counter(event.get('outcome') for event in events if event.get('event') == 'chapter')
+    ok, wrong = check_chapters(output_dir / 'json_bibles', args.version, args.book)
+    planned = sum(event['chapters'] for event in events if event.get('event') == 'plan')
+
+    return {
+        'source': source,
+        'exit_code': result.returncode,
+        'wall_s': round(wall, 2),
+        'chapters_done': outcomes['done'],
+        'chapters_failed': outcomes['failed'],
+        'chapters_per_s': round(outcomes['done'] / wall, 3) if wall else 0.0,
+        'requests': len(requests),
+        'retries': sum(1 for event in requests if event.get('attempt', 1) > 1),
+        'client_statuses': dict(Counter(str(event.get('status') or 'error') for event in requests)),
+        'latency_ms': {
+            'p50': percentile(latencies, 50), 'p95': percentile(latencies, 95),
+            'p99': percentile(latencies, 99), 'max': latencies[-1] if latencies else 0.0,
+        },
+        'correct': ok,
+        'wrong': wrong,
+        'missing': max(planned - ok - wrong, 0),
+        'log': str(log_file),
+    }
+
+def print_report(report):
+    latency = report['latency_ms']
+    statuses = ', '.join(f"{status} x{count}" for status, count in sorted(report['client_statuses'].items()))
+    print(f"\n{report['source']}:")
+    print(f"  {report['chapters_done']} chapter(s) in {report['wall_s']:.1f}s = {report['chapters_per_s']:.3f} chapters/s"
+          f" ({report['chapters_failed']} failed, exit code {report['exit_code']})")
+    print(f"  requests: {report['requests']} ({statuses or 'none'}), {report['retries']} retries")
+    print(f"  latency:  p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}  max {latency['max']:.1f} ms")
+    print(f"  correct:  {report['correct']} chapter(s), {report['wrong']} wrong, {report['missing']} missing")
+    if report['wrong'] or report['missing'] or report['exit_code']:
+        print(f"  downloader output: {report['log']}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Benchmark the downloaders against a local stand-in upstream')
+    parser.add_argument('--source', choices=sorted(SOURCES) + ['both'], default='both', help='Downloader to run (default: %(default)s)')
+    parser.add_argument('--version', default='kjv', help='Version to download (default: %(default)s)')
+    parser.add_argument('--book', default='ruth', help='Book to download (default: %(default)s)')
+    parser.add_argument('--report', help='Also write the results as JSON to this file')
+    parser.add_argument('--keep', action='store_true', help='Keep the scratch directory with the downloads, logs and metrics')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+    args.version = args.version.lower()
+    if args.book not in BOOK_ORDER:
+        parser.error(f"unknown book '{args.book}'")
+
+    server = start_server(args)
+    base = f"http://127.0.0.1:{server.server_address[1]}/"
+    scratch = Path(tempfile.mkdtemp(prefix='bible-benchmark-'))
+    print(f"Stand-in upstream on {base} (latency {args.latency}s +/- {args.jitter}s, "
+          f"429 {args.throttle_rate:.0%}, 5xx {args.error_rate:.0%}, fail first {args.fail_first})")
+
+    reports = []
+    try:
+        for source in (sorted(SOURCES) if args.source == 'both' else [args.source]):
+            print(f"Running {SOURCES[source]} {args.version} {args.book}...", flush=True)
+            reports.append(run_source(source, args, base, scratch))
+            print_report(reports[-1])
+    finally:
+        server.shutdown()
+        server.server_close()
+    print(f"\nStand-in answered: {', '.join(f'{status} x{count}' for status, count in sorted(server.state['statuses'].items()))}")
+
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump({'options': {key: value for key, value in vars(args).items() if key not in ('report', 'keep')},
+                       'results': reports}, f, indent=2)
+    failed = any(report['wrong'] or report['missing'] or report['exit_code'] for report in reports)
+    if args.keep or failed:
+        print(f"Scratch directory: {scratch}")
+    else:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if failed:
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
@@ -1,42 +1,41 @@
 #!/usr/bin/env python3
-import requests
 import json
 import os
 import sys
 import argparse
 import re
 import time
-import configparser
 from pathlib import Path
-from bs4 import BeautifulSoup
-
-def load_config():
-    config = configparser.ConfigParser()
-    base_dir = Path(__file__).parent.parent
-    config_file = base_dir / 'options.cfg'
-    if config_file.exists():
-        try:
-            config.read(str(config_file))
-        except configparser.ParsingError:
-            pass
-    return config
-
-config = load_config()
-
-def get_config_value(section, key, default):
-    try:
-        return config.get(section, key) if config.has_section(section) else config.get('DEFAULT', key, fallback=default)
-    except:
-        return default
+from urllib.parse import urlsplit
+
+from app_config import get_config_value
 
 sys.path.insert(0, str(Path(__file__).parent.parent))
 from version_languages import get_language_for_version
+from metrics import MetricsRecorder, resolve_log_path
+from live_status import open_live_status
+from download_planner import ProgressEta, missing_chapters, print_plan, throughput_path
+from profiling import add_profile_argument, attach_profiler
+from memory_tracking import add_memory_argument, attach_memory_tracker, release_tree
+from retry_policy import RetryPolicy, circuit_for, fetch_with_retry
 
 AUTO_CONVERT_TO_TXT = os.environ.get('AUTO_CONVERT_TO_TXT', get_config_value('DEFAULT', 'auto_convert_to_txt', 'true')).lower() == 'true'
 REQUEST_DELAY = int(os.environ.get('REQUEST_DELAY', get_config_value('DEFAULT', 'request_delay', '2')))
 MAX_RETRIES = int(os.environ.get('MAX_RETRIES', get_config_value('DEFAULT', 'max_retries', '3')))
+RETRY_BASE_DELAY = float(os.environ.get('RETRY_BASE_DELAY', get_config_value('DEFAULT', 'retry_base_delay', '2')))
+RETRY_MAX_DELAY = float(os.environ.get('RETRY_MAX_DELAY', get_config_value('DEFAULT', 'retry_max_delay', '60')))
+CIRCUIT_FAILURES = int(os.environ.get('CIRCUIT_FAILURES', get_config_value('DEFAULT', 'circuit_failures', '5')))
+CIRCUIT_COOLDOWN = float(os.environ.get('CIRCUIT_COOLDOWN', get_config_value('DEFAULT', 'circuit_cooldown', '30')))
 USER_AGENT = os.environ.get('USER_AGENT', get_config_value('DEFAULT', 'user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'))
 OUTPUT_DIR = os.environ.get('OUTPUT_DIR', get_config_value('DEFAULT', 'output_dir', 'bible_downloads')).strip('"').strip("'")
+METRICS_LOG = os.environ.get('METRICS_LOG', get_config_value('DEFAULT', 'metrics_log', ''))
+PROMETHEUS_TEXTFILE = os.environ.get('PROMETHEUS_TEXTFILE', get_config_value('DEFAULT', 'prometheus_textfile', ''))
+STATUS_PORT = os.environ.get('STATUS_PORT', get_config_value('DEFAULT', 'status_port', ''))
+STATUS_BIND = os.environ.get('STATUS_BIND', get_config_value('DEFAULT', 'status_bind', '127.0.0.1'))
+BLUELETTER_BIBLE_BASE = os.environ.get('BLUELETTER_BIBLE_BASE', get_config_value('DEFAULT', 'blueletterbible_base', 'https://www.blueletterbible.org/')).strip('"').strip("'").rstrip('/') + '/'
+
+metrics = MetricsRecorder('blueletterbible', resolve_log_path(METRICS_LOG, 'blueletterbible'),
+                          open_live_status('blueletterbible', PROMETHEUS_TEXTFILE, STATUS_PORT, STATUS_BIND))
 
 def resolve_output_dir(output_subpath=''):
     """Resolve output directory - absolute paths used as-is, relative paths resolved from cwd."""
@@ -125,8 +124,11 @@ TRANSLATIONS = [
     'bbe', 'cht', 'em', 'kor', 'ls', 'lut', 'rst', 'se'
 ]
 
-# Base URLs for different translation providers
-BLUELETTER_BIBLE_BASE = 'https://www.blueletterbible.org/'
+# Throughput history and progress estimates are kept per host
+BLUELETTER_BIBLE_HOST = urlsplit(BLUELETTER_BIBLE_BASE).netloc
+RETRY_POLICY = RetryPolicy(MAX_RETRIES + 1, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+metrics.add_observer(ProgressEta(BLUELETTER_BIBLE_HOST, history_file=throughput_path(metrics.log_path)))
 
 def is_blueletter_bible_translation(translation):
     """Check if translation uses Blue Letter Bible"""
@@ -183,14 +185,40 @@ TRANSLATION_LANG_MAP = {
     'kor': 'korean', 'ls': 'french', 'lut': 'german', 'rst': 'russian', 'se': 'swedish',
 }
 
-def convert_book_to_txt(book_dir, translation, book_name, book_num):
-    """Convert a book's JSON files to a single TXT file"""
+def chapter_number_from_filename(filename):
+    """Extract the chapter number from a name like 'kjv_01-genesis_chapter-03.json'"""
+    match = re.search(r'_chapter-(\d+)\.json$', filename)
+    return int(match.group(1)) if match else None
+
+def compact_verses(verses):
+    """Reduce a chapter's verse dicts to (verse, text) tuples for in-memory conversion"""
+    return tuple((verse_data['verse'], verse_data['text']) for verse_data in verses)
+
+def convert_book_to_txt(book_dir, translation, book_name, book_num, book_chapters=None):
+    """Convert a book to a single TXT file.
+
+    book_chapters maps chapter numbers to the (verse, text) tuples fetched in
+    this run. Only chapters missing from it (e.g. when resuming a partially
+    downloaded book) are read back from the JSON files in book_dir.
+    """
     book_dir = Path(book_dir)
     if not AUTO_CONVERT_TO_TXT:
         return
+    from precompress import precompress_file
+    from chapter_index import write_chapter_index
+    from strongs import StrongsConcordance, extract_strongs, merge_book_concordance
+    from txt_corpus import verse_key
     
-    chapter_files = sorted([f for f in os.listdir(book_dir) if f.endswith('.json')])
-    if not chapter_files:
+    chapters = dict(book_chapters or {})
+    if book_dir.exists():
+        for chapter_file in os.listdir(book_dir):
+            chapter = chapter_number_from_filename(chapter_file)
+            if chapter is None or chapter in chapters:
+                continue
+            with open(book_dir / chapter_file, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            chapters[data['chapter']] = compact_verses(data['verses'])
+    if not chapters:
         return
     
     lang = get_language_for_version(translation)
@@ -198,23 +226,26 @@ def convert_book_to_txt(book_dir, translation, book_name, book_num):
     txt_bibles_dir.mkdir(parents=True, exist_ok=True)
     
     output_file = txt_bibles_dir / f"{book_num:02d}-{book_name}-{translation}.txt"
+    book_display = BOOK_NAME_MAP.get(book_name, book_name.title())
     
     all_lines = []
-    for chapter_file in chapter_files:
-        chapter_path = book_dir / chapter_file
-        with open(chapter_path, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-        
-        chapter = data['chapter']
-        book_display = BOOK_NAME_MAP.get(book_name, book_name.title())
-        
-        for verse_data in data['verses']:
-            verse = verse_data['verse']
-            text = clean_verse_text(verse_data['text'])
-            all_lines.append(f"{book_display} {chapter}:{verse} {text}")
+    concordance = StrongsConcordance()
+    with metrics.profiled('normalise'):
+        for chapter in sorted(chapters):
+            for verse, text in chapters[chapter]:
+                # Keep the Strong's tags before clean_verse_text drops them
+                text, tags = extract_strongs(text)
+                concordance.add(verse_key(book_num, chapter, verse), tags)
+                all_lines.append(f"{book_display} {chapter}:{verse} {clean_verse_text(text)}")
     
-    with open(output_file, 'w', encoding='utf-8') as f:
-        f.write('\n'.join(all_lines) + '\n')
+    with metrics.timed('write', 'write_ms', path=str(output_file)) as written:
+        with open(output_file, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(all_lines) + '\n')
+        written['bytes'] = output_file.stat().st_size
+    with metrics.timed('phase', 'ms', name='precompress'):
+        precompress_file(output_file)
+    write_chapter_index(output_file)
+    merge_book_concordance(txt_bibles_dir, translation, book_num, concordance)
     
     print(f"    -> Created TXT: {output_file.name}")
 
@@ -250,107 +281,97 @@ def get_blueletter_bible_abbrev(book_name, translation):
     }
     return abbrev_map.get(book_name, book_name)
 
+def parse_chapter_page(html, book, chapter, translation, book_abbrev):
+    """Verses of a Blue Letter Bible chapter page; the parse tree is released before returning"""
+    from bs4 import BeautifulSoup
+    verses = []
+    soup = BeautifulSoup(html, 'html.parser')
+    try:
+        verse_link = re.compile(rf'/{translation}/{book_abbrev}/{chapter}/(\d+)')
+
+        def verse_number(container):
+            """The verse a container holds, from its verse link or else its data-bible-id"""
+            link = container.find('a', href=verse_link)
+            if link:
+                return int(verse_link.search(link['href']).group(1))
+            # data-bible-id ends with the verse: "001003" (chapter 1, verse 3) or "Gen.1.3"
+            numbers = re.findall(r'\d+', container.get('data-bible-id', ''))
+            if not numbers:
+                return None
+            return int(numbers[-1][-3:] if len(numbers) == 1 else numbers[-1])
+
+        # Find unique verse divs with data-bible-id, numbered as the page numbers them
+        # so an omitted verse leaves a gap instead of shifting every later verse
+        verse_containers = {}
+        for container in soup.find_all('div', attrs={'data-bible-id': True}):
+            number = verse_number(container)
+            if number and number not in verse_containers:
+                verse_containers[number] = container
+
+        # If no data-bible-id divs, try alternative approach
+        if not verse_containers:
+            for link in soup.find_all('a', href=verse_link):
+                number = int(verse_link.search(link['href']).group(1))
+                if number not in verse_containers:
+                    parent = link.find_parent(['div', 'p', 'span'])
+                    if parent:
+                        verse_containers[number] = parent
+
+        for verse_num, container in sorted(verse_containers.items()):
+            # Extract text content
+            verse_text = container.get_text(separator=' ', strip=True)
+
+            # If container doesn't have meaningful text, try parent
+            if len(verse_text) < 10:
+                parent = container.find_parent(['div', 'p', 'span'])
+                if parent:
+                    verse_text = parent.get_text(separator=' ', strip=True)
+
+            # Clean up verse references and extra whitespace
+            text_content = re.sub(r'^[A-Za-z]+\s+\d+:\d+\s*[-—]\s*', '', verse_text)
+            text_content = re.sub(r'^\d+\.?\s*', '', text_content)
+            text_content = re.sub(r'\s+\[fn\]\s+', ' ', text_content)
+            # Fix broken LORD formatting
+            text_content = re.sub(r'\bL\s+ORD\b', 'LORD', text_content)
+            text_content = re.sub(r'\s+', ' ', text_content).strip()
+            text_content = text_content.strip()
+
+            if text_content and len(text_content) > 1:
+                verses.append({
+                    'verse': verse_num,
+                    'text': text_content
+                })
+    finally:
+        release_tree(soup)
+    return verses
+
 def get_blueletter_bible_verses(book, chapter, translation):
-    """Get verses from Blue Letter Bible for any translation with retry logic"""
-    max_retries = 3
-    retry_delay = 5
+    """Get verses from Blue Letter Bible for any translation under the shared retry policy ([] on failure)"""
+    import requests
+    book_abbrev = get_blueletter_bible_abbrev(book, translation)
+    url = f"{BLUELETTER_BIBLE_BASE}{translation}/{book_abbrev}/{chapter}/1/"
     
-    for attempt in range(max_retries):
-        verses = []
-        book_abbrev = get_blueletter_bible_abbrev(book, translation)
-        url = f"{BLUELETTER_BIBLE_BASE}{translation}/{book_abbrev}/{chapter}/1/"
-        
-        headers = {
-            'User-Agent': USER_AGENT
-        }
-        
-        try:
-            response = requests.get(url, headers=headers, timeout=15)
-            response.raise_for_status()
-            
-            # Parse HTML 
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find unique verse divs with data-bible-id
-            verse_containers = []
-            verse_divs = soup.find_all('div', attrs={'data-bible-id': True})
-            verse_containers.extend(verse_divs)
-            
-            # If no data-bible-id divs, try alternative approach
-            if not verse_containers:
-                verse_links = soup.find_all('a', href=re.compile(rf'/{translation}/{book_abbrev}/{chapter}/\d+/'))
-                seen_verse_nums = set()
-                
-                for link in verse_links:
-                    verse_match = re.search(rf'/{translation}/{book_abbrev}/{chapter}/(\d+)', link.get('href', ''))
-                    if verse_match:
-                        verse_num_in_link = int(verse_match.group(1))
-                        if verse_num_in_link not in seen_verse_nums:
-                            seen_verse_nums.add(verse_num_in_link)
-                            parent = link.find_parent(['div', 'p', 'span'])
-                            if parent:
-                                verse_containers.append(parent)
-            
-            # Sort verse containers by their verse number
-            def sort_key(container):
-                verse_id = container.get('data-bible-id', '')
-                if verse_id:
-                    match = re.search(r'(\d+)$', verse_id)
-                    if match:
-                        return int(match.group(1))
-                return 0
-            
-            verse_containers.sort(key=sort_key)
-            
-            verse_num = 1
-            
-            for container in verse_containers:
-                # Use simple sequential verse numbering instead of complex data-bible-id
-                # This ensures verses are numbered 1, 2, 3, etc. regardless of the data-bible-id
-                
-                # Extract text content
-                verse_text = container.get_text(separator=' ', strip=True)
-                
-                # If container doesn't have meaningful text, try parent
-                if len(verse_text) < 10:
-                    parent = container.find_parent(['div', 'p', 'span'])
-                    if parent:
-                        verse_text = parent.get_text(separator=' ', strip=True)
-                
-                # Clean up verse references and extra whitespace
-                text_content = re.sub(r'^[A-Za-z]+\s+\d+:\d+\s*[-—]\s*', '', verse_text)
-                text_content = re.sub(r'^\d+\.?\s*', '', text_content)
-                text_content = re.sub(r'\s+\[fn\]\s+', ' ', text_content)
-                # Fix broken LORD formatting
-                text_content = re.sub(r'\bL\s+ORD\b', 'LORD', text_content)
-                text_content = re.sub(r'\s+', ' ', text_content).strip()
-                text_content = text_content.strip()
-                
-                if text_content and len(text_content) > 1:
-                    verses.append({
-                        'verse': verse_num,
-                        'text': text_content
-                    })
-                    verse_num += 1
-                    
-            print(f"Extracted {len(verses)} {translation.upper()} verses for {book} {chapter}")
-            
-            # Success! Return the verses
-            time.sleep(1)  # Rate limiting for BLB
-            return verses
-                
-        except Exception as e:
-            print(f"Error fetching {translation.upper()} chapter {book} {chapter} (attempt {attempt + 1}/{max_retries}): {e}")
-            
-            if attempt < max_retries - 1:
-                print(f"Retrying in {retry_delay} seconds...")
-                time.sleep(retry_delay)
-                retry_delay *= 2  # Double the delay for next retry (5, 10, 20 seconds)
-            else:
-                print(f"Failed to fetch {translation.upper()} chapter {book} {chapter} after {max_retries} attempts")
-                print(f"Moving to next chapter...")
-                time.sleep(1)  # Rate limiting even for failures
-                return []  # Return empty list to continue with next chapter
+    headers = {
+        'User-Agent': USER_AGENT
+    }
+    
+    def parse(response):
+        with metrics.timed('parse', 'parse_ms', version=translation, book=book, chapter=chapter) as parsed:
+            verses = parse_chapter_page(response.text, book, chapter, translation, book_abbrev)
+            parsed['verses'] = len(verses)
+        return verses
+    
+    outcome, verses = fetch_with_retry(metrics, requests, url, parse, RETRY_POLICY,
+                                       circuit_for(BLUELETTER_BIBLE_HOST, CIRCUIT_FAILURES, CIRCUIT_COOLDOWN),
+                                       f"{translation.upper()} {book} {chapter}", headers=headers, timeout=15)
+    if outcome == 'ok':
+        print(f"Extracted {len(verses)} {translation.upper()} verses for {book} {chapter}")
+    else:
+        print(f"Failed to fetch {translation.upper()} chapter {book} {chapter}")
+        print(f"Moving to next chapter...")
+    
+    metrics.sleep(1, 'rate_limit')  # Rate limiting for BLB, even for failures
+    return verses or []
 
 def resolve_translation(input_val):
     """Resolve version input (number or shortcode) to shortcode"""
@@ -375,6 +396,28 @@ def resolve_translations_list(input_str):
             result.append(resolved)
     return result
 
+def planned_books(translation, target_books=None):
+    """Books to process for a translation: WLC only has the Old Testament, MGNT only the New"""
+    return [
+        book_name for book_name in BIBLE_BOOKS
+        if (not target_books or book_name in target_books)
+        and not (translation == 'wlc' and not is_old_testament_book(book_name))
+        and not (translation == 'mgnt' and is_old_testament_book(book_name))
+    ]
+
+def plan_downloads(target_versions, target_books=None, target_chapter=None):
+    """Print the chapters still missing on disk, the request count and the expected duration"""
+    base_dir = resolve_output_dir('json_bibles')
+    book_order = list(BIBLE_BOOKS.keys())
+    plans = []
+    for translation in target_versions:
+        books = [(book_order.index(book_name) + 1, book_name, BIBLE_BOOKS[book_name])
+                 for book_name in planned_books(translation, target_books)]
+        missing = missing_chapters(str(base_dir), get_language_for_version(translation), translation, books, target_chapter)
+        planned = len(books) if target_chapter else sum(count for _, _, count in books)
+        plans.append((translation, planned, len(missing), ''))
+    return print_plan('Blue Letter Bible', BLUELETTER_BIBLE_HOST, plans)
+
 def interactive_prompt():
     """Interactive menu for user selection"""
     print("\n" + "="*60)
@@ -395,7 +438,8 @@ def interactive_prompt():
         choice = input("\nEnter your choice (1-8): ").strip()
         
         if choice == '1':
-            print("\n⚠️  This will download all translations (35 total) of the entire Bible - this may take many hours!")
+            print(f"\n⚠️  This will download all translations ({len(TRANSLATIONS)} total) of the entire Bible")
+            plan_downloads(TRANSLATIONS)
             confirm = input("Are you absolutely sure you want to continue? (y/N): ").strip().lower()
             if confirm in ['y', 'yes']:
                 return TRANSLATIONS, list(BIBLE_BOOKS.keys()), None
@@ -409,7 +453,8 @@ def interactive_prompt():
             translation = input("\nEnter translation code or number (e.g., KJV, NIV, or 4): ").strip().lower()
             translation = resolve_translation(translation)
             if translation:
-                print(f"\n⚠️  This will download all books from {translation.upper()} - this may take a while!")
+                print(f"\n⚠️  This will download all books from {translation.upper()}")
+                plan_downloads([translation])
                 confirm = input("Are you sure you want to continue? (y/N): ").strip().lower()
                 if confirm in ['y', 'yes']:
                     return [translation], list(BIBLE_BOOKS.keys()), None
@@ -431,6 +476,7 @@ def interactive_prompt():
                 continue
             
             print(f"\n⚠️  This will download all books from {len(valid_translations)} translations: {', '.join([t.upper() for t in valid_translations])}")
+            plan_downloads(valid_translations)
             confirm = input("Are you sure you want to continue? (y/N): ").strip().lower()
             if confirm in ['y', 'yes']:
                 return valid_translations, list(BIBLE_BOOKS.keys()), None
@@ -500,6 +546,10 @@ def create_bible_structure(target_versions=None, target_books=None, target_chapt
         translation_dir.mkdir(parents=True, exist_ok=True)
         print(f"Created directory: {translation_dir}")
         
+        books = planned_books(translation, target_books)
+        metrics.event('plan', version=translation,
+                      chapters=len(books) if target_chapter else sum(BIBLE_BOOKS[book_name] for book_name in books))
+        
         for book_index, book_name in enumerate(book_order, 1):
             # Skip book if not in target books
             if target_books and book_name not in target_books:
@@ -528,6 +578,9 @@ def create_bible_structure(target_versions=None, target_books=None, target_chapt
             start_chapter = target_chapter if target_chapter else 1
             end_chapter = target_chapter if target_chapter else chapter_count
             
+            # Verses fetched in this run, kept for the TXT conversion below
+            book_chapters = {}
+            
             for chapter in range(start_chapter, end_chapter + 1):
                 # Format: wlc_01-genesis_chapter-01.json
                 chapter_file = book_dir / f"{translation}_{book_number}-{book_name}_chapter-{chapter:02d}.json"
@@ -535,6 +588,7 @@ def create_bible_structure(target_versions=None, target_books=None, target_chapt
                 # Skip if already exists
                 if chapter_file.exists():
                     print(f"  Skipping {book_name} chapter {chapter} (already exists)")
+                    metrics.event('chapter', version=translation, book=book_name, chapter=chapter, outcome='skipped')
                     continue
                 
                 # Get all verses in this chapter
@@ -548,26 +602,35 @@ def create_bible_structure(target_versions=None, target_books=None, target_chapt
                         'verses': verses
                     }
                     
-                    with open(chapter_file, 'w', encoding='utf-8') as f:
-                        json.dump(chapter_data, f, indent=2, ensure_ascii=False)
+                    with metrics.timed('write', 'write_ms', path=str(chapter_file)) as written:
+                        with open(chapter_file, 'w', encoding='utf-8') as f:
+                            json.dump(chapter_data, f, indent=2, ensure_ascii=False)
+                        written['bytes'] = chapter_file.stat().st_size
+                    book_chapters[chapter] = compact_verses(verses)
+                    metrics.event('chapter', version=translation, book=book_name, chapter=chapter, outcome='done')
                     
                     print(f"  Created {book_name} chapter {chapter} with {len(verses)} verses")
                 else:
+                    metrics.event('chapter', version=translation, book=book_name, chapter=chapter, outcome='failed')
                     print(f"  Failed to fetch {book_name} chapter {chapter}")
                 
                 # Rate limiting to avoid overwhelming the API
                 if translation == 'wlc':
-                    time.sleep(2)  # Longer delay for BLB
+                    metrics.sleep(2, 'rate_limit')  # Longer delay for BLB
                 else:
-                    time.sleep(1)
+                    metrics.sleep(1, 'rate_limit')
             
             # Convert book to TXT after all chapters are downloaded
             print(f"  Converting {book_name} to TXT...")
-            convert_book_to_txt(book_dir, translation, book_name, int(book_number))
+            with metrics.profiled('convert'):
+                convert_book_to_txt(book_dir, translation, book_name, int(book_number), book_chapters)
+        
+        metrics.event('version_done', version=translation)
 
 def create_summary_file():
     """Create a summary file with statistics"""
-    base_dir = Path('bible')
+    base_dir = resolve_output_dir('json_bibles')
+    base_dir.mkdir(parents=True, exist_ok=True)
     summary = {
         'translations': TRANSLATIONS,
         'books': len(BIBLE_BOOKS),
@@ -578,7 +641,6 @@ def create_summary_file():
     summary_file = base_dir / 'summary.json'
     with open(summary_file, 'w', encoding='utf-8') as f:
         json.dump(summary, f, indent=2)
-        json.dump(summary, f, indent=2)
 
 def main():
     parser = argparse.ArgumentParser(description='Download Bible from Blue Letter Bible')
@@ -587,6 +649,9 @@ def main():
     parser.add_argument('--chapter', '-c', type=int, help='Specific chapter to download (default: all)')
     parser.add_argument('--list-versions', '-l', action='store_true', help='List available versions')
     parser.add_argument('--list-books', action='store_true', help='List available books')
+    parser.add_argument('--dry-run', action='store_true', help='Show the chapters still missing, request count and expected duration without downloading')
+    add_profile_argument(parser)
+    add_memory_argument(parser)
     
     args = parser.parse_args()
     
@@ -603,31 +668,8 @@ def main():
             print(f"  {book}")
         return
     
-    # Handle list commands
     if len(sys.argv) > 1:
         # Use command line mode
-        parser = argparse.ArgumentParser(description='Download Bible from Blue Letter Bible')
-        parser.add_argument('--version', '-v', help='Specific version to download (default: all)')
-        parser.add_argument('--book', '-b', help='Specific book to download (default: all)')
-        parser.add_argument('--chapter', '-c', type=int, help='Specific chapter to download (default: all)')
-        parser.add_argument('--list-versions', '-l', action='store_true', help='List available versions')
-        parser.add_argument('--list-books', action='store_true', help='List available books')
-        
-        args = parser.parse_args()
-        
-        # Handle list commands
-        if args.list_versions:
-            print("Available versions:")
-            for version in sorted(TRANSLATIONS):
-                print(f"  {version}")
-            return
-        
-        if args.list_books:
-            print("Available books:")
-            for book in sorted(BIBLE_BOOKS.keys()):
-                print(f"  {book}")
-            return
-        
         # Determine what to download from command line args
         target_versions = [args.version] if args.version else TRANSLATIONS
         target_books = [args.book] if args.book else list(BIBLE_BOOKS.keys())
@@ -643,6 +685,13 @@ def main():
     if target_versions is None:
         return
 
+    if args.dry_run:
+        plan_downloads(target_versions, target_books, target_chapter)
+        return
+
+    attach_profiler(metrics, args.profile)
+    attach_memory_tracker(metrics, args.memory)
+
     print(f"📥 Downloading: {len(target_versions)} version(s), {len(target_books)} book(s)")
     if target_chapter:
         print(f"   Chapter: {target_chapter}")
@@ -4,41 +4,29 @@ Bible Gateway Downloader
 Downloads all verses from all chapters from all books for each Bible version from BibleGateway
 """
 
-import requests
 import json
 import os
 import sys
-import time
 import re
-import configparser
-from bs4 import BeautifulSoup
-from urllib.parse import quote
+from urllib.parse import quote, urlsplit
 from pathlib import Path
 
-def load_config():
-    config = configparser.ConfigParser()
-    base_dir = Path(__file__).parent.parent
-    config_file = base_dir / 'options.cfg'
-    if config_file.exists():
-        try:
-            config.read(str(config_file))
-        except configparser.ParsingError:
-            pass
-    return config
-
-config = load_config()
-
-def get_config_value(section, key, default):
-    try:
-        return config.get(section, key) if config.has_section(section) else config.get('DEFAULT', key, fallback=default)
-    except:
-        return default
+from app_config import get_config_value
 
 AUTO_CONVERT_TO_TXT = os.environ.get('AUTO_CONVERT_TO_TXT', get_config_value('DEFAULT', 'auto_convert_to_txt', 'true')).lower() == 'true'
 REQUEST_DELAY = int(os.environ.get('REQUEST_DELAY', get_config_value('DEFAULT', 'request_delay', '2')))
 MAX_RETRIES = int(os.environ.get('MAX_RETRIES', get_config_value('DEFAULT', 'max_retries', '3')))
+RETRY_BASE_DELAY = float(os.environ.get('RETRY_BASE_DELAY', get_config_value('DEFAULT', 'retry_base_delay', '2')))
+RETRY_MAX_DELAY = float(os.environ.get('RETRY_MAX_DELAY', get_config_value('DEFAULT', 'retry_max_delay', '60')))
+CIRCUIT_FAILURES = int(os.environ.get('CIRCUIT_FAILURES', get_config_value('DEFAULT', 'circuit_failures', '5')))
+CIRCUIT_COOLDOWN = float(os.environ.get('CIRCUIT_COOLDOWN', get_config_value('DEFAULT', 'circuit_cooldown', '30')))
 USER_AGENT = os.environ.get('USER_AGENT', get_config_value('DEFAULT', 'user_agent', 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'))
 OUTPUT_DIR = os.environ.get('OUTPUT_DIR', get_config_value('DEFAULT', 'output_dir', 'bible_downloads')).strip('"').strip("'")
+METRICS_LOG = os.environ.get('METRICS_LOG', get_config_value('DEFAULT', 'metrics_log', ''))
+PROMETHEUS_TEXTFILE = os.environ.get('PROMETHEUS_TEXTFILE', get_config_value('DEFAULT', 'prometheus_textfile', ''))
+STATUS_PORT = os.environ.get('STATUS_PORT', get_config_value('DEFAULT', 'status_port', ''))
+STATUS_BIND = os.environ.get('STATUS_BIND', get_config_value('DEFAULT', 'status_bind', '127.0.0.1'))
+BIBLEGATEWAY_BASE = os.environ.get('BIBLEGATEWAY_BASE', get_config_value('DEFAULT', 'biblegateway_base', 'https://www.biblegateway.com/')).strip('"').strip("'").rstrip('/') + '/'
 
 def resolve_output_dir(output_subpath=''):
     """Resolve output directory - absolute paths used as-is, relative paths resolved from cwd."""
@@ -53,6 +41,19 @@ def resolve_output_dir(output_subpath=''):
 base_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(base_dir))
 from version_languages import get_language_for_version
+from metrics import MetricsRecorder, resolve_log_path
+from live_status import open_live_status
+from download_planner import ProgressEta, chapter_file_path, missing_chapters, print_plan, testaments_on_disk, throughput_path
+from profiling import add_profile_argument, attach_profiler
+from memory_tracking import add_memory_argument, attach_memory_tracker, release_tree
+from retry_policy import RetryPolicy, circuit_for, fetch_with_retry
+
+BIBLEGATEWAY_HOST = urlsplit(BIBLEGATEWAY_BASE).netloc
+RETRY_POLICY = RetryPolicy(MAX_RETRIES + 1, RETRY_BASE_DELAY, RETRY_MAX_DELAY)
+
+metrics = MetricsRecorder('biblegateway', resolve_log_path(METRICS_LOG, 'biblegateway'),
+                          open_live_status('biblegateway', PROMETHEUS_TEXTFILE, STATUS_PORT, STATUS_BIND))
+metrics.add_observer(ProgressEta(BIBLEGATEWAY_HOST, history_file=throughput_path(metrics.log_path)))
 
 BOOK_NAME_MAP = {
     'genesis': 'Genesis', 'exodus': 'Exodus', 'leviticus': 'Leviticus', 'numbers': 'Numbers',
@@ -95,6 +96,15 @@ BIBLE_BOOKS = {
     "1-john": 5, "2-john": 1, "3-john": 1, "jude": 1, "revelation": 22
 }
 
+def chapter_number_from_filename(filename):
+    """Extract the chapter number from a name like 'esv_01-genesis_chapter-03.json'"""
+    match = re.search(r'_chapter-(\d+)\.json$', filename)
+    return int(match.group(1)) if match else None
+
+def compact_verses(verses):
+    """Reduce a chapter's verse dicts to (verse, text) tuples for in-memory conversion"""
+    return tuple((verse_data["verse"], verse_data["text"]) for verse_data in verses)
+
 class BibleGatewayDownloader:
     def __init__(self, versions_file="biblegateway-versions-available.txt", output_dir=None):
         self.versions_file = versions_file
@@ -102,10 +112,18 @@ class BibleGatewayDownloader:
             self.output_dir = str(resolve_output_dir('json_bibles'))
         else:
             self.output_dir = str(Path(output_dir) if os.path.isabs(output_dir) else Path.cwd() / output_dir / 'json_bibles')
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': USER_AGENT
-        })
+        self._session = None
+
+    @property
+    def session(self):
+        """HTTP session, created on the first request so listing and planning never import requests"""
+        if self._session is None:
+            import requests
+            self._session = requests.Session()
+            self._session.headers.update({
+                'User-Agent': USER_AGENT
+            })
+        return self._session
         
     def load_versions(self):
         """Load Bible versions from the versions file"""
@@ -132,61 +150,58 @@ class BibleGatewayDownloader:
         """Construct BibleGateway URL for specific book, chapter, and version"""
         # Format book name for URL (replace hyphens with spaces, then URL encode)
         book_formatted = book.replace('-', ' ')
-        url = f"https://www.biblegateway.com/passage/?search={quote(book_formatted)}+{chapter}&version={version.upper()}"
+        url = f"{BIBLEGATEWAY_BASE}passage/?search={quote(book_formatted)}+{chapter}&version={version.upper()}"
         return url
     
-    def get_chapter_verses(self, book, chapter, version, max_retries=5):
-        """Download verses for a specific chapter from BibleGateway"""
-        retry_count = 0
-        
-        while retry_count < max_retries:
-            try:
-                # Construct the URL correctly - use spaces, not plus signs
-                book_formatted = book.replace('-', ' ').title()  # "1-samuel" -> "1 Samuel"
-                url = f"https://www.biblegateway.com/passage/?search={quote(book_formatted)}+{chapter}&version={version.upper()}"
-                
-                if retry_count == 0:
-                    print(f"Downloading: {book.title()} {chapter}:{version.upper()}")
-                else:
-                    print(f"Retry {retry_count} for: {book.title()} {chapter}:{version.upper()}")
-                
-                response = self.session.get(url, timeout=30)
-                response.raise_for_status()
-                
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                # Use the improved parsing method
-                verses = self._parse_verses_new_method(soup, book, chapter, version)
-                
-                if verses:
-                    print(f"✓ Successfully downloaded {book.title()} {chapter}:{version.upper()} ({len(verses)} verses)")
-                    return verses
-                else:
-                    print(f"✗ No verses found for {book.title()} {chapter}:{version.upper()}")
+    def fetch_chapter(self, book, chapter, version, attempts=None, empty='retry'):
+        """Download one chapter under the retry policy; returns (outcome, verses).
 
-            except requests.RequestException as e:
-                print(f"Error downloading {book.title()} {chapter}:{version.upper()} - {e}")
-            except Exception as e:
-                print(f"Error parsing {book.title()} {chapter}:{version.upper()} - {e}")
+        outcome is 'ok', 'missing' (the version lacks the chapter), 'empty'
+        (every attempt got a page without verses) or 'failed' (transport errors).
+        empty='missing' treats a page without verses as missing rather than
+        retrying it, for probes of books a version may not have.
+        """
+        # Construct the URL correctly - use spaces, not plus signs
+        book_formatted = book.replace('-', ' ').title()  # "1-samuel" -> "1 Samuel"
+        url = f"{BIBLEGATEWAY_BASE}passage/?search={quote(book_formatted)}+{chapter}&version={version.upper()}"
+        label = f"{book.title()} {chapter}:{version.upper()}"
+        print(f"Downloading: {label}")
 
-            # If we get here, the download failed - retry after delay
-            retry_count += 1
-            if retry_count < max_retries:
-                print(f"Waiting 3 seconds before retry...")
-                time.sleep(3)
-        
-        print(f"✗ FAILED: Could not download {book.title()} {chapter}:{version.upper()} after {retry_count} attempts")
-        return []
+        def parse(response):
+            with metrics.timed('parse', 'parse_ms', version=version.lower(), book=book, chapter=chapter) as parsed:
+                verses = self.parse_chapter_page(response.text, book, chapter, version)
+                parsed['verses'] = len(verses)
+            return verses
+
+        outcome, verses = fetch_with_retry(metrics, self.session, url, parse, RETRY_POLICY,
+                                           circuit_for(BIBLEGATEWAY_HOST, CIRCUIT_FAILURES, CIRCUIT_COOLDOWN),
+                                           label, attempts=attempts, empty=empty, timeout=30)
+        if outcome == 'ok':
+            print(f"✓ Successfully downloaded {label} ({len(verses)} verses)")
+        elif outcome in ('missing', 'empty'):
+            print(f"✗ {label} is not available")
+        else:
+            print(f"✗ FAILED: Could not download {label}")
+        return outcome, verses or []
+
+    def get_chapter_verses(self, book, chapter, version, attempts=None):
+        """Download verses for a specific chapter from BibleGateway ([] if it could not be downloaded)"""
+        return self.fetch_chapter(book, chapter, version, attempts)[1]
 
     def detect_version_books(self, version):
         """Detect whether a version has OT, NT, or both by testing Genesis and Matthew"""
         print(f"  Detecting available books for {version.upper()}...")
         
-        has_genesis = bool(self.get_chapter_verses("genesis", 1, version, max_retries=2))
+        genesis, _ = self.fetch_chapter("genesis", 1, version, empty='missing')
         
-        has_matthew = bool(self.get_chapter_verses("matthew", 1, version, max_retries=2))
+        matthew, _ = self.fetch_chapter("matthew", 1, version, empty='missing')
         
-        if has_genesis and has_matthew:
+        has_genesis, has_matthew = genesis == 'ok', matthew == 'ok'
+        if 'failed' in (genesis, matthew):
+            # An unanswered probe says nothing about the version; don't drop a testament over it
+            print(f"  -> Warning: Could not reach {BIBLEGATEWAY_HOST} to detect books, defaulting to full Bible")
+            return 'all'
+        elif has_genesis and has_matthew:
             print(f"  -> Detected: Full Bible (66 books)")
             return 'all'
         elif has_genesis and not has_matthew:
@@ -199,12 +214,49 @@ class BibleGatewayDownloader:
             print(f"  -> Warning: Could not detect any books, defaulting to full Bible")
             return 'all'
     
+    def chapter_exists(self, book, chapter, version):
+        """Whether a chapter was saved by an earlier run"""
+        lang = get_language_for_version(version)
+        return os.path.exists(chapter_file_path(self.output_dir, lang, version.lower(), self.get_book_number(book), book, chapter))
+    
+    def plan(self, versions, book=None):
+        """Print the chapters still missing for versions (or one book of them) and the expected duration"""
+        plans = []
+        for version in versions:
+            version = version.lower()
+            lang = get_language_for_version(version)
+            note = ''
+            if book:
+                books = [book]
+            else:
+                # Testaments are probed at download time; assume what is on disk says
+                book_type = testaments_on_disk(self.output_dir, lang, version) or 'all'
+                books_order = list(BIBLE_BOOKS.keys())
+                books = books_order[books_order.index(self.get_starting_book(book_type)):]
+                if book_type == 'ot':
+                    books = books[:books_order.index('malachi') + 1]
+                note = f"({book_type.upper()} assumed)"
+            book_table = [(self.get_book_number(name), name, BIBLE_BOOKS[name]) for name in books]
+            missing = missing_chapters(self.output_dir, lang, version, book_table)
+            plans.append((version, sum(count for _, _, count in book_table), len(missing), note))
+        # download_version probes Genesis 1 and Matthew 1 of each version first
+        return print_plan('Bible Gateway', BIBLEGATEWAY_HOST, plans, extra_requests=0 if book else 2 * len(versions))
+    
     def get_starting_book(self, book_type):
         """Get the starting book based on book type"""
         if book_type == 'nt':
             return 'matthew'
         return 'genesis'
     
+    def parse_chapter_page(self, html, book, chapter, version):
+        """Verses of a passage page; the parse tree is released before returning"""
+        from bs4 import BeautifulSoup
+        soup = BeautifulSoup(html, 'html.parser')
+        try:
+            return self._parse_verses_new_method(soup, book, chapter, version)
+        finally:
+            release_tree(soup)
+
     def _parse_verses_new_method(self, soup, book, chapter, version):
         """Improved parsing method that targets specific passage content area"""
         verses = []
@@ -259,8 +311,23 @@ class BibleGatewayDownloader:
                     if verse_number:
                         heading_map[verse_number] = heading_text
 
+            # Cross-reference targets and footnote texts are listed after the passage;
+            # the <sup> markers inside each verse point at them by id
+            crossref_targets = {}
+            for item in soup.select('.crossrefs li[id]'):
+                link = item.find('a', attrs={'data-bibleref': True})
+                if link:
+                    crossref_targets[item['id']] = [ref for ref in link['data-bibleref'].split(',') if ref]
+            footnote_texts = {}
+            for item in soup.select('.footnotes li[id]'):
+                note = item.find(class_='footnote-text')
+                if note:
+                    footnote_texts[item['id']] = re.sub(r'\s+', ' ', note.get_text()).strip()
+
             # Group spans by verse number to handle poetry books where content is split
             verse_groups = {}
+            verse_crossrefs = {}
+            verse_footnotes = {}
 
             for verse_span in verse_spans:
                 # Extract verse number from class attribute
@@ -292,12 +359,17 @@ class BibleGatewayDownloader:
                 if chapter_num_span:
                     chapter_num_span.decompose()
 
-                # Remove cross references and footnotes
+                # Record cross references and footnotes, then remove their markers
                 cross_refs = span_copy.find_all('sup', class_='crossreference')
                 for ref in cross_refs:
+                    targets = crossref_targets.get(ref.get('data-cr', '').lstrip('#'), [])
+                    verse_crossrefs.setdefault(verse_number, []).extend(targets)
                     ref.decompose()
                 footnotes = span_copy.find_all('sup', class_='footnote')
                 for fn in footnotes:
+                    note = footnote_texts.get(fn.get('data-fn', '').lstrip('#'))
+                    if note:
+                        verse_footnotes.setdefault(verse_number, []).append(note)
                     fn.decompose()
 
                 # Remove verse number if present
@@ -306,6 +378,7 @@ class BibleGatewayDownloader:
                     versenum_span.decompose()
 
                 clean_text = span_copy.get_text().strip()
+                span_copy.decompose()
 
                 # Remove heading text from verse content if this verse has a heading
                 if verse_number in heading_map:
@@ -336,10 +409,15 @@ class BibleGatewayDownloader:
 
                 # Validation: check if this looks like a real verse
                 if (self._is_valid_verse(verse_number, combined_text, book)):
-                    verses.append({
+                    verse_data = {
                         "verse": verse_number,
                         "text": combined_text
-                    })
+                    }
+                    if verse_crossrefs.get(verse_number):
+                        verse_data["crossrefs"] = verse_crossrefs[verse_number]
+                    if verse_footnotes.get(verse_number):
+                        verse_data["footnotes"] = verse_footnotes[verse_number]
+                    verses.append(verse_data)
             
             # Sort verses by number and remove duplicates
             unique_verses = {}
@@ -472,8 +550,10 @@ class BibleGatewayDownloader:
         
         # Save to file
         try:
-            with open(filepath, 'w', encoding='utf-8') as f:
-                json.dump(chapter_data, f, indent=2, ensure_ascii=False)
+            with metrics.timed('write', 'write_ms', path=filepath) as written:
+                with open(filepath, 'w', encoding='utf-8') as f:
+                    json.dump(chapter_data, f, indent=2, ensure_ascii=False)
+                written['bytes'] = os.path.getsize(filepath)
             return True
         except Exception as e:
             print(f"Error saving {filepath}: {e}")
@@ -503,16 +583,23 @@ class BibleGatewayDownloader:
         
         success_count = 0
         total_count = 0
+        metrics.event('plan', version=version.lower(), chapters=sum(BIBLE_BOOKS[book] for book in books_to_download))
         
         for book in books_to_download:
             chapter_count = BIBLE_BOOKS[book]
             print(f"\nDownloading {book} ({chapter_count} chapters)...")
             
+            # Verses downloaded in this run, kept for the TXT conversion below
+            book_chapters = {}
+            
             for chapter in range(1, chapter_count + 1):
+                if self.chapter_exists(book, chapter, version):
+                    metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='skipped')
+                    continue
                 total_count += 1
                 
-                # Download verses with 5 retries (handled in get_chapter_verses)
-                verses = self.get_chapter_verses(book, chapter, version)
+                # Download verses under the shared retry policy (see retry_policy.py)
+                outcome, verses = self.fetch_chapter(book, chapter, version)
                 
                 if verses:
                     # Successfully downloaded verses, now try to save
@@ -524,30 +611,41 @@ class BibleGatewayDownloader:
                         if self.save_chapter(book, chapter, version, verses):
                             success_count += 1
                             save_success = True
+                            book_chapters[chapter] = compact_verses(verses)
+                            metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='done')
                             print(f"✓ Completed {book} {chapter}:{version} ({len(verses)} verses)")
                             break
                         else:
                             save_retry_count += 1
                             print(f"Failed to save {book} {chapter}:{version}, retrying in 5 seconds... (attempt {save_retry_count}/10)")
-                            time.sleep(5)
+                            metrics.sleep(5, 'save_retry')
                     
                     if not save_success:
                         # Failed to save after retries, skip to next book
+                        metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
                         print(f"Critical: Failed to save {book} {chapter}:{version} after multiple save attempts, skipping to next book...")
                         break
-                else:
-                    # Failed to download after 5 retries, skip to next book
-                    print(f"Failed to download {book} {chapter}:{version} after 5 attempts, skipping to next book...")
+                elif outcome in ('missing', 'empty'):
+                    # The version does not have this book, skip to next book
+                    metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
+                    print(f"{book} {chapter}:{version} is not available, skipping to next book...")
                     break
+                else:
+                    # Transport failures; the circuit breaker has already paused for outages, so move on
+                    metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
+                    print(f"Failed to download {book} {chapter}:{version} after {RETRY_POLICY.attempts} attempts, skipping...")
+                    continue
                 
                 # Rate limiting - be respectful to BibleGateway after successful completion
-                time.sleep(1)
+                metrics.sleep(1, 'rate_limit')
             
             # Convert book to TXT after all chapters are downloaded
             print(f"  Converting {book} to TXT...")
             if AUTO_CONVERT_TO_TXT:
-                self.convert_book_to_txt(book, version)
+                with metrics.profiled('convert'):
+                    self.convert_book_to_txt(book, version, book_chapters)
         
+        metrics.event('version_done', version=version.lower(), done=success_count, attempted=total_count)
         print(f"\nVersion {version.upper()} complete: {success_count}/{total_count} chapters downloaded")
         return success_count, total_count
     
@@ -564,10 +662,16 @@ class BibleGatewayDownloader:
         total_count = 0
         
         print(f"\nDownloading {book} ({chapter_count} chapters)...")
+        metrics.event('plan', version=version.lower(), chapters=chapter_count)
+        
+        book_chapters = {}
         
         for chapter in range(1, chapter_count + 1):
+            if self.chapter_exists(book, chapter, version):
+                metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='skipped')
+                continue
             total_count += 1
-            verses = self.get_chapter_verses(book, chapter, version)
+            outcome, verses = self.fetch_chapter(book, chapter, version)
             
             if verses:
                 save_success = False
@@ -577,62 +681,88 @@ class BibleGatewayDownloader:
                     if self.save_chapter(book, chapter, version, verses):
                         success_count += 1
                         save_success = True
+                        book_chapters[chapter] = compact_verses(verses)
+                        metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='done')
                         print(f"✓ Completed {book} {chapter}:{version} ({len(verses)} verses)")
                         break
                     else:
                         save_retry_count += 1
                         print(f"Failed to save {book} {chapter}:{version}, retrying in 5 seconds... (attempt {save_retry_count}/10)")
-                        time.sleep(5)
+                        metrics.sleep(5, 'save_retry')
                 
                 if not save_success:
+                    metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
                     print(f"Critical: Failed to save {book} {chapter}:{version} after multiple save attempts, skipping...")
+            elif outcome in ('missing', 'empty'):
+                metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
+                print(f"{book} {chapter}:{version} is not available, stopping {book}...")
+                break
             else:
-                print(f"Failed to download {book} {chapter}:{version} after 5 retries, skipping...")
+                metrics.event('chapter', version=version.lower(), book=book, chapter=chapter, outcome='failed')
+                print(f"Failed to download {book} {chapter}:{version} after {RETRY_POLICY.attempts} attempts, skipping...")
             
-            time.sleep(1)
+            metrics.sleep(1, 'rate_limit')
         
         if AUTO_CONVERT_TO_TXT:
             print(f"  Converting {book} to TXT...")
-            self.convert_book_to_txt(book, version)
+            with metrics.profiled('convert'):
+                self.convert_book_to_txt(book, version, book_chapters)
         
+        metrics.event('version_done', version=version.lower(), done=success_count, attempted=total_count)
         print(f"\nBook {book} complete: {success_count}/{total_count} chapters downloaded")
         return success_count, total_count
     
-    def convert_book_to_txt(self, book, version):
-        """Convert a book's JSON files to a single TXT file"""
+    def convert_book_to_txt(self, book, version, book_chapters=None):
+        """Convert a book to a single TXT file.
+
+        book_chapters maps chapter numbers to the (verse, text) tuples downloaded
+        in this run. Only chapters missing from it (e.g. when resuming a partially
+        downloaded book) are read back from the JSON files on disk.
+        """
+        from precompress import precompress_file
+        from chapter_index import write_chapter_index
+        from strongs import StrongsConcordance, extract_strongs, merge_book_concordance
+        from txt_corpus import verse_key
         book_num = self.get_book_number(book)
         lang = get_language_for_version(version)
         book_dir = os.path.join(self.output_dir, lang, version.lower(), f"{version.lower()}_{book_num:02d}-{book}")
         
-        if not os.path.exists(book_dir):
-            return
-        
-        chapter_files = sorted([f for f in os.listdir(book_dir) if f.endswith('.json')])
-        if not chapter_files:
+        chapters = dict(book_chapters or {})
+        if os.path.exists(book_dir):
+            for chapter_file in os.listdir(book_dir):
+                chapter = chapter_number_from_filename(chapter_file)
+                if chapter is None or chapter in chapters:
+                    continue
+                with open(os.path.join(book_dir, chapter_file), 'r', encoding='utf-8') as f:
+                    data = json.load(f)
+                chapters[data['chapter']] = compact_verses(data['verses'])
+        if not chapters:
             return
         
-        lang = get_language_for_version(version)
         txt_bibles_dir = resolve_output_dir('txt_bibles') / lang / version.lower()
         txt_bibles_dir.mkdir(parents=True, exist_ok=True)
         
         output_file = txt_bibles_dir / f"{book_num:02d}-{book}-{version.lower()}.txt"
+        book_display = BOOK_NAME_MAP.get(book, book.title())
         
         all_lines = []
-        for chapter_file in chapter_files:
-            chapter_path = os.path.join(book_dir, chapter_file)
-            with open(chapter_path, 'r', encoding='utf-8') as f:
-                data = json.load(f)
-            
-            chapter = data['chapter']
-            book_display = BOOK_NAME_MAP.get(book, book.title())
-            
-            for verse_data in data['verses']:
-                verse = verse_data['verse']
-                text = clean_verse_text(verse_data['text'])
-                all_lines.append(f"{book_display} {chapter}:{verse} {text}")
+        concordance = StrongsConcordance()
+        with metrics.profiled('normalise'):
+            for chapter in sorted(chapters):
+                for verse, text in chapters[chapter]:
+                    # Keep the Strong's tags before clean_verse_text drops them
+                    text, tags = extract_strongs(text)
+                    concordance.add(verse_key(book_num, chapter, verse), tags)
+                    all_lines.append(f"{book_display} {chapter}:{verse} {clean_verse_text(text)}")
         
-        with open(output_file, 'w', encoding='utf-8') as f:
-            f.write('\n'.join(all_lines) + '\n')
+        with metrics.timed('write', 'write_ms', path=str(output_file)) as written:
+            with open(output_file, 'w', encoding='utf-8') as f:
+                f.write('\n'.join(all_lines) + '\n')
+            written['bytes'] = output_file.stat().st_size
+        with metrics.timed('phase', 'ms', name='precompress'):
+            precompress_file(output_file)
+        write_chapter_index(output_file)
+        merge_book_concordance(txt_bibles_dir, version.lower(), book_num, concordance)
         
         print(f"    -> Created TXT: {output_file.name}")
 
@@ -668,12 +798,13 @@ def clean_verse_text(text):
             total_chapters += total
             
             # Longer break between versions
-            time.sleep(3)
+            metrics.sleep(3, 'version_pause')
         
         print(f"\n{'='*60}")
         print(f"DOWNLOAD COMPLETE")
         print(f"Total chapters downloaded: {total_success}/{total_chapters}")
-        print(f"Success rate: {(total_success/total_chapters*100):.1f}%")
+        if total_chapters:
+            print(f"Success rate: {(total_success/total_chapters*100):.1f}%")
         print(f"{'='*60}")
 
 def display_menu():
@@ -780,7 +911,8 @@ def download_multiple_selected_versions():
     
     print(f"\n🎯 Multiple versions download complete!")
     print(f"Total chapters downloaded: {total_success}/{total_chapters}")
-    print(f"Success rate: {(total_success/total_chapters*100):.1f}%")
+    if total_chapters:
+        print(f"Success rate: {(total_success/total_chapters*100):.1f}%")
 
 def list_available_books():
     """List all available Bible books with chapter counts"""
@@ -924,7 +1056,17 @@ def main():
     parser = argparse.ArgumentParser(description='Download Bible from Bible Gateway')
     parser.add_argument('version', nargs='?', help='Bible version code (e.g., kjv, esv, niv)')
     parser.add_argument('--book', '-b', help='Specific book to download (e.g., genesis or 1)')
+    parser.add_argument('--dry-run', action='store_true', help='Show the chapters still missing, request count and expected duration without downloading')
+    add_profile_argument(parser)
+    add_memory_argument(parser)
     args = parser.parse_args()
+    attach_profiler(metrics, args.profile)
+    attach_memory_tracker(metrics, args.memory)
+    
+    if args.dry_run and not args.version:
+        downloader = BibleGatewayDownloader()
+        downloader.plan(downloader.load_versions())
+        return
     
     if args.version:
         downloader = BibleGatewayDownloader()
@@ -941,8 +1083,14 @@ def main():
                 print(f"Error: Unknown book '{args.book}'")
                 return
             
+            if args.dry_run:
+                downloader.plan([args.version], book)
+                return
             print(f"\n🚀 Downloading {args.version} - {book}...")
             success, total = downloader.download_book(args.version, book)
+        elif args.dry_run:
+            downloader.plan([args.version])
+            return
         else:
             print(f"\n🚀 Downloading {args.version}...")
             success, total = downloader.download_version(args.version)
@@ -962,6 +1110,10 @@ def main():
             
             if choice == '1':
                 downloader = BibleGatewayDownloader()
+                downloader.plan(downloader.load_versions())
+                confirm = input("\nContinue with the download? (y/N): ").strip().lower()
+                if confirm not in ['y', 'yes']:
+                    continue
                 print("\n🚀 Downloading all translations of entire Bible...")
                 downloader.download_all()
                 
@@ -0,0 +1,183 @@
+#!/usr/bin/env python3
+"""
+Book table and scripture reference parsing shared by the lookup tools.
+
+  parse_reference("John 3:16-18")      -> [(43, 3, 16, 3, 18)]
+  parse_reference("Ps 119")            -> [(19, 119, 1, 119, None)]
+  parse_reference("Ps 119:175-")       -> [(19, 119, 175, 119, None)]
+  parse_reference("Gen 1:1-2:3; Jude") -> [(1, 1, 1, 2, 3), (65, 1, 1, None, None)]
+  parse_osis_reference("Job.38.4-Job.38.7") -> (18, 38, 4, 38, 7)
+
+Passages are (book, start_chapter, start_verse, end_chapter, end_verse);
+end_verse None means "to the end of end_chapter" and end_chapter None means
+"to the end of the book". A range that ends before it starts is invalid.
+"""
+
+import re
+
+# (book key, display name, OSIS abbreviation) in canonical order - book number is index + 1
+BOOKS = [
+    ('genesis', 'Genesis', 'Gen'), ('exodus', 'Exodus', 'Exod'), ('leviticus', 'Leviticus', 'Lev'),
+    ('numbers', 'Numbers', 'Num'), ('deuteronomy', 'Deuteronomy', 'Deut'), ('joshua', 'Joshua', 'Josh'),
+    ('judges', 'Judges', 'Judg'), ('ruth', 'Ruth', 'Ruth'), ('1-samuel', '1 Samuel', '1Sam'),
+    ('2-samuel', '2 Samuel', '2Sam'), ('1-kings', '1 Kings', '1Kgs'), ('2-kings', '2 Kings', '2Kgs'),
+    ('1-chronicles', '1 Chronicles', '1Chr'), ('2-chronicles', '2 Chronicles', '2Chr'), ('ezra', 'Ezra', 'Ezra'),
+    ('nehemiah', 'Nehemiah', 'Neh'), ('esther', 'Esther', 'Esth'), ('job', 'Job', 'Job'),
+    ('psalms', 'Psalms', 'Ps'), ('proverbs', 'Proverbs', 'Prov'), ('ecclesiastes', 'Ecclesiastes', 'Eccl'),
+    ('song-of-solomon', 'Song of Solomon', 'Song'), ('isaiah', 'Isaiah', 'Isa'), ('jeremiah', 'Jeremiah', 'Jer'),
+    ('lamentations', 'Lamentations', 'Lam'), ('ezekiel', 'Ezekiel', 'Ezek'), ('daniel', 'Daniel', 'Dan'),
+    ('hosea', 'Hosea', 'Hos'), ('joel', 'Joel', 'Joel'), ('amos', 'Amos', 'Amos'),
+    ('obadiah', 'Obadiah', 'Obad'), ('jonah', 'Jonah', 'Jonah'), ('micah', 'Micah', 'Mic'),
+    ('nahum', 'Nahum', 'Nah'), ('habakkuk', 'Habakkuk', 'Hab'), ('zephaniah', 'Zephaniah', 'Zeph'),
+    ('haggai', 'Haggai', 'Hag'), ('zechariah', 'Zechariah', 'Zech'), ('malachi', 'Malachi', 'Mal'),
+    ('matthew', 'Matthew', 'Matt'), ('mark', 'Mark', 'Mark'), ('luke', 'Luke', 'Luke'),
+    ('john', 'John', 'John'), ('acts', 'Acts', 'Acts'), ('romans', 'Romans', 'Rom'),
+    ('1-corinthians', '1 Corinthians', '1Cor'), ('2-corinthians', '2 Corinthians', '2Cor'), ('galatians', 'Galatians', 'Gal'),
+    ('ephesians', 'Ephesians', 'Eph'), ('philippians', 'Philippians', 'Phil'), ('colossians', 'Colossians', 'Col'),
+    ('1-thessalonians', '1 Thessalonians', '1Thess'), ('2-thessalonians', '2 Thessalonians', '2Thess'), ('1-timothy', '1 Timothy', '1Tim'),
+    ('2-timothy', '2 Timothy', '2Tim'), ('titus', 'Titus', 'Titus'), ('philemon', 'Philemon', 'Phlm'),
+    ('hebrews', 'Hebrews', 'Heb'), ('james', 'James', 'Jas'), ('1-peter', '1 Peter', '1Pet'),
+    ('2-peter', '2 Peter', '2Pet'), ('1-john', '1 John', '1John'), ('2-john', '2 John', '2John'),
+    ('3-john', '3 John', '3John'), ('jude', 'Jude', 'Jude'), ('revelation', 'Revelation', 'Rev'),
+]
+
+# Common alternative spellings not covered by key, name or OSIS abbreviation
+# (including the short BlueLetterBible abbreviations that are too short or ambiguous as prefixes)
+BOOK_ALIASES = {
+    'gn': 1, 'ex': 2, 'exo': 2, 'lv': 3, 'nm': 4, 'dt': 5, 'deu': 5, 'jos': 6, 'jdg': 7,
+    'psalm': 19, 'psa': 19, 'pss': 19, 'prv': 20, 'song of songs': 22, 'canticles': 22, 'sng': 22,
+    'mt': 40, 'mk': 41, 'mrk': 41, 'lk': 42, 'jn': 43, 'jhn': 43, 'phi': 50, 'php': 50,
+    'jud': 65, 'jde': 65, 'revelations': 66, 'apocalypse': 66,
+}
+
+# Obadiah, Philemon, 2 John, 3 John, Jude - "Jude 3" means verse 3
+SINGLE_CHAPTER_BOOKS = {31, 57, 63, 64, 65}
+
+REFERENCE_PATTERN = re.compile(
+    r'^\s*(?P<book>\d?\s*[^\d:]+?)\.?\s*'
+    r'(?:(?P<c1>\d+)(?::(?P<v1>\d+))?'
+    r'(?:\s*(?P<dash>[-–])\s*(?:(?P<c2>\d+)(?::(?P<v2>\d+))?)?)?)?\s*$'
+)
+
+def normalize_book_name(name):
+    """Lowercase and collapse separators so '1 John', '1-john' and '1john' compare equal"""
+    return re.sub(r'[\s\-_.]+', '', name.lower())
+
+def _build_book_lookup():
+    lookup = {}
+    for number, (key, name, osis) in enumerate(BOOKS, 1):
+        for variant in (key, name, osis):
+            lookup[normalize_book_name(variant)] = number
+    for alias, number in BOOK_ALIASES.items():
+        lookup[normalize_book_name(alias)] = number
+    return lookup
+
+BOOK_LOOKUP = _build_book_lookup()
+
+def book_number(name):
+    """Resolve a book name, abbreviation, key or number to its book number (1-66), or None"""
+    name = str(name).strip()
+    if name.isdigit():
+        number = int(name)
+        return number if 1 <= number <= len(BOOKS) else None
+
+    normalized = normalize_book_name(name)
+    if normalized in BOOK_LOOKUP:
+        return BOOK_LOOKUP[normalized]
+
+    # Fall back to an unambiguous prefix of a full book name ("Matt", "Revel")
+    if len(normalized) >= 3:
+        matches = {number for number, (_, full_name, _) in enumerate(BOOKS, 1)
+                   if normalize_book_name(full_name).startswith(normalized)}
+        if len(matches) == 1:
+            return matches.pop()
+    return None
+
+def book_name(number):
+    """Display name of a book number"""
+    return BOOKS[number - 1][1]
+
+def parse_single_reference(reference):
+    """Parse one reference like 'John 3:16-18' into a passage tuple, or None if it is invalid"""
+    match = REFERENCE_PATTERN.match(reference)
+    if not match:
+        return None
+    book = book_number(match.group('book'))
+    if book is None:
+        return None
+
+    c1, v1, c2, v2 = (int(value) if value else None for value in match.group('c1', 'v1', 'c2', 'v2'))
+    open_ended = match.group('dash') is not None and c2 is None
+    if c1 is None:
+        return book, 1, 1, None, None
+    if book in SINGLE_CHAPTER_BOOKS and v1 is None and (c1 != 1 or c2 is not None or open_ended):
+        passage = book, 1, c1, 1, None if open_ended else c2 if c2 is not None else c1
+    elif open_ended:
+        # "Ps 119:175-" runs to the end of the chapter, "Ps 119-" to the end of the book
+        passage = (book, c1, v1, c1, None) if v1 is not None else (book, c1, 1, None, None)
+    elif v1 is None:
+        # "Ps 23" or "Ps 23-24": whole chapters
+        passage = book, c1, 1, c2 if c2 is not None else c1, None
+    elif c2 is None:
+        passage = book, c1, v1, c1, v1
+    elif v2 is None:
+        # "John 3:16-18": the second number is a verse in the same chapter
+        passage = book, c1, v1, c1, c2
+    else:
+        passage = book, c1, v1, c2, v2
+
+    _, c1, v1, c2, v2 = passage
+    if c2 is not None and (c2 < c1 or (c2 == c1 and v2 is not None and v2 < v1)):
+        # "John 3:18-16"
+        return None
+    return passage
+
+def parse_reference(reference):
+    """Parse ';'-separated references into a list of passage tuples, skipping invalid parts"""
+    passages = []
+    for part in reference.split(';'):
+        if part.strip():
+            passage = parse_single_reference(part)
+            if passage:
+                passages.append(passage)
+    return passages
+
+def parse_osis_reference(osis):
+    """Parse an OSIS reference like 'Ps.33.6' or 'John.1.1-John.1.3' into a passage tuple, or None.
+
+    A range that runs into another book is cut off at the end of its first book.
+    """
+    parts = [part.split('.') for part in osis.strip().split('-', 1)]
+    start = parts[0]
+    book = BOOK_LOOKUP.get(normalize_book_name(start[0]))
+    if book is None or not 2 <= len(start) <= 3 or not all(value.isdigit() for value in start[1:]):
+        return None
+    c1 = int(start[1])
+    v1 = int(start[2]) if len(start) == 3 else None
+    if len(parts) == 1:
+        return (book, c1, v1, c1, v1) if v1 is not None else (book, c1, 1, c1, None)
+
+    end = parts[1]
+    if BOOK_LOOKUP.get(normalize_book_name(end[0])) != book:
+        return book, c1, v1 or 1, None, None
+    if not 2 <= len(end) <= 3 or not all(value.isdigit() for value in end[1:]):
+        return None
+    c2 = int(end[1])
+    v2 = int(end[2]) if len(end) == 3 else None
+    return book, c1, v1 or 1, c2, v2
+
+def format_passage(passage):
+    """Format a passage tuple back into a reference string"""
+    book, c1, v1, c2, v2 = passage
+    name = book_name(book)
+    if c2 is None:
+        if (c1, v1) == (1, 1):
+            return name
+        return f"{name} {c1}-" if v1 == 1 else f"{name} {c1}:{v1}-"
+    if v2 is None:
+        if c1 == c2 and v1 != 1:
+            return f"{name} {c1}:{v1}-"
+        return f"{name} {c1}" if c1 == c2 else f"{name} {c1}-{c2}"
+    if c1 == c2:
+        return f"{name} {c1}:{v1}" if v1 == v2 else f"{name} {c1}:{v1}-{v2}"
+    return f"{name} {c1}:{v1}-{c2}:{v2}"
@@ -0,0 +1,207 @@
+#!/usr/bin/env python3
+"""
+Build txt_bibles/versions.json in one pass over the installed TXT Bibles.
+
+  python3 build_manifest.py [txt_bibles]
+
+The manifest keeps the sections the version dropdown reads and adds one
+entry per version that the Bible loader uses to resolve paths without
+guessing or probing:
+
+  {
+    "languages": {"English": {"ylt": "YLT - Young's Literal Translation"}, ...},
+    "languageNames": {"English": "English", "Hebrew": "עברית", ...},
+    "versions": {
+      "ylt": {"language": "English", "dir": "english",
+              "books": {"1": {"file": "01-genesis-ylt.txt", "bytes": 1734285,
+                              "verses": 1533, "sha1": "..."}, ...},
+              "bundle": {"file": "ylt.bundle", "bytes": 4649318, "sha1": "..."}},
+      ...
+    }
+  }
+
+Version descriptions come from the [custom_versions] section of options.cfg,
+then from the existing manifest, then the upper-cased code. Versions with
+fewer books than their language should have are marked "[count/expected]".
+Languages keep their order from the existing manifest. The file is only
+rewritten (atomically, with fresh .gz/.br siblings) when it changes.
+
+Each translation's {translation}.bundle (all of its books in one file, see
+translation_bundle.py) is refreshed from the same bytes that are hashed
+here, so the manifest never points at a bundle that disagrees with it.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import re
+from pathlib import Path
+
+from precompress import precompress_file
+from translation_bundle import write_bundle
+from txt_corpus import list_book_files, list_translations, parse_verse_line
+
+MANIFEST_NAME = 'versions.json'
+
+# Books a complete translation of each language directory has
+EXPECTED_BOOKS = {
+    'english': 66, 'hebrew': 39, 'greek': 27, 'arabic': 66, 'spanish': 66, 'french': 66,
+    'chinese': 66, 'japanese': 66, 'korean': 66, 'russian': 66, 'filipino': 66, 'hindi': 66,
+    'ukrainian': 66,
+}
+
+LANGUAGE_NAMES_NATIVE = {
+    'English': 'English', 'Hebrew': 'עברית', 'Greek': 'Ελληνικά', 'Spanish': 'Español',
+    'French': 'Français', 'Japanese': '日本語', 'Chinese': '中文', 'Arabic': 'العربية',
+    'Korean': '한국어', 'Russian': 'Русский', 'Filipino': 'Tagalog', 'Hindi': 'हिन्दी',
+    'Ukrainian': 'Українська',
+}
+
+COMPLETENESS_SUFFIX = re.compile(r'\s*\[\d+/\d+\]$')
+
+def manifest_path(bible_base):
+    return os.path.join(bible_base, MANIFEST_NAME)
+
+def default_config_path():
+    return Path(__file__).resolve().parent.parent / 'options.cfg'
+
+def load_config_descriptions(config_file):
+    """version -> 'CODE - Full Name' from the [custom_versions] section of options.cfg"""
+    descriptions = {}
+    try:
+        with open(config_file, 'r', encoding='utf-8') as f:
+            lines = f.read().splitlines()
+    except OSError:
+        return descriptions
+
+    in_custom_section = False
+    for line in lines:
+        line = line.strip()
+        if line == '[custom_versions]':
+            in_custom_section = True
+            continue
+        if not in_custom_section or not line or line.startswith(('#', ';', '[')):
+            continue
+        # Format: version, source, "Full Name"
+        parts = [part.strip() for part in line.split(',', 2)]
+        if len(parts) == 3 and parts[0] and parts[2]:
+            descriptions[parts[0]] = f"{parts[0].upper()} - {parts[2].strip(chr(34))}"
+    return descriptions
+
+def language_dir(language_key):
+    """Directory name of a manifest language key ('Hebrew', 'Hebrew עברית' -> 'hebrew')"""
+    return language_key.split()[0].lower() if language_key.strip() else ''
+
+def load_manifest(bible_base):
+    """The current manifest, or an empty one if it is missing or unreadable"""
+    try:
+        with open(manifest_path(bible_base), 'r', encoding='utf-8') as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+def describe_book(book_file, data):
+    """Manifest entry of one book file and its bytes: name, size, verse count and SHA-1"""
+    verses = sum(1 for line in data.decode('utf-8', errors='replace').splitlines() if parse_verse_line(line))
+    return {
+        'file': os.path.basename(book_file),
+        'bytes': len(data),
+        'verses': verses,
+        'sha1': hashlib.sha1(data).hexdigest(),
+    }
+
+def build_manifest(bible_base, previous=None, descriptions=None):
+    """Build the manifest dict from the TXT files under bible_base, refreshing each translation's bundle"""
+    previous = previous or {}
+    descriptions = descriptions or {}
+    previous_languages = previous.get('languages', {})
+    previous_descriptions = {version: COMPLETENESS_SUFFIX.sub('', description)
+                             for versions in previous_languages.values() for version, description in versions.items()}
+    language_keys = {language_dir(key): key for key in previous_languages}
+
+    found = {}
+    for directory, version, translation_path in list_translations(bible_base):
+        book_files = list_book_files(translation_path, version)
+        if not book_files:
+            continue
+        key = language_keys.setdefault(directory, directory.capitalize())
+        description = descriptions.get(version) or previous_descriptions.get(version) or version.upper()
+        expected = EXPECTED_BOOKS.get(directory, 0)
+        if expected and len(book_files) < expected:
+            description = f"{description} [{len(book_files)}/{expected}]"
+        books = {}
+        contents = []
+        for book, _, book_file in book_files:
+            with open(book_file, 'rb') as f:
+                data = f.read()
+            books[str(book)] = describe_book(book_file, data)
+            contents.append((book, data))
+        bundle_file, bundle, _ = write_bundle(translation_path, version, contents)
+        found.setdefault(key, {})[version] = {
+            'description': description,
+            'entry': {
+                'language': key,
+                'dir': directory,
+                'books': books,
+                'bundle': {
+                    'file': os.path.basename(bundle_file),
+                    'bytes': len(bundle),
+                    'sha1': hashlib.sha1(bundle).hexdigest(),
+                },
+            },
+        }
+
+    # Existing languages keep their order; new ones follow alphabetically
+    order = [key for key in previous_languages if key in found] + sorted(key for key in found if key not in previous_languages)
+    languages = {key: {version: found[key][version]['description'] for version in sorted(found[key])} for key in order}
+
+    language_names = dict(previous.get('languageNames', {}))
+    for key in order:
+        language_names.setdefault(key, LANGUAGE_NAMES_NATIVE.get(key.split()[0], key))
+
+    versions = {version: found[key][version]['entry'] for key in order for version in sorted(found[key])}
+    return {'languages': languages, 'languageNames': language_names, 'versions': versions}
+
+def write_manifest(bible_base, config_file=None, verbose=True):
+    """Rebuild versions.json from disk; returns True if it changed"""
+    previous = load_manifest(bible_base)
+    descriptions = load_config_descriptions(config_file or default_config_path())
+    manifest = build_manifest(bible_base, previous, descriptions)
+
+    if verbose:
+        before = {(language, version) for language, versions in previous.get('languages', {}).items() for version in versions}
+        after = {(language, version) for language, versions in manifest['languages'].items() for version in versions}
+        for language, version in sorted(after - before):
+            print(f"[+] Added {language}:{version}")
+        for language, version in sorted(before - after):
+            print(f"[-] Removed {language}:{version}")
+
+    output_file = manifest_path(bible_base)
+    content = (json.dumps(manifest, indent=2, ensure_ascii=False) + '\n').encode('utf-8')
+    try:
+        with open(output_file, 'rb') as f:
+            changed = f.read() != content
+    except FileNotFoundError:
+        changed = True
+    if changed:
+        os.makedirs(bible_base, exist_ok=True)
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+        os.replace(temp_file, output_file)
+    precompress_file(output_file)
+    return changed
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Rebuild txt_bibles/versions.json from the installed TXT Bibles')
+    parser.add_argument('txt_bibles', nargs='?', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--config', default=str(default_config_path()), help='options.cfg with version descriptions (default: %(default)s)')
+    args = parser.parse_args()
+
+    changed = write_manifest(args.txt_bibles, args.config)
+    print(f"{'Updated' if changed else 'Unchanged'} {manifest_path(args.txt_bibles)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+"""
+Chapter byte-offset sidecars for the TXT Bibles.
+
+  txt_bibles/english/ylt/19-psalms-ylt.txt
+  txt_bibles/english/ylt/19-psalms-ylt.chapters.json
+
+  {"format": 1, "sha1": "...", "chapters": {"1": [0, 1046], "2": [1046, 1693], ...}}
+
+Each chapter maps to the [byte offset, byte length] of its lines in the TXT
+file, so the Bible loader can fetch one chapter with an HTTP Range request
+instead of the whole book. The SHA-1 is that of the TXT file the offsets
+were taken from; the loader only trusts a sidecar whose hash matches the
+book's entry in versions.json. Books whose chapters are not contiguous get
+no sidecar.
+
+Sidecars carry the TXT file's mtime, so the startup refresh only rereads
+books that changed, like the precompressed siblings.
+"""
+
+import argparse
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from txt_corpus import list_book_files, list_translations, parse_verse_line
+
+FORMAT_VERSION = 1
+
+def chapter_index_path(book_file):
+    """Sidecar path of a book file ('01-genesis-ylt.txt' -> '01-genesis-ylt.chapters.json')"""
+    book_file = str(book_file)
+    return book_file[:-len('.txt')] + '.chapters.json'
+
+def chapter_ranges(content):
+    """chapter -> [offset, length] of a book's bytes, or None if a chapter is split across the file"""
+    ranges = {}
+    current = None
+    offset = 0
+    for line in content.splitlines(keepends=True):
+        parsed = parse_verse_line(line.decode('utf-8', errors='replace'))
+        if parsed and parsed[0] != current:
+            if parsed[0] in ranges:
+                return None
+            if current is not None:
+                ranges[current][1] = offset - ranges[current][0]
+            current = parsed[0]
+            ranges[current] = [offset, 0]
+        offset += len(line)
+    if current is not None:
+        ranges[current][1] = offset - ranges[current][0]
+    return ranges
+
+def write_chapter_index(book_file, content=None):
+    """Write the sidecar of a book file unless it is current; returns True if it was written"""
+    book_file = str(book_file)
+    output_file = chapter_index_path(book_file)
+    source_stat = os.stat(book_file)
+    try:
+        if os.stat(output_file).st_mtime_ns == source_stat.st_mtime_ns:
+            return False
+    except FileNotFoundError:
+        pass
+
+    if content is None:
+        with open(book_file, 'rb') as f:
+            content = f.read()
+    ranges = chapter_ranges(content)
+    if not ranges:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return False
+
+    index = {
+        'format': FORMAT_VERSION,
+        'sha1': hashlib.sha1(content).hexdigest(),
+        'chapters': {str(chapter): ranges[chapter] for chapter in sorted(ranges)},
+    }
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'w', encoding='utf-8') as f:
+        json.dump(index, f, separators=(',', ':'))
+    os.utime(temp_file, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+    os.replace(temp_file, output_file)
+    return True
+
+def index_tree(bible_base):
+    """Refresh the sidecars of every book under txt_bibles and return the paths written"""
+    written = []
+    for _, translation, translation_path in list_translations(bible_base):
+        for _, _, book_file in list_book_files(translation_path, translation):
+            if write_chapter_index(book_file):
+                written.append(chapter_index_path(book_file))
+    return written
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Write chapter byte-offset sidecars for the TXT Bibles')
+    parser.add_argument('txt_bibles', nargs='?', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    args = parser.parse_args()
+
+    written = index_tree(args.txt_bibles)
+    print(f"Indexed chapters of {len(written)} book(s)")
+
+if __name__ == '__main__':
+    main()
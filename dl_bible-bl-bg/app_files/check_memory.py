@@ -0,0 +1,172 @@
+#!/usr/bin/env python3
+"""
+RSS regression check for the downloaders' page parsing.
+
+  python3 check_memory.py
+  python3 check_memory.py --chapters 3000 --padding 128 --max-growth-per-100 0.05
+
+Feeds --chapters synthetic chapter pages from fake_upstream.py through each
+downloader's parse_chapter_page(), in a fresh interpreter per downloader,
+and samples RSS along the way. Each chapter goes through the downloader's
+metrics recorder as in a real run (a request, a parse, a sleep and a
+chapter event), so anything the recorder or its observers keep per event
+counts too. Pages come from an in-process session rather than a socket, to
+keep network buffers out of the figures. The cyclic garbage collector is
+off while it runs, so only reference counting frees memory: a parse tree
+that is not released explicitly shows up as growth. The check fails if,
+after the first --warmup chapters, RSS grows by more than
+--max-growth-per-100 MB per 100 chapters, if BeautifulSoup tags are still
+alive at the end, or if a parsed chapter differs from the page it came from.
+"""
+
+import argparse
+import gc
+import json
+import os
+import subprocess
+import sys
+import tempfile
+from datetime import timedelta
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from fake_upstream import biblegateway_page, blueletterbible_page, synthetic_chapter
+from memory_tracking import current_rss_mb
+
+SOURCES = ('biblegateway', 'blueletterbible')
+
+# A spread of books and chapter counts to cycle through
+BOOKS = (('genesis', 50), ('psalms', 150), ('isaiah', 66), ('matthew', 28), ('john', 21), ('romans', 16))
+
+def chapters(count):
+    """(book, chapter) pairs cycling through BOOKS"""
+    pairs = [(book, chapter) for book, total in BOOKS for chapter in range(1, total + 1)]
+    return [pairs[index % len(pairs)] for index in range(count)]
+
+class PageResponse:
+    def __init__(self, html):
+        self.status_code = 200
+        self.text = html
+        self.content = html.encode('utf-8')
+        self.elapsed = timedelta(0)
+
+class PageSession:
+    """Answers get('.../{book}/{chapter}') with a stand-in chapter page"""
+
+    def __init__(self, page, padding):
+        self.page = page
+        self.padding = padding
+
+    def get(self, url, **kwargs):
+        book, chapter = urlsplit(url).path.strip('/').split('/')[-2:]
+        return PageResponse(self.page('kjv', book, int(chapter), self.padding))
+
+def parser_for(source):
+    """(page, parse, recorder): parse(html, book, chapter) -> [(verse, text)] with the downloader's own parser and recorder"""
+    if source == 'biblegateway':
+        import bible_gateway_downloader
+        downloader = bible_gateway_downloader.BibleGatewayDownloader()
+        def parse(html, book, chapter):
+            return [(verse['verse'], verse['text']) for verse in downloader.parse_chapter_page(html, book, chapter, 'kjv')]
+        return biblegateway_page, parse, bible_gateway_downloader.metrics
+    import bible_blueletter_downloader as blb
+    def parse(html, book, chapter):
+        verses = blb.parse_chapter_page(html, book, chapter, 'kjv', blb.get_blueletter_bible_abbrev(book, 'kjv'))
+        return [(verse['verse'], verse['text']) for verse in verses]
+    return blueletterbible_page, parse, blb.metrics
+
+def run_chapter(recorder, session, parse, book, chapter):
+    """Fetch, parse and record one chapter as the downloaders do; returns the parsed verses"""
+    response = recorder.fetch(session, f"http://stand-in/kjv/{book}/{chapter}", attempt=1, timeout=15)
+    with recorder.timed('parse', 'parse_ms', version='kjv', book=book, chapter=chapter) as parsed:
+        verses = parse(response.text, book, chapter)
+        parsed['verses'] = len(verses)
+    recorder.event('chapter', version='kjv', book=book, chapter=chapter, outcome='done')
+    recorder.sleep(0, 'rate_limit')
+    return verses
+
+def measure(source, count, padding, every, result_file):
+    """Parse count pages in this process with the cyclic collector off; writes RSS samples to result_file"""
+    os.environ.update(METRICS_LOG='off', PROMETHEUS_TEXTFILE='', STATUS_PORT='',
+                      OUTPUT_DIR=tempfile.mkdtemp(prefix='bible-memory-'))
+    page, parse, recorder = parser_for(source)
+    session = PageSession(page, padding)
+    from bs4 import Tag
+
+    gc.collect()
+    gc.disable()
+    samples = []
+    wrong = 0
+    for index, (book, chapter) in enumerate(chapters(count), 1):
+        if run_chapter(recorder, session, parse, book, chapter) != synthetic_chapter('kjv', book, chapter):
+            wrong += 1
+        if index % every == 0 or index == count:
+            samples.append([index, round(current_rss_mb(), 2)])
+    live_tags = sum(1 for obj in gc.get_objects() if isinstance(obj, Tag))
+    gc.enable()
+    with open(result_file, 'w', encoding='utf-8') as f:
+        json.dump({'samples': samples, 'wrong': wrong, 'live_tags': live_tags}, f)
+
+def check_source(source, args):
+    """Run one downloader's parser in a child process; returns a list of failure messages"""
+    with tempfile.TemporaryDirectory(prefix='bible-memory-') as scratch:
+        result_file = Path(scratch) / 'result.json'
+        completed = subprocess.run([sys.executable, __file__, '--measure', source, str(result_file),
+                                    '--chapters', str(args.chapters), '--padding', str(args.padding),
+                                    '--every', str(args.every)],
+                                   cwd=str(Path(__file__).resolve().parent), stdout=subprocess.PIPE,
+                                   stderr=subprocess.STDOUT, text=True)
+        if completed.returncode != 0 or not result_file.exists():
+            return [f"{source}: parse run failed\n{completed.stdout.strip()}"]
+        with open(result_file, 'r', encoding='utf-8') as f:
+            result = json.load(f)
+
+    samples = result['samples']
+    start, baseline = next(((index, rss) for index, rss in samples if index >= args.warmup), samples[0])
+    growth = samples[-1][1] - baseline
+    per_100 = growth * 100 / max(samples[-1][0] - start, 1)
+    print(f"\n{source}: {args.chapters} chapter(s), {args.padding} KiB padding per page")
+    print('  ' + '  '.join(f"{index}:{rss:.1f}" for index, rss in samples) + ' (chapter:RSS MB)')
+    print(f"  RSS {baseline:.1f} MB after {args.warmup} chapter(s), {samples[-1][1]:.1f} MB at the end "
+          f"({growth:+.1f} MB, {per_100:+.3f} MB per 100 chapters), {result['live_tags']} live tag(s), "
+          f"{result['wrong']} wrong chapter(s)")
+
+    failures = []
+    if per_100 > args.max_growth_per_100:
+        failures.append(f"{source}: RSS grew {per_100:.3f} MB per 100 chapters after warm-up "
+                        f"(limit {args.max_growth_per_100:g} MB)")
+    if result['live_tags']:
+        failures.append(f"{source}: {result['live_tags']} BeautifulSoup tag(s) still alive after parsing")
+    if result['wrong']:
+        failures.append(f"{source}: {result['wrong']} chapter(s) parsed differently from the page")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Check that RSS stays flat while the downloaders fetch and parse many chapters')
+    parser.add_argument('--source', choices=SOURCES + ('both',), default='both', help='Parser to check (default: %(default)s)')
+    parser.add_argument('--chapters', type=int, default=1000, help='Chapters to parse (default: %(default)s)')
+    parser.add_argument('--warmup', type=int, default=100, help='Chapters before the RSS baseline (default: %(default)s)')
+    parser.add_argument('--padding', type=int, default=16, help='KiB of filler markup per page (default: %(default)s)')
+    parser.add_argument('--every', type=int, default=100, help='Chapters between RSS samples (default: %(default)s)')
+    parser.add_argument('--max-growth-per-100', type=float, default=0.1,
+                        help='Allowed RSS growth in MB per 100 chapters after warm-up (default: %(default)s)')
+    parser.add_argument('--measure', nargs=2, metavar=('SOURCE', 'RESULT_FILE'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.measure:
+        measure(args.measure[0], args.chapters, args.padding, args.every, args.measure[1])
+        return
+
+    failures = []
+    for source in (SOURCES if args.source == 'both' else (args.source,)):
+        failures.extend(check_source(source, args))
+
+    if failures:
+        print('\nMemory check failed:')
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('\nMemory check passed')
+
+if __name__ == '__main__':
+    main()
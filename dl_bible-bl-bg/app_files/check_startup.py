@@ -0,0 +1,145 @@
+#!/usr/bin/env python3
+"""
+Start-up regression check for the downloader and converter entry points.
+
+  python3 check_startup.py
+  python3 check_startup.py --max-wall-ms 80 --verbose
+
+Runs the listing, help and planning commands (and a bare import of each
+downloader, as a fetch worker starts) with `python -X importtime` and
+checks that:
+
+  - none of them imports a module it should not need: requests, bs4 and
+    http.server only load once something is fetched or served, cProfile and
+    pstats only with --profile, and the TXT conversion modules only when a
+    book is converted
+  - the script's own imports (everything after interpreter start-up) stay
+    within --max-import-ms, and the best-of-N wall time within --max-wall-ms
+
+Commands run in the app_files directory against an empty OUTPUT_DIR with
+the metrics log off, and with bytecode caching on (as a normal install has
+it), after one warm-up run. Exits 1 on any failure.
+"""
+
+import argparse
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+APP_DIR = Path(__file__).resolve().parent
+
+NETWORK_MODULES = ('requests', 'urllib3', 'bs4', 'http.server')
+PROFILE_MODULES = ('cProfile', 'pstats')
+CONVERSION_MODULES = ('strongs', 'search_index', 'chapter_index', 'precompress')
+
+# (label, arguments after python3, modules that must not be imported)
+COMMANDS = (
+    ('blb --list-versions', ['bible_blueletter_downloader.py', '--list-versions'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('blb --list-books', ['bible_blueletter_downloader.py', '--list-books'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('blb --dry-run', ['bible_blueletter_downloader.py', '--dry-run', '--version', 'kjv', '--book', 'ruth'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('bg --help', ['bible_gateway_downloader.py', '--help'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('bg --dry-run', ['bible_gateway_downloader.py', 'kjv', '--book', 'ruth', '--dry-run'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('import bg worker', ['-c', 'import bible_gateway_downloader'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('import blb worker', ['-c', 'import bible_blueletter_downloader'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+    ('converter --help', ['convert_bibles_json_to_txt.py', '--help'],
+     NETWORK_MODULES + PROFILE_MODULES),
+    ('planner', ['download_planner.py', '--help'],
+     NETWORK_MODULES + PROFILE_MODULES + CONVERSION_MODULES),
+)
+
+def parse_importtime(stderr):
+    """[(depth, module, self_us, cumulative_us)] imported after interpreter start-up ('site')"""
+    entries = []
+    for line in stderr.splitlines():
+        if not line.startswith('import time:') or 'imported package' in line:
+            continue
+        self_us, cumulative_us, name = line[len('import time:'):].split('|', 2)
+        depth = (len(name) - len(name.lstrip(' ')) - 1) // 2
+        module = name.strip()
+        if depth == 0 and module == 'site':
+            entries = []
+            continue
+        entries.append((depth, module, int(self_us), int(cumulative_us)))
+    return entries
+
+def run(arguments, env):
+    return subprocess.run([sys.executable] + arguments, cwd=str(APP_DIR), env=env, stdin=subprocess.DEVNULL,
+                          stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True)
+
+def best_wall_ms(arguments, env, runs):
+    walls = []
+    for _ in range(runs):
+        start = time.perf_counter()
+        run(arguments, env)
+        walls.append((time.perf_counter() - start) * 1000)
+    return min(walls)
+
+def check_command(label, arguments, forbidden, env, args):
+    """Print one command's figures; returns a list of failure messages"""
+    run(arguments, env)  # warm-up, writes the .pyc files
+    traced = run(['-X', 'importtime'] + arguments, env)
+    if traced.returncode != 0:
+        return [f"{label}: exit code {traced.returncode}\n{traced.stderr.strip()}"]
+    entries = parse_importtime(traced.stderr)
+    modules = {module for _, module, _, _ in entries}
+    import_ms = sum(cumulative for depth, _, _, cumulative in entries if depth == 0) / 1000
+
+    wall_ms = best_wall_ms(arguments, env, args.runs)
+
+    failures = []
+    unwanted = sorted(module for module in forbidden if module in modules)
+    if unwanted:
+        failures.append(f"{label}: imports {', '.join(unwanted)}")
+    if import_ms > args.max_import_ms:
+        failures.append(f"{label}: imports take {import_ms:.1f} ms (limit {args.max_import_ms:g} ms)")
+    if wall_ms > args.max_wall_ms:
+        failures.append(f"{label}: starts in {wall_ms:.0f} ms (limit {args.max_wall_ms:g} ms)")
+
+    print(f"  {label:<22} wall {wall_ms:6.1f} ms   imports {import_ms:6.1f} ms   {len(modules):3d} module(s)"
+          f"   {'FAIL' if failures else 'ok'}")
+    if args.verbose or failures:
+        top = sorted((entry for entry in entries if entry[0] == 0), key=lambda entry: -entry[3])[:5]
+        for _, module, _, cumulative in top:
+            print(f"      {cumulative / 1000:6.1f} ms  {module}")
+    return failures
+
+def main():
+    parser = argparse.ArgumentParser(description='Check start-up imports and time of the CLI entry points')
+    parser.add_argument('--max-wall-ms', type=float, default=100, help='Wall time limit per command (default: %(default)s)')
+    parser.add_argument('--max-import-ms', type=float, default=60, help='Import time limit per command (default: %(default)s)')
+    parser.add_argument('--runs', type=int, default=5, help='Timed runs per command, best counts (default: %(default)s)')
+    parser.add_argument('--verbose', action='store_true', help='Show the slowest top-level imports of every command')
+    args = parser.parse_args()
+
+    scratch = tempfile.mkdtemp(prefix='bible-startup-')
+    env = dict(os.environ, OUTPUT_DIR=scratch, METRICS_LOG='off', PROMETHEUS_TEXTFILE='', STATUS_PORT='')
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+    print(f"Interpreter start-up: {best_wall_ms(['-c', 'pass'], env, args.runs):.1f} ms")
+
+    failures = []
+    try:
+        for label, arguments, forbidden in COMMANDS:
+            failures.extend(check_command(label, arguments, forbidden, env, args))
+    finally:
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    if failures:
+        print('\nStart-up check failed:')
+        for failure in failures:
+            print(f"  {failure}")
+        sys.exit(1)
+    print('\nStart-up check passed')
+
+if __name__ == '__main__':
+    main()
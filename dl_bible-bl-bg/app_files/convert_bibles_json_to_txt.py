@@ -16,27 +16,13 @@ import os
 import json
 import re
 import sys
-import configparser
+import argparse
 from pathlib import Path
 
-def load_config():
-    config = configparser.ConfigParser()
-    base_dir = Path(__file__).parent.parent
-    config_file = base_dir / 'options.cfg'
-    if config_file.exists():
-        try:
-            config.read(str(config_file))
-        except configparser.ParsingError:
-            pass
-    return config
-
-config = load_config()
+import app_config
 
 def get_config_value(key, default):
-    try:
-        return config.get('DEFAULT', key, fallback=default)
-    except:
-        return default
+    return app_config.get_config_value('DEFAULT', key, default)
 
 script_dir = Path(__file__).parent.parent
 sys.path.insert(0, str(script_dir))
@@ -46,8 +32,22 @@ try:
 except ImportError:
     HAS_VERSION_LANGUAGES = False
 
+from precompress import precompress_file
+from chapter_index import write_chapter_index
+from verse_store import build_translation_store
+from search_index import build_translation_indexes
+from strongs import StrongsConcordance, concordance_path
+from versification import write_alignment
+from cross_references import CrossReferenceCollector
+from build_manifest import write_manifest
+from metrics import MetricsRecorder, resolve_log_path
+from profiling import add_profile_argument, attach_profiler
+
 AUTO_CONVERT_TO_TXT = os.environ.get('AUTO_CONVERT_TO_TXT', get_config_value('auto_convert_to_txt', 'true')).lower() == 'true'
 OUTPUT_DIR = os.environ.get('OUTPUT_DIR', get_config_value('output_dir', 'bible_downloads')).strip('"').strip("'")
+METRICS_LOG = os.environ.get('METRICS_LOG', get_config_value('metrics_log', ''))
+
+metrics = MetricsRecorder('converter', resolve_log_path(METRICS_LOG, 'converter'))
 
 def resolve_output_dir(output_subpath=''):
     """Resolve output directory - absolute paths used as-is, relative paths resolved from cwd."""
@@ -294,6 +294,25 @@ BOOK_ABBREV_MAP = {
     'revelation': ['Apoc', 'Rev'],
 }
 
+# Abbreviations some sources use regardless of book (e.g. "Ch 3:" in Chronicles)
+ALT_ABBREVS = ['Ch', 'Chr', 'Co']
+
+_reference_matchers = {}
+
+def get_reference_matcher(text_abbrevs, chapter):
+    """Return a compiled regex matching a leading "Abbrev Chapter:" reference.
+
+    Matchers are built once per abbreviation list and chapter and reused for
+    every verse of that chapter.
+    """
+    key = (tuple(text_abbrevs), chapter)
+    matcher = _reference_matchers.get(key)
+    if matcher is None:
+        alternatives = '|'.join(re.escape(abbrev) for abbrev in list(text_abbrevs) + ALT_ABBREVS)
+        matcher = re.compile(f"(?:{alternatives}) {re.escape(str(chapter))}:")
+        _reference_matchers[key] = matcher
+    return matcher
+
 def clean_verse_text(text):
     """Clean verse text by removing duplicate headings and footnote markers"""
     cleaned = text
@@ -366,8 +385,12 @@ def process_opengnt_file(data, chapter_file):
     return lines
 
 
-def process_chapter_file(chapter_file):
-    """Process a single chapter JSON file and return list of formatted lines"""
+def process_chapter_file(chapter_file, book_num=None, cross_references=None):
+    """Process a single chapter JSON file and return list of formatted lines.
+
+    If a CrossReferenceCollector is given, the cross-references and footnotes
+    captured by the BibleGateway downloader are recorded in it under book_num.
+    """
     with open(chapter_file, 'r', encoding='utf-8') as f:
         data = json.load(f)
     
@@ -383,38 +406,27 @@ def process_chapter_file(chapter_file):
     
     text_abbrevs = BOOK_ABBREV_MAP.get(data['book'], [book_abbrev])
     
+    reference_matcher = get_reference_matcher(text_abbrevs, chapter)
+    
     for verse_data in data['verses']:
         verse = verse_data['verse']
         text = clean_verse_text(verse_data['text'])
+        if cross_references is not None:
+            cross_references.add_verse_data(book_num, chapter, verse_data)
         
-        # Build patterns for all possible abbreviations
-        all_patterns = []
-        for abbrev in text_abbrevs:
-            all_patterns.append(f"{abbrev} {chapter}:")
-        
-        alt_abbrev_patterns = [
-            f"Ch {chapter}:",
-            f"Chr {chapter}:",
-            f"Co {chapter}:",
-        ]
-        
-        matched = False
-        for pattern in all_patterns + alt_abbrev_patterns:
-            if text.startswith(pattern):
-                match_text = text[len(pattern):].lstrip()
-                space_pos = match_text.find(' ')
-                if space_pos > 0:
-                    verse_in_text = match_text[:space_pos]
-                    remainder = match_text[space_pos+1:].lstrip()
-                    if remainder.startswith('- '):
-                        remainder = remainder[2:].lstrip()
-                    lines.append(f"{book_name} {chapter}:{verse_in_text} {remainder}")
-                else:
-                    lines.append(f"{book_name} {chapter}:{verse} {text}")
-                matched = True
-                break
-        
-        if not matched:
+        match = reference_matcher.match(text)
+        if match:
+            match_text = text[match.end():].lstrip()
+            space_pos = match_text.find(' ')
+            if space_pos > 0:
+                verse_in_text = match_text[:space_pos]
+                remainder = match_text[space_pos+1:].lstrip()
+                if remainder.startswith('- '):
+                    remainder = remainder[2:].lstrip()
+                lines.append(f"{book_name} {chapter}:{verse_in_text} {remainder}")
+            else:
+                lines.append(f"{book_name} {chapter}:{verse} {text}")
+        else:
             lines.append(f"{book_name} {chapter}:{verse} {text}")
     
     return lines
@@ -449,6 +461,23 @@ def detect_books(json_path):
         'ending_book': ending_book
     }
 
+def write_book_file(output_file, lines):
+    """Write a book's TXT file (left untouched if unchanged) and refresh its precompressed siblings and chapter index"""
+    content = ('\n'.join(lines) + '\n').encode('utf-8')
+    try:
+        with open(output_file, 'rb') as f:
+            unchanged = f.read() == content
+    except FileNotFoundError:
+        unchanged = False
+    
+    if not unchanged:
+        with metrics.timed('write', 'write_ms', path=output_file, bytes=len(content)):
+            with open(output_file, 'wb') as f:
+                f.write(content)
+    with metrics.timed('phase', 'ms', name='precompress'):
+        precompress_file(output_file)
+    write_chapter_index(output_file, content)
+
 def convert_translation(language, translation, json_base, bible_base):
     """Convert all books for a specific language and translation"""
     json_path = os.path.join(json_base, language, translation)
@@ -466,6 +495,10 @@ def convert_translation(language, translation, json_base, bible_base):
     
     print(f"  Detected {metadata['total_books']} books ({book_type}) - starting from book {starting_book}")
     
+    # Strong's tags are recorded here and stripped from the display text
+    concordance = StrongsConcordance()
+    cross_references = CrossReferenceCollector()
+    
     book_dirs = sorted([d for d in os.listdir(json_path) if os.path.isdir(os.path.join(json_path, d))])
     json_files = sorted([f for f in os.listdir(json_path) if f.endswith('.json') and os.path.isfile(os.path.join(json_path, f))])
     
@@ -490,11 +523,14 @@ def convert_translation(language, translation, json_base, bible_base):
             all_lines = []
             for chapter_file in chapter_files:
                 chapter_path = os.path.join(json_path, book_dir, chapter_file)
-                lines = process_chapter_file(chapter_path)
+                with metrics.timed('parse', 'parse_ms', version=translation, book=book_num, file=chapter_file) as parsed:
+                    lines = process_chapter_file(chapter_path, book_num, cross_references)
+                    parsed['verses'] = len(lines)
                 all_lines.extend(lines)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(all_lines) + '\n')
+            with metrics.profiled('normalise'):
+                all_lines = concordance.extract_lines(book_num, all_lines)
+            write_book_file(output_file, all_lines)
             
             print(f"  Created {output_filename} ({len(all_lines)} verses)")
     
@@ -513,7 +549,9 @@ def convert_translation(language, translation, json_base, bible_base):
                 books_processed[book_num] = {'book_key': book_key, 'lines': []}
             
             chapter_path = os.path.join(json_path, json_file)
-            lines = process_chapter_file(chapter_path)
+            with metrics.timed('parse', 'parse_ms', version=translation, book=book_num, file=json_file) as parsed:
+                lines = process_chapter_file(chapter_path, book_num, cross_references)
+                parsed['verses'] = len(lines)
             books_processed[book_num]['lines'].extend(lines)
         
         for book_num in sorted(books_processed.keys()):
@@ -523,12 +561,40 @@ def convert_translation(language, translation, json_base, bible_base):
             output_filename = f"{book_num:02d}-{book_key}-{translation}.txt"
             output_file = os.path.join(bible_path, output_filename)
             
-            with open(output_file, 'w', encoding='utf-8') as f:
-                f.write('\n'.join(all_lines) + '\n')
+            with metrics.profiled('normalise'):
+                all_lines = concordance.extract_lines(book_num, all_lines)
+            write_book_file(output_file, all_lines)
             
             print(f"  Created {output_filename} ({len(all_lines)} verses)")
+    
+    with metrics.timed('phase', 'ms', name='strongs', version=translation):
+        if concordance.write(concordance_path(bible_path, translation)):
+            print(f"  Created {translation}.strongs.json ({len(concordance)} Strong's numbers)")
+    
+    with metrics.timed('phase', 'ms', name='cross_references', version=translation):
+        for path in cross_references.write(bible_path, translation):
+            print(f"  Created {os.path.basename(path)}")
+    
+    with metrics.timed('phase', 'ms', name='alignment', version=translation):
+        align_file, written = write_alignment(language, bible_path, translation)
+        precompress_file(align_file)
+    print(f"  {'Created' if written else 'Unchanged'} {os.path.basename(align_file)}")
+    
+    with metrics.timed('phase', 'ms', name='verse_store', version=translation):
+        store_file, rebuilt = build_translation_store(bible_path, translation)
+    print(f"  {'Created' if rebuilt else 'Unchanged'} {os.path.basename(store_file)}")
+
+    with metrics.timed('phase', 'ms', name='search_index', version=translation):
+        indexes = build_translation_indexes(language, bible_path, translation)
+    for index_file, rebuilt in indexes:
+        print(f"  {'Created' if rebuilt else 'Unchanged'} {os.path.basename(index_file)}")
 
 def main():
+    parser = argparse.ArgumentParser(description='Convert the downloaded JSON Bibles to TXT and rebuild the derived files')
+    add_profile_argument(parser)
+    args = parser.parse_args()
+    attach_profiler(metrics, args.profile)
+    
     json_base = resolve_output_dir('json_bibles')
     bible_base = resolve_output_dir('txt_bibles')
     
@@ -543,7 +609,11 @@ def main():
         
         for translation in sorted(translations):
             print(f"Processing {language}/{translation}...")
-            convert_translation(language, translation, json_base, bible_base)
+            with metrics.profiled('convert'):
+                convert_translation(language, translation, json_base, bible_base)
+    
+    with metrics.timed('phase', 'ms', name='manifest'):
+        write_manifest(bible_base)
     
     print("\nConversion complete!")
 
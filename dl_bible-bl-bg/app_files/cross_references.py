@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Cross-reference graph and footnotes captured from BibleGateway pages.
+
+The BibleGateway parser records each verse's cross-reference targets (OSIS
+references such as 'Job.38.4-Job.38.7') and footnote texts in the chapter
+JSON files. The converter compiles them per translation into:
+
+  txt_bibles/{language}/{translation}/{translation}.xref
+  txt_bibles/{language}/{translation}/{translation}.footnotes.json
+
+.xref layout (all integers little-endian), CSR-style over verse keys:
+  header         magic 'BXR1', u16 format version, u16 reserved,
+                 u32 source verse count, u32 target count
+  source keys    source verse count x u32 verse keys, ascending
+  offsets        (source verse count + 1) x u32 indexes into the targets
+  target starts  target count x u32 first verse key of each target passage
+  target ends    target count x u32 last verse key of each target passage
+
+The targets of source verse i are targets[offsets[i]:offsets[i + 1]], so the
+related passages of a verse are one binary search and one slice. An end
+verse of 999 means "to the end of the chapter" and an end chapter of 999
+"to the end of the book".
+
+footnotes.json is {"format": 1, "notes": {"43003016": ["Or ...", ...], ...}}.
+"""
+
+import argparse
+import json
+import os
+import struct
+import sys
+from array import array
+from bisect import bisect_left
+from pathlib import Path
+
+from bible_references import format_passage, parse_osis_reference, parse_single_reference
+from txt_corpus import list_translations, split_verse_key, verse_key
+
+MAGIC = b'BXR1'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sHHII')
+
+# Stand-in verse and chapter number for ranges that run to the end of a chapter or book
+OPEN_END = 999
+
+def xref_path(translation_path, translation):
+    """Path of the cross-reference graph for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.xref")
+
+def footnotes_path(translation_path, translation):
+    """Path of the footnotes file for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.footnotes.json")
+
+def passage_keys(passage):
+    """(start key, end key) of a passage tuple"""
+    book, c1, v1, c2, v2 = passage
+    if c2 is None:
+        return verse_key(book, c1, v1), verse_key(book, OPEN_END, OPEN_END)
+    return verse_key(book, c1, v1), verse_key(book, c2, OPEN_END if v2 is None else v2)
+
+def keys_passage(start, end):
+    """Passage tuple of a (start key, end key) target"""
+    book, c1, v1 = split_verse_key(start)
+    _, c2, v2 = split_verse_key(end)
+    if c2 == OPEN_END:
+        return book, c1, v1, None, None
+    return book, c1, v1, c2, None if v2 == OPEN_END else v2
+
+def _u32_array(data):
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _array_bytes(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def _write_if_changed(output_file, content):
+    """Atomically write content unless the file already holds it; empty content removes the file"""
+    if not content:
+        if os.path.exists(output_file):
+            os.remove(output_file)
+        return False
+    try:
+        with open(output_file, 'rb') as f:
+            if f.read() == content:
+                return False
+    except FileNotFoundError:
+        pass
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(content)
+    os.replace(temp_file, output_file)
+    return True
+
+class CrossReferenceCollector:
+    """Cross-references and footnotes gathered verse by verse while a translation is converted"""
+
+    def __init__(self):
+        self.targets = {}
+        self.notes = {}
+
+    def __len__(self):
+        return len(self.targets)
+
+    def add(self, key, crossrefs=(), footnotes=()):
+        """Record one verse's OSIS cross-reference targets and footnote texts"""
+        for osis in crossrefs:
+            passage = parse_osis_reference(osis)
+            if passage:
+                targets = self.targets.setdefault(key, [])
+                target = passage_keys(passage)
+                if target not in targets:
+                    targets.append(target)
+        for note in footnotes:
+            if note:
+                self.notes.setdefault(key, []).append(note)
+
+    def add_verse_data(self, book, chapter, verse_data):
+        """Record the 'crossrefs' / 'footnotes' lists of a chapter JSON verse entry"""
+        crossrefs = verse_data.get('crossrefs') or ()
+        footnotes = verse_data.get('footnotes') or ()
+        if crossrefs or footnotes:
+            self.add(verse_key(book, chapter, verse_data['verse']), crossrefs, footnotes)
+
+    def pack(self):
+        """Bytes of the .xref graph (empty if there are no cross-references)"""
+        if not self.targets:
+            return b''
+        sources = array('I', sorted(self.targets))
+        offsets = array('I', [0])
+        starts = array('I')
+        ends = array('I')
+        for key in sources:
+            for start, end in self.targets[key]:
+                starts.append(start)
+                ends.append(end)
+            offsets.append(len(starts))
+        packed = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, 0, len(sources), len(starts)))
+        for values in (sources, offsets, starts, ends):
+            packed += _array_bytes(values)
+        return bytes(packed)
+
+    def footnotes_json(self):
+        if not self.notes:
+            return b''
+        notes = {str(key): self.notes[key] for key in sorted(self.notes)}
+        return json.dumps({'format': FORMAT_VERSION, 'notes': notes}, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+    def write(self, translation_path, translation):
+        """Write the .xref graph and footnotes file; returns the paths that changed"""
+        written = []
+        for path, content in ((xref_path(translation_path, translation), self.pack()),
+                              (footnotes_path(translation_path, translation), self.footnotes_json())):
+            if _write_if_changed(path, content):
+                written.append(path)
+        return written
+
+class CrossReferenceGraph:
+    """Read-only view over a translation's .xref graph"""
+
+    def __init__(self, data):
+        magic, version, _, source_count, target_count = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a cross-reference graph")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported cross-reference graph version {version}")
+
+        offset = HEADER.size
+        sections = []
+        for count in (source_count, source_count + 1, target_count, target_count):
+            sections.append(_u32_array(data[offset:offset + count * 4]))
+            offset += count * 4
+        self.source_keys, self._offsets, self._starts, self._ends = sections
+
+    @classmethod
+    def open(cls, path):
+        """Read a graph file"""
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def __len__(self):
+        return len(self.source_keys)
+
+    def targets(self, book, chapter, verse):
+        """(start key, end key) targets of one verse, in page order"""
+        key = verse_key(book, chapter, verse)
+        i = bisect_left(self.source_keys, key)
+        if i == len(self.source_keys) or self.source_keys[i] != key:
+            return []
+        first, last = self._offsets[i], self._offsets[i + 1]
+        return list(zip(self._starts[first:last], self._ends[first:last]))
+
+    def related(self, book, chapter, verse):
+        """Related passages of one verse as passage tuples"""
+        return [keys_passage(start, end) for start, end in self.targets(book, chapter, verse)]
+
+def load_footnotes(path):
+    """verse key -> footnote texts from a footnotes file (empty if it is missing)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            data = json.load(f)
+    except FileNotFoundError:
+        return {}
+    if data.get('format') != FORMAT_VERSION:
+        raise ValueError(f"Unsupported footnotes format {data.get('format')}")
+    return {int(key): notes for key, notes in data.get('notes', {}).items()}
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='List the cross-references and footnotes of a verse')
+    parser.add_argument('reference', help='Verse reference, e.g. "John 3:16"')
+    parser.add_argument('--txt-bibles', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--version', '-v', action='append', help='Translation to read (repeatable, default: all)')
+    args = parser.parse_args()
+
+    passage = parse_single_reference(args.reference)
+    if passage is None:
+        parser.error(f"Could not parse reference '{args.reference}'")
+    book, chapter, verse = passage[:3]
+
+    found = False
+    for _, translation, translation_path in list_translations(args.txt_bibles):
+        if args.version and translation not in args.version:
+            continue
+        graph_file = xref_path(translation_path, translation)
+        if not os.path.exists(graph_file):
+            continue
+        found = True
+        related = CrossReferenceGraph.open(graph_file).related(book, chapter, verse)
+        notes = load_footnotes(footnotes_path(translation_path, translation)).get(verse_key(book, chapter, verse), [])
+        print(f"{translation}: {len(related)} cross-reference(s), {len(notes)} footnote(s)")
+        if related:
+            print(f"  {'; '.join(format_passage(target) for target in related)}")
+        for note in notes:
+            print(f"  * {note}")
+    if not found:
+        print("No cross-reference graphs found - convert a BibleGateway translation downloaded with cross-references first")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Download planning: what is still missing, how many requests it takes and how long.
+
+The work units are chapters. A version's plan is every chapter its source
+offers (the downloader's book table, limited to the testaments the version
+covers) minus the chapter JSON files already on disk:
+
+  json_bibles/{language}/{version}/{version}_{NN}-{book}/{version}_{NN}-{book}_chapter-{CC}.json
+
+Durations come from earlier runs: for each host, the wall time of a run
+divided by the chapters it finished, so rate-limit sleeps and retries are
+included. ProgressEta appends one line per run to THROUGHPUT_FILE next to the
+metrics logs (see metrics.py) when the run finishes, so planning reads that
+small file instead of every past log. Without history the estimate falls
+back to DEFAULT_SECONDS_PER_CHAPTER, which matches the downloaders' pacing.
+During a run ProgressEta also turns the rolling completion rate into a live
+ETA.
+
+  python3 download_planner.py            # measured throughput per host
+"""
+
+import argparse
+import json
+import os
+import time
+from collections import deque
+
+from metrics import DEFAULT_METRICS_DIR
+
+# Seconds per chapter when no run has been measured yet (request + rate-limit sleeps)
+DEFAULT_SECONDS_PER_CHAPTER = {
+    'www.biblegateway.com': 2.5,
+    'www.blueletterbible.org': 3.5,
+}
+FALLBACK_SECONDS_PER_CHAPTER = 3.0
+
+# Runs that finished fewer chapters than this say little about throughput
+MIN_HISTORY_CHAPTERS = 5
+
+# One {"ts", "host", "chapters", "seconds", "requests"} line per finished run
+THROUGHPUT_FILE = 'throughput-history.jsonl'
+
+def chapter_file_path(json_base, language, version, book_num, book, chapter):
+    """Path of a downloaded chapter JSON file"""
+    book_dir = os.path.join(json_base, language, version, f"{version}_{book_num:02d}-{book}")
+    return os.path.join(book_dir, f"{version}_{book_num:02d}-{book}_chapter-{chapter:02d}.json")
+
+def missing_chapters(json_base, language, version, books, only_chapter=None):
+    """(book, chapter) pairs of books [(book_num, book, chapter_count)] that have no chapter file yet"""
+    missing = []
+    for book_num, book, chapter_count in books:
+        book_dir = os.path.dirname(chapter_file_path(json_base, language, version, book_num, book, 1))
+        existing = set(os.listdir(book_dir)) if os.path.isdir(book_dir) else set()
+        chapters = [only_chapter] if only_chapter else range(1, chapter_count + 1)
+        for chapter in chapters:
+            if os.path.basename(chapter_file_path(json_base, language, version, book_num, book, chapter)) not in existing:
+                missing.append((book, chapter))
+    return missing
+
+def testaments_on_disk(json_base, language, version, last_ot_book=39):
+    """'ot' or 'nt' if the downloaded books of a version are all from one testament, else None"""
+    version_dir = os.path.join(json_base, language, version)
+    numbers = set()
+    if os.path.isdir(version_dir):
+        for name in os.listdir(version_dir):
+            number = name[len(version) + 1:].split('-', 1)[0]
+            if number.isdigit():
+                numbers.add(int(number))
+    if numbers and max(numbers) <= last_ot_book:
+        return 'ot'
+    if numbers and min(numbers) > last_ot_book:
+        return 'nt'
+    return None
+
+def throughput_path(log_path):
+    """Throughput history next to a metrics log, or None while metrics logging is off"""
+    if log_path is None:
+        return None
+    return os.path.join(os.path.dirname(os.path.abspath(str(log_path))), THROUGHPUT_FILE)
+
+def record_run(history_file, host, chapters, seconds, requests):
+    """Append one run's throughput to a history file"""
+    line = json.dumps({'ts': round(time.time(), 3), 'host': host, 'chapters': chapters,
+                       'seconds': round(seconds, 3), 'requests': requests}) + '\n'
+    os.makedirs(os.path.dirname(history_file), exist_ok=True)
+    # One short append per run, so concurrent downloaders do not interleave
+    with open(history_file, 'a', encoding='utf-8') as f:
+        f.write(line)
+
+def load_history(metrics_dir=DEFAULT_METRICS_DIR):
+    """host -> {'runs', 'chapters', 'seconds', 'requests'} from the throughput history of earlier runs"""
+    history = {}
+    try:
+        with open(os.path.join(str(metrics_dir), THROUGHPUT_FILE), 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    run = json.loads(line)
+                except ValueError:
+                    continue
+                if run.get('chapters', 0) < MIN_HISTORY_CHAPTERS or not run.get('host'):
+                    continue
+                entry = history.setdefault(run['host'], {'runs': 0, 'chapters': 0, 'seconds': 0.0, 'requests': 0})
+                entry['runs'] += 1
+                entry['chapters'] += run['chapters']
+                entry['seconds'] += run['seconds']
+                entry['requests'] += run.get('requests', 0)
+    except OSError:
+        pass
+    return history
+
+def host_rates(host, history=None):
+    """(seconds per chapter, requests per chapter, basis text) for a host"""
+    entry = (history or {}).get(host)
+    if entry and entry['chapters']:
+        return (entry['seconds'] / entry['chapters'], entry['requests'] / entry['chapters'],
+                f"measured over {entry['runs']} run(s), {entry['chapters']} chapters")
+    return DEFAULT_SECONDS_PER_CHAPTER.get(host, FALLBACK_SECONDS_PER_CHAPTER), 1.0, "default pacing, no measured runs yet"
+
+def format_duration(seconds):
+    seconds = int(round(seconds))
+    if seconds < 60:
+        return f"{seconds}s"
+    minutes, seconds = divmod(seconds, 60)
+    if minutes < 60:
+        return f"{minutes}m {seconds:02d}s"
+    hours, minutes = divmod(minutes, 60)
+    if hours < 48:
+        return f"{hours}h {minutes:02d}m"
+    days, hours = divmod(hours, 24)
+    return f"{days}d {hours}h"
+
+def print_plan(source, host, plans, extra_requests=0, history=None):
+    """Print a per-version plan [(version, planned chapters, missing chapters, note)] with its ETA; returns (requests, seconds)"""
+    seconds_per_chapter, requests_per_chapter, basis = host_rates(host, history if history is not None else load_history())
+    print(f"\nPlan for {source} ({host}):")
+    total_missing = 0
+    for version, planned, missing, note in plans:
+        total_missing += missing
+        status = 'complete' if not missing else f"{missing} missing"
+        print(f"  {version.upper():<10} {planned:5d} chapters, {status:<14}{('  ' + note) if note else ''}")
+    requests = round(total_missing * requests_per_chapter) + extra_requests
+    seconds = total_missing * seconds_per_chapter
+    print(f"Total: {total_missing} chapter(s) to fetch, ~{requests} request(s), "
+          f"~{format_duration(seconds)} at {seconds_per_chapter:.1f}s/chapter ({basis})")
+    return requests, seconds
+
+class ProgressEta:
+    """Live ETA from the rolling chapter completion rate, fed with metric events
+
+    With a history_file, the run's throughput is appended to it at close().
+    """
+
+    def __init__(self, host, every=10, window=100, history_file=None):
+        self.host = host
+        self.every = every
+        self.history_file = history_file
+        self.completed = deque(maxlen=window)
+        self.planned = 0
+        self.finished = 0
+        self.seconds_per_chapter = None
+        self.run_started = None
+        self.run_requests = 0
+        self.run_done = 0
+        self.last_done = None
+
+    def observe(self, record):
+        kind = record.get('event')
+        if kind in ('plan', 'request') and self.run_started is None:
+            self.run_started = record['ts']
+        if kind == 'request':
+            self.run_requests += 1
+        elif kind == 'plan':
+            if self.seconds_per_chapter is None:
+                self.seconds_per_chapter = host_rates(self.host, load_history())[0]
+            self.planned += record['chapters']
+        elif kind == 'chapter':
+            if record.get('outcome') == 'skipped':
+                # Already on disk: neither work done nor work left
+                self.planned -= 1
+                return
+            self.finished += 1
+            if record.get('outcome') == 'done':
+                self.completed.append(record['ts'])
+                self.run_done += 1
+                self.last_done = record['ts']
+            if self.every and self.finished % self.every == 0:
+                print(f"  Progress: {self.summary()}")
+        elif kind == 'version_done':
+            # Chapters skipped after a failure are no longer coming
+            self.planned = self.finished
+
+    def rate(self):
+        """Chapters per second over the recent window, or the historical rate until there is one"""
+        if len(self.completed) >= 2 and self.completed[-1] > self.completed[0]:
+            return (len(self.completed) - 1) / (self.completed[-1] - self.completed[0])
+        return 1 / self.seconds_per_chapter if self.seconds_per_chapter else None
+
+    def summary(self):
+        remaining = max(self.planned - self.finished, 0)
+        rate = self.rate()
+        if not rate:
+            return f"{self.finished}/{self.planned} chapters, ETA unknown"
+        seconds = remaining / rate
+        finish = time.strftime('%H:%M', time.localtime(time.time() + seconds))
+        return f"{self.finished}/{self.planned} chapters, {rate * 60:.1f}/min, ETA {format_duration(seconds)} (about {finish})"
+
+    def close(self):
+        if self.history_file and self.run_done:
+            try:
+                record_run(self.history_file, self.host, self.run_done, self.last_done - self.run_started, self.run_requests)
+            except OSError as e:
+                print(f"Warning: could not record throughput in {self.history_file}: {e}")
+
+def main():
+    parser = argparse.ArgumentParser(description='Show the download throughput measured per host')
+    parser.add_argument('--metrics-dir', default=str(DEFAULT_METRICS_DIR), help='Directory of metrics logs (default: %(default)s)')
+    args = parser.parse_args()
+
+    history = load_history(args.metrics_dir)
+    if not history:
+        print(f"No runs with at least {MIN_HISTORY_CHAPTERS} finished chapters in {args.metrics_dir}")
+    for host, entry in sorted(history.items()):
+        print(f"{host}: {entry['seconds'] / entry['chapters']:.2f}s/chapter, "
+              f"{entry['requests'] / entry['chapters']:.2f} requests/chapter ({entry['runs']} run(s), {entry['chapters']} chapters)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,247 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for Bible Gateway and Blue Letter Bible, for benchmarking the
+downloaders without touching the real sites.
+
+  python3 fake_upstream.py --port 8089 --latency 0.2 --jitter 0.1 --throttle-rate 0.05 --retry-after 2
+
+  /passage/?search=Ruth+1&version=KJV     Bible Gateway passage page
+  /kjv/rut/1/1/                           Blue Letter Bible chapter page
+  /_stats                                 JSON request counts by status
+
+Pages are synthetic: every chapter gets a verse count and verse texts derived
+from a hash of version, book and chapter (synthetic_chapter), in the markup
+the downloaders parse, padded with --padding KB of page chrome. With
+--recorded DIR a saved page is served instead where one exists, named after
+the URL-quoted request path (e.g. DIR/%2Fkjv%2Frut%2F1%2F1%2F.html).
+
+Each request waits --latency +/- --jitter seconds, then may be answered with
+429 (--throttle-rate) or 500/502/503 (--error-rate) instead of the page.
+429 and 503 carry Retry-After when --retry-after is set. --fail-first N fails
+the first N attempts at every URL, which exercises the retry paths
+deterministically. Point the downloaders at the server with
+BIBLEGATEWAY_BASE / BLUELETTER_BIBLE_BASE (see benchmark_downloads.py).
+"""
+
+import argparse
+import hashlib
+import html
+import json
+import os
+import random
+import re
+import threading
+import time
+from collections import Counter
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, quote, urlsplit
+
+# Blue Letter Bible abbreviations, as in bible_blueletter_downloader.get_blueletter_bible_abbrev
+BOOK_ABBREVIATIONS = {
+    'genesis': 'gen', 'exodus': 'exo', 'leviticus': 'lev', 'numbers': 'num', 'deuteronomy': 'deu',
+    'joshua': 'jos', 'judges': 'jdg', 'ruth': 'rut', '1-samuel': '1sa', '2-samuel': '2sa',
+    '1-kings': '1ki', '2-kings': '2ki', '1-chronicles': '1ch', '2-chronicles': '2ch',
+    'ezra': 'ezr', 'nehemiah': 'neh', 'esther': 'est', 'job': 'job', 'psalms': 'psa',
+    'proverbs': 'pro', 'ecclesiastes': 'ecc', 'song-of-solomon': 'sng', 'isaiah': 'isa', 'jeremiah': 'jer',
+    'lamentations': 'lam', 'ezekiel': 'eze', 'daniel': 'dan', 'hosea': 'hos', 'joel': 'joe', 'amos': 'amo',
+    'obadiah': 'oba', 'jonah': 'jon', 'micah': 'mic', 'nahum': 'nah', 'habakkuk': 'hab',
+    'zephaniah': 'zep', 'haggai': 'hag', 'zechariah': 'zec', 'malachi': 'mal',
+    'matthew': 'mat', 'mark': 'mar', 'luke': 'luk', 'john': 'jhn', 'acts': 'act',
+    'romans': 'rom', '1-corinthians': '1co', '2-corinthians': '2co', 'galatians': 'gal',
+    'ephesians': 'eph', 'philippians': 'phi', 'colossians': 'col', '1-thessalonians': '1th',
+    '2-thessalonians': '2th', '1-timothy': '1ti', '2-timothy': '2ti', 'titus': 'tit',
+    'philemon': 'phm', 'hebrews': 'heb', 'james': 'jas', '1-peter': '1pe', '2-peter': '2pe',
+    '1-john': '1jo', '2-john': '2jo', '3-john': '3jo', 'jude': 'jud', 'revelation': 'rev',
+}
+BOOKS_BY_ABBREVIATION = {abbrev: book for book, abbrev in BOOK_ABBREVIATIONS.items()}
+
+WORDS = ('and', 'the', 'of', 'unto', 'land', 'people', 'went', 'said', 'house', 'day', 'city', 'word',
+         'came', 'upon', 'their', 'sons', 'king', 'brought', 'water', 'field', 'bread', 'blessed')
+
+def synthetic_chapter(version, book, chapter):
+    """Deterministic [(verse, text)] of a chapter for a version"""
+    seed = hashlib.sha1(f"{version.lower()}|{book}|{chapter}".encode('utf-8')).digest()
+    rng = random.Random(seed)
+    verses = []
+    for verse in range(1, 10 + seed[0] % 30 + 1):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 30))]
+        verses.append((verse, f"{words[0].capitalize()} {' '.join(words[1:])}."))
+    return verses
+
+def padding_markup(kilobytes):
+    """Page chrome the parsers have to wade through, like the navigation of the real pages"""
+    item = '<li class="nav-item"><a href="/resources/">Resources and study tools</a></li>\n'
+    return '<ul class="site-nav">\n' + item * (kilobytes * 1024 // len(item)) + '</ul>\n'
+
+def biblegateway_page(version, book, chapter, padding=0):
+    """Passage page with one 'text {Book}-{chapter}-{verse}' span per verse, a verse number and some cross references"""
+    prefix = book.replace('-', '')[:3].title()
+    spans = []
+    crossrefs = []
+    for verse, text in synthetic_chapter(version, book, chapter):
+        number = f'<span class="chapternum">{chapter} </span>' if verse == 1 else f'<sup class="versenum">{verse} </sup>'
+        marker = ''
+        if verse % 5 == 0:
+            ref_id = f"cen-{version.upper()}-{verse}A"
+            marker = f'<sup class="crossreference" data-cr="#{ref_id}">(<a href="#{ref_id}">A</a>)</sup>'
+            crossrefs.append(f'<li id="{ref_id}"><a data-bibleref="{prefix}.{chapter}.{verse - 1}">{prefix} {chapter}:{verse - 1}</a></li>')
+        spans.append(f'<span id="en-{version.upper()}-{verse}" class="text {prefix}-{chapter}-{verse}">{number}{html.escape(text)}{marker}</span>')
+    return (f'<!DOCTYPE html><html><head><title>{book} {chapter} ({version.upper()})</title></head><body>\n'
+            f'{padding_markup(padding)}'
+            f'<div class="passage-content passage-class-0"><div class="version-{version.upper()} result-text-style-normal text-html">\n'
+            f'<p>{" ".join(spans)}</p>\n'
+            f'<div class="crossrefs hidden"><ol>{"".join(crossrefs)}</ol></div>\n'
+            f'</div></div></body></html>\n')
+
+def blueletterbible_page(version, book, chapter, padding=0):
+    """Chapter page with one data-bible-id div per verse"""
+    rows = []
+    for verse, text in synthetic_chapter(version, book, chapter):
+        rows.append(f'<div class="row" data-bible-id="{chapter:03d}{verse:03d}">'
+                    f'<div class="verse-num"><a href="/{version}/{BOOK_ABBREVIATIONS[book]}/{chapter}/{verse}/">{verse}</a></div>'
+                    f'<div class="scriptureText">{html.escape(text)}</div></div>')
+    return (f'<!DOCTYPE html><html><head><title>{book} {chapter} ({version.upper()})</title></head><body>\n'
+            f'{padding_markup(padding)}'
+            f'<div id="bibleTable">\n' + '\n'.join(rows) + '\n</div></body></html>\n')
+
+def route(path):
+    """(site, version, book, chapter) of a request path, or None"""
+    parts = urlsplit(path)
+    if parts.path.rstrip('/') == '/passage':
+        query = parse_qs(parts.query)
+        match = re.match(r'^(.+?)\s+(\d+)$', query.get('search', [''])[0].strip())
+        version = query.get('version', [''])[0]
+        if not match or not version:
+            return None
+        book = match.group(1).lower().replace(' ', '-')
+        if book not in BOOK_ABBREVIATIONS:
+            return None
+        return 'biblegateway', version.lower(), book, int(match.group(2))
+    match = re.match(r'^/([a-z0-9]+)/([a-z0-9]+)/(\d+)/\d+/?$', parts.path)
+    if match and match.group(2) in BOOKS_BY_ABBREVIATION:
+        return 'blueletterbible', match.group(1), BOOKS_BY_ABBREVIATION[match.group(2)], int(match.group(3))
+    return None
+
+class FakeUpstreamHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(self, *args, options=None, state=None, **kwargs):
+        self.options = options
+        self.state = state
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_body(self, body, status=HTTPStatus.OK, content_type='text/html; charset=utf-8', headers=()):
+        self.send_response(status)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        for name, value in headers:
+            self.send_header(name, value)
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+        with self.state['lock']:
+            self.state['statuses'][str(int(status))] += 1
+
+    def fault(self):
+        """Status to answer with instead of the page, or None"""
+        options = self.options
+        with self.state['lock']:
+            attempts = self.state['attempts']
+            attempts[self.path] += 1
+            if attempts[self.path] <= options.fail_first:
+                return HTTPStatus.SERVICE_UNAVAILABLE
+            roll = self.state['random'].random()
+            if roll < options.throttle_rate:
+                return HTTPStatus.TOO_MANY_REQUESTS
+            if roll < options.throttle_rate + options.error_rate:
+                return self.state['random'].choice((HTTPStatus.INTERNAL_SERVER_ERROR, HTTPStatus.BAD_GATEWAY,
+                                                    HTTPStatus.SERVICE_UNAVAILABLE))
+        return None
+
+    def do_GET(self):
+        if self.path == '/_stats':
+            with self.state['lock']:
+                stats = {'statuses': dict(self.state['statuses']), 'urls': len(self.state['attempts'])}
+            self.send_body(json.dumps(stats).encode('utf-8'), content_type='application/json; charset=utf-8')
+            return
+
+        options = self.options
+        delay = options.latency + random.uniform(-options.jitter, options.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        target = route(self.path)
+        if target is None:
+            self.send_body(b'<html><body>Not found</body></html>', HTTPStatus.NOT_FOUND)
+            return
+
+        status = self.fault()
+        if status is not None:
+            headers = []
+            if options.retry_after is not None and status in (HTTPStatus.TOO_MANY_REQUESTS, HTTPStatus.SERVICE_UNAVAILABLE):
+                headers.append(('Retry-After', str(options.retry_after)))
+            self.send_body(f'<html><body>{status.phrase}</body></html>'.encode('utf-8'), status, headers=headers)
+            return
+
+        if options.recorded:
+            recorded_file = os.path.join(options.recorded, quote(self.path, safe='') + '.html')
+            if os.path.exists(recorded_file):
+                with open(recorded_file, 'rb') as f:
+                    self.send_body(f.read())
+                return
+
+        site, version, book, chapter = target
+        page = biblegateway_page if site == 'biblegateway' else blueletterbible_page
+        self.send_body(page(version, book, chapter, options.padding).encode('utf-8'))
+
+    do_HEAD = do_GET
+
+class FakeUpstreamServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+def add_fault_arguments(parser):
+    """Latency and fault options, shared with benchmark_downloads.py"""
+    parser.add_argument('--latency', type=float, default=0.05, help='Seconds before each response (default: %(default)s)')
+    parser.add_argument('--jitter', type=float, default=0.02, help='Random +/- seconds on the latency (default: %(default)s)')
+    parser.add_argument('--throttle-rate', type=float, default=0.0, help='Fraction of requests answered 429 (default: %(default)s)')
+    parser.add_argument('--error-rate', type=float, default=0.0, help='Fraction of requests answered 500/502/503 (default: %(default)s)')
+    parser.add_argument('--retry-after', type=int, help='Retry-After seconds on 429 and 503 answers (default: none)')
+    parser.add_argument('--fail-first', type=int, default=0, help='Answer 503 to the first N attempts at each URL (default: %(default)s)')
+    parser.add_argument('--padding', type=int, default=40, help='KB of page chrome around the verses (default: %(default)s)')
+    parser.add_argument('--recorded', help='Directory of saved pages to serve instead of synthetic ones')
+    parser.add_argument('--seed', type=int, default=1, help='Seed for the fault injection (default: %(default)s)')
+
+def start_server(options, bind='127.0.0.1', port=0):
+    """Serve in a daemon thread; returns the server (server.server_address has the port)"""
+    state = {'lock': threading.Lock(), 'statuses': Counter(), 'attempts': Counter(), 'random': random.Random(options.seed)}
+    server = FakeUpstreamServer((bind, port), partial(FakeUpstreamHandler, options=options, state=state))
+    server.state = state
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+def main():
+    parser = argparse.ArgumentParser(description='Local stand-in for Bible Gateway and Blue Letter Bible')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=8089, help='Port (default: %(default)s)')
+    add_fault_arguments(parser)
+    args = parser.parse_args()
+
+    server = start_server(args, args.bind, args.port)
+    base = f"http://{args.bind}:{server.server_address[1]}/"
+    print(f"Fake upstream on {base}", flush=True)
+    print(f"  BIBLEGATEWAY_BASE={base} BLUELETTER_BIBLE_BASE={base}", flush=True)
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,254 @@
+#!/usr/bin/env python3
+"""
+Live progress of a download run for monitoring long mirror runs.
+
+LiveStatus is fed every metric event of a MetricsRecorder (see metrics.py)
+and keeps running counters:
+
+  - chapters planned, done, skipped, failed and pending per version
+  - requests by status and a request duration histogram
+  - the sleep currently in progress (rate limit or retry backoff)
+  - when the last chapter finished, for stall alerts
+
+They are published as a Prometheus textfile (for node_exporter's textfile
+collector) rewritten atomically at most every few seconds, and optionally
+on a small HTTP server:
+
+  /status    JSON snapshot with request and error rates over the last minute
+  /metrics   the same Prometheus text as the textfile
+
+Enable them with PROMETHEUS_TEXTFILE / prometheus_textfile (a path ending in
+.prom) and STATUS_PORT / status_port in options.cfg. The server binds to
+127.0.0.1 unless STATUS_BIND says otherwise.
+"""
+
+import json
+import os
+import threading
+import time
+from collections import Counter, deque
+
+# Request duration histogram bucket bounds, in seconds
+DURATION_BUCKETS = (0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+RATE_WINDOW = 60.0
+
+def _label_value(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(**labels):
+    return '{' + ','.join(f'{name}="{_label_value(value)}"' for name, value in labels.items()) + '}'
+
+class LiveStatus:
+    """Running counters of one downloader process, published as a Prometheus textfile and over HTTP"""
+
+    def __init__(self, tool, textfile=None, port=None, bind='127.0.0.1', interval=5.0):
+        self.tool = tool
+        self.textfile = textfile
+        self.port = port
+        self.bind = bind
+        self.interval = interval
+        self.started = time.time()
+        self.lock = threading.Lock()
+        self.planned = Counter()
+        self.outcomes = {}
+        self.finished_versions = set()
+        self.requests = Counter()
+        self.bucket_counts = [0] * len(DURATION_BUCKETS)
+        self.duration_count = 0
+        self.duration_sum = 0.0
+        self.recent = deque()
+        self.backoff = (0.0, None)
+        self.last_progress = self.started
+        self.last_written = 0.0
+        self.server = None
+
+    def observe(self, record):
+        """Update the counters from one metric event"""
+        if self.port and self.server is None:
+            self.serve()
+        kind = record.get('event')
+        with self.lock:
+            if kind == 'plan':
+                self.planned[record['version']] += record['chapters']
+                self.finished_versions.discard(record['version'])
+            elif kind == 'chapter':
+                self.outcomes.setdefault(record['version'], Counter())[record['outcome']] += 1
+                self.last_progress = record['ts']
+            elif kind == 'version_done':
+                self.finished_versions.add(record['version'])
+            elif kind == 'request':
+                status = str(record.get('status') or 'error')
+                self.requests[status] += 1
+                seconds = record.get('total_ms', 0.0) / 1000
+                for i, bound in enumerate(DURATION_BUCKETS):
+                    if seconds <= bound:
+                        self.bucket_counts[i] += 1
+                self.duration_count += 1
+                self.duration_sum += seconds
+                self.recent.append((record['ts'], status, seconds))
+                # Trim here too, so a run nobody polls does not keep every request
+                self._trim_recent(record['ts'])
+            elif kind == 'sleep':
+                self.backoff = (0.0, None)
+        self.write_textfile(force=kind in ('plan', 'version_done'))
+
+    def set_backoff(self, seconds, reason):
+        """Record a sleep that is about to start"""
+        with self.lock:
+            self.backoff = (float(seconds), reason)
+        self.write_textfile(force=reason != 'rate_limit')
+
+    def _pending(self, version):
+        if version in self.finished_versions:
+            return 0
+        return max(self.planned[version] - sum(self.outcomes.get(version, {}).values()), 0)
+
+    def _trim_recent(self, now):
+        while self.recent and self.recent[0][0] < now - RATE_WINDOW:
+            self.recent.popleft()
+
+    def _recent_requests(self, now):
+        self._trim_recent(now)
+        return list(self.recent)
+
+    def status(self):
+        """JSON-ready snapshot of the run"""
+        now = time.time()
+        with self.lock:
+            recent = self._recent_requests(now)
+            versions = {}
+            for version in sorted(set(self.planned) | set(self.outcomes)):
+                outcomes = self.outcomes.get(version, Counter())
+                versions[version] = {
+                    'planned': self.planned[version],
+                    'done': outcomes['done'],
+                    'skipped': outcomes['skipped'],
+                    'failed': outcomes['failed'],
+                    'pending': self._pending(version),
+                    'finished': version in self.finished_versions,
+                }
+            errors = sum(1 for _, status, _ in recent if not status.startswith('2'))
+            durations = sorted(seconds for _, _, seconds in recent)
+            return {
+                'tool': self.tool,
+                'pid': os.getpid(),
+                'uptime_s': round(now - self.started, 1),
+                'last_progress_age_s': round(now - self.last_progress, 1),
+                'backoff': {'seconds': self.backoff[0], 'reason': self.backoff[1]},
+                'versions': versions,
+                'requests': {
+                    'total': sum(self.requests.values()),
+                    'by_status': dict(self.requests),
+                    'per_minute': len(recent) * 60 / RATE_WINDOW,
+                    'error_rate': round(errors / len(recent), 3) if recent else 0.0,
+                    'p50_ms': round(durations[len(durations) // 2] * 1000, 1) if durations else None,
+                },
+            }
+
+    def prometheus_text(self):
+        """Counters in the Prometheus text exposition format"""
+        tool = self.tool
+        lines = []
+
+        def metric(name, kind, help_text, samples):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                lines.append(f"{name}{labels} {value}")
+
+        with self.lock:
+            versions = sorted(set(self.planned) | set(self.outcomes))
+            metric('bible_download_chapters_planned', 'gauge', 'Chapters scheduled for download',
+                   [(_labels(tool=tool, version=version), self.planned[version]) for version in versions])
+            metric('bible_download_chapters_total', 'counter', 'Chapters finished, by outcome',
+                   [(_labels(tool=tool, version=version, outcome=outcome), count)
+                    for version in versions for outcome, count in sorted(self.outcomes.get(version, {}).items())])
+            metric('bible_download_chapters_pending', 'gauge', 'Chapters not attempted yet',
+                   [(_labels(tool=tool, version=version), self._pending(version)) for version in versions])
+            metric('bible_download_requests_total', 'counter', 'HTTP requests, by status ("error" for no response)',
+                   [(_labels(tool=tool, status=status), count) for status, count in sorted(self.requests.items())])
+
+            name = 'bible_download_request_duration_seconds'
+            lines.append(f"# HELP {name} HTTP request duration including the body")
+            lines.append(f"# TYPE {name} histogram")
+            for bound, count in zip(DURATION_BUCKETS, self.bucket_counts):
+                lines.append(f"{name}_bucket{_labels(tool=tool, le=bound)} {count}")
+            lines.append(f"{name}_bucket{_labels(tool=tool, le='+Inf')} {self.duration_count}")
+            lines.append(f"{name}_sum{_labels(tool=tool)} {self.duration_sum:.3f}")
+            lines.append(f"{name}_count{_labels(tool=tool)} {self.duration_count}")
+
+            metric('bible_download_backoff_seconds', 'gauge', 'Length of the sleep in progress (0 when not sleeping)',
+                   [(_labels(tool=tool, reason=self.backoff[1] or 'none'), self.backoff[0])])
+            metric('bible_download_last_progress_timestamp_seconds', 'gauge', 'When the last chapter finished',
+                   [(_labels(tool=tool), f"{self.last_progress:.3f}")])
+            metric('bible_download_start_timestamp_seconds', 'gauge', 'When the run started',
+                   [(_labels(tool=tool), f"{self.started:.3f}")])
+        return '\n'.join(lines) + '\n'
+
+    def write_textfile(self, force=False):
+        """Atomically rewrite the textfile, at most once per interval unless forced"""
+        if not self.textfile:
+            return
+        now = time.time()
+        if not force and now - self.last_written < self.interval:
+            return
+        self.last_written = now
+        directory = os.path.dirname(os.path.abspath(self.textfile))
+        os.makedirs(directory, exist_ok=True)
+        temp_file = f"{self.textfile}.{os.getpid()}.tmp"
+        with open(temp_file, 'w', encoding='utf-8') as f:
+            f.write(self.prometheus_text())
+        os.replace(temp_file, self.textfile)
+
+    def serve(self):
+        """Start the /status and /metrics server in a daemon thread"""
+        from http import HTTPStatus
+        from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+        live = self
+
+        class StatusHandler(BaseHTTPRequestHandler):
+            def log_message(self, format, *args):
+                pass
+
+            def do_GET(self):
+                if self.path.split('?')[0] == '/status':
+                    body = json.dumps(live.status(), indent=2).encode('utf-8')
+                    content_type = 'application/json; charset=utf-8'
+                elif self.path.split('?')[0] == '/metrics':
+                    body = live.prometheus_text().encode('utf-8')
+                    content_type = 'text/plain; version=0.0.4; charset=utf-8'
+                else:
+                    self.send_error(HTTPStatus.NOT_FOUND)
+                    return
+                self.send_response(HTTPStatus.OK)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        try:
+            self.server = ThreadingHTTPServer((self.bind, int(self.port)), StatusHandler)
+        except OSError as e:
+            print(f"Status endpoint disabled - cannot listen on {self.bind}:{self.port} ({e})")
+            self.port = None
+            return
+        self.server.daemon_threads = True
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+        print(f"Download status on http://{self.bind}:{self.port}/status")
+
+    def close(self):
+        """Write the final textfile and stop the server"""
+        self.write_textfile(force=True)
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+
+def open_live_status(tool, textfile='', port='', bind=''):
+    """LiveStatus for the configured textfile/port settings, or None if neither is set"""
+    textfile = (textfile or '').strip().strip('"').strip("'")
+    port = (str(port or '')).strip().strip('"').strip("'")
+    if not textfile and not port:
+        return None
+    return LiveStatus(tool, textfile or None, int(port) if port else None, (bind or '').strip() or '127.0.0.1')
@@ -0,0 +1,191 @@
+#!/usr/bin/env python3
+"""
+Memory tracking for long download runs (--memory).
+
+  --memory             RSS after every chapter, and a tracemalloc snapshot at
+                       the end of each book: the allocation sites whose
+                       retained size grew the most during that book
+  --memory rss         RSS only, without tracemalloc's slowdown
+
+The tracker is a metrics observer (see metrics.py). After each book it
+prints a line and records a memory event:
+
+  {"ts": ..., "event": "memory", "version": "kjv", "book": "ruth", "chapters": 4,
+   "rss_mb": 61.2, "rss_growth_mb": 0.4, "traced_mb": 12.1,
+   "top": [["bs4/element.py:1234", 51200, 312], ...]}
+
+top lists (site, bytes, blocks) grown since the previous book, so a site
+that keeps reappearing is holding on to memory. When the run finishes the
+tracker prints RSS at start, after the first book, at its peak and at the
+end, and the growth per 100 chapters after the first book (which also pays
+for imports and caches warming up).
+The same report can be printed from a metrics log:
+
+  python3 memory_tracking.py ../metrics/blueletterbible-20250101-120000.jsonl
+"""
+
+import argparse
+import os
+import resource
+
+from download_planner import format_duration
+from metrics import load_events
+
+MEMORY_MODES = ('tracemalloc', 'rss')
+
+TOP_SITES = 5
+
+def current_rss_mb():
+    """Resident set size of this process, or the peak where /proc is unavailable"""
+    try:
+        with open('/proc/self/statm', 'r') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    except (OSError, ValueError, IndexError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+def release_tree(soup):
+    """Free a BeautifulSoup tree now instead of leaving its reference cycles to the cyclic collector.
+
+    decompose() on the BeautifulSoup object alone only clears the root (its
+    next_element is None), so the top-level nodes are decomposed first.
+    """
+    for node in list(soup.contents):
+        node.decompose()
+    soup.decompose()
+
+def site_label(trace):
+    frame = trace.traceback[0]
+    parts = frame.filename.replace('\\', '/').split('/')
+    return f"{'/'.join(parts[-2:])}:{frame.lineno}"
+
+class MemoryTracker:
+    """Samples RSS per chapter and reports per-book growth (and allocation sites with tracemalloc)"""
+
+    def __init__(self, recorder, mode='tracemalloc', top=TOP_SITES):
+        self.recorder = recorder
+        self.mode = mode
+        self.top = top
+        self.book = None
+        self.book_chapters = 0
+        self.book_rss = None
+        self.start_rss = None
+        self.peak_rss = 0.0
+        self.chapters = 0
+        self.last_rss = None
+        self.warm = None
+        self.snapshot = None
+        self.closed = False
+        if mode == 'tracemalloc':
+            import tracemalloc
+            self.tracemalloc = tracemalloc
+            tracemalloc.start()
+            self.snapshot = self.take_snapshot()
+        self.start_rss = self.book_rss = current_rss_mb()
+
+    def take_snapshot(self):
+        tracemalloc = self.tracemalloc
+        return tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap_external>'),
+            tracemalloc.Filter(False, '<unknown>'),
+        ))
+
+    def observe(self, record):
+        kind = record.get('event')
+        if kind == 'chapter' and record.get('outcome') != 'skipped':
+            book = (record.get('version'), record.get('book'))
+            if self.book is not None and book != self.book:
+                # The previous chapter event closed that book; this one's memory belongs to the next
+                self.report_book(self.last_rss)
+            self.book = book
+            self.book_chapters += 1
+            self.chapters += 1
+            self.last_rss = current_rss_mb()
+            self.peak_rss = max(self.peak_rss, self.last_rss)
+        elif kind == 'version_done' and self.book is not None:
+            self.report_book()
+
+    def report_book(self, rss=None):
+        """Print and record the memory growth of the book just finished (RSS measured now unless given)"""
+        version, book = self.book
+        if rss is None:
+            rss = current_rss_mb()
+        self.peak_rss = max(self.peak_rss, rss)
+        fields = {'version': version, 'book': book, 'chapters': self.book_chapters,
+                  'rss_mb': round(rss, 1), 'rss_growth_mb': round(rss - self.book_rss, 1)}
+        if self.snapshot is not None:
+            snapshot = self.take_snapshot()
+            grown = [stat for stat in snapshot.compare_to(self.snapshot, 'lineno') if stat.size_diff > 0][:self.top]
+            fields['traced_mb'] = round(self.tracemalloc.get_traced_memory()[0] / (1024 * 1024), 1)
+            fields['top'] = [[site_label(stat), stat.size_diff, stat.count_diff] for stat in grown]
+            self.snapshot = snapshot
+        self.book, self.book_chapters, self.book_rss = None, 0, rss
+        if self.warm is None:
+            self.warm = (rss, self.chapters)
+        self.recorder.event('memory', **fields)
+        print(f"  Memory: {version} {book} - {format_book(fields)}")
+        for site, size, count in fields.get('top', []):
+            print(f"      +{size / 1024:8.1f} KiB  {count:+6d} blocks  {site}")
+
+    def close(self):
+        """Report the last book and print the RSS summary of the run"""
+        if self.closed:
+            return
+        self.closed = True
+        if self.book is not None:
+            self.report_book()
+        if self.snapshot is not None:
+            self.tracemalloc.stop()
+            self.snapshot = None
+        if self.chapters:
+            end_rss = current_rss_mb()
+            warm_rss, warm_chapters = self.warm
+            summary = rss_summary(self.start_rss, warm_rss, max(self.peak_rss, end_rss), end_rss, self.chapters - warm_chapters)
+            print(f"\nMemory ({self.mode}): {summary}")
+
+def format_book(fields):
+    text = f"RSS {fields['rss_mb']:.1f} MB ({fields['rss_growth_mb']:+.1f} MB over {fields['chapters']} chapter(s))"
+    if 'traced_mb' in fields:
+        text += f", traced {fields['traced_mb']:.1f} MB"
+    return text
+
+def rss_summary(start, warm, peak, end, chapters_since_warm):
+    text = f"RSS {start:.1f} MB at start, {warm:.1f} MB after the first book, {peak:.1f} MB peak, {end:.1f} MB at end"
+    if chapters_since_warm:
+        text += f" ({(end - warm) * 100 / chapters_since_warm:+.2f} MB per 100 chapters since)"
+    return text
+
+def attach_memory_tracker(recorder, mode):
+    """Track memory for a metrics recorder with mode 'tracemalloc' or 'rss'; None leaves it off"""
+    if not mode:
+        return None
+    tracker = MemoryTracker(recorder, mode)
+    recorder.add_observer(tracker)
+    return tracker
+
+def add_memory_argument(parser):
+    parser.add_argument('--memory', nargs='?', const='tracemalloc', choices=MEMORY_MODES,
+                        help='Report RSS and the top allocation sites per book (tracemalloc, default) or RSS only')
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the per-book memory report of a metrics log')
+    parser.add_argument('log', help='JSONL metrics log of a run with --memory')
+    args = parser.parse_args()
+
+    events = [event for event in load_events(args.log) if event.get('event') == 'memory']
+    if not events:
+        print('No memory events (was the run started with --memory?)')
+        return
+    for event in events:
+        print(f"{event['version']} {event['book']}: {format_book(event)}")
+        for site, size, count in event.get('top', []):
+            print(f"    +{size / 1024:8.1f} KiB  {count:+6d} blocks  {site}")
+    first, last = events[0], events[-1]
+    chapters = sum(event['chapters'] for event in events[1:])
+    start = first['rss_mb'] - first['rss_growth_mb']
+    print(f"\n{rss_summary(start, first['rss_mb'], max(event['rss_mb'] for event in events), last['rss_mb'], chapters)}")
+    print(f"{len(events)} book(s) over {format_duration(last['ts'] - first['ts'])}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,314 @@
+#!/usr/bin/env python3
+"""
+Structured metric events for the downloaders and the converter.
+
+Every request, parse, file write and sleep is appended to a JSONL log, one
+event per line:
+
+  {"ts": 1718012345.678, "event": "request", "url": "...", "status": 200, "bytes": 48213,
+   "ttfb_ms": 231.4, "total_ms": 402.9, "attempt": 1}
+  {"ts": ..., "event": "parse", "book": "genesis", "chapter": 1, "parse_ms": 38.2, "verses": 31}
+  {"ts": ..., "event": "write", "path": "...", "bytes": 5120, "write_ms": 0.4}
+  {"ts": ..., "event": "sleep", "reason": "rate_limit", "ms": 1000.2}
+  {"ts": ..., "event": "phase", "name": "search_index", "ms": 812.5}
+  {"ts": ..., "event": "plan", "version": "esv", "chapters": 1189}
+  {"ts": ..., "event": "chapter", "version": "esv", "book": "genesis", "chapter": 1, "outcome": "done"}
+  {"ts": ..., "event": "version_done", "version": "esv"}
+  {"ts": ..., "event": "memory", "version": "esv", "book": "genesis", "rss_mb": 61.2, ...}
+
+ttfb_ms is requests' elapsed time up to the response headers, which includes
+connecting; requests does not report connect time on its own.
+
+Logs go to dl_bible-bl-bg/metrics/{tool}-{YYYYmmdd-HHMMSS}.jsonl unless
+METRICS_LOG (metrics_log in options.cfg) names a file, or is 'off'. Each run
+ends with a summary of latency percentiles and of where the wall time went.
+The recorder keeps running totals for it rather than the events, with the
+percentiles taken from a bounded sample once a run has more than
+RESERVOIR_SIZE values per field. The same summary can be printed for an
+existing log:
+
+  python3 metrics.py ../metrics/biblegateway-20250101-120000.jsonl
+
+A LiveStatus (see live_status.py) given to the recorder sees every event as
+it happens. With --profile (see profiling.py) fetches, timed sections and
+profiled() blocks are also profiled per phase, and with --memory (see
+memory_tracking.py) RSS and allocation growth are reported per book.
+"""
+
+import argparse
+import atexit
+import json
+import os
+import random
+import time
+from collections import Counter
+from contextlib import nullcontext
+from pathlib import Path
+
+DEFAULT_METRICS_DIR = Path(__file__).resolve().parent.parent / 'metrics'
+
+# (event, field) pairs summarized as latency percentiles
+LATENCY_FIELDS = (
+    ('request', 'total_ms'),
+    ('request', 'ttfb_ms'),
+    ('parse', 'parse_ms'),
+    ('write', 'write_ms'),
+)
+
+# Latency values kept per field for the percentiles; longer runs keep a uniform sample of this many
+RESERVOIR_SIZE = 4096
+
+def resolve_log_path(setting, tool):
+    """Log file for a METRICS_LOG setting: '' for the default location, 'off' for none"""
+    setting = (setting or '').strip().strip('"').strip("'")
+    if setting.lower() in ('off', 'false', 'none', '0'):
+        return None
+    if setting:
+        return Path(setting)
+    return DEFAULT_METRICS_DIR / f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}.jsonl"
+
+def percentile(sorted_values, p):
+    """Nearest-rank percentile of an ascending list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, -(-len(sorted_values) * p // 100))
+    return sorted_values[int(rank) - 1]
+
+def event_phase_ms(event):
+    """(phase, milliseconds) an event accounts for in the time breakdown, or None"""
+    kind = event.get('event')
+    if kind == 'request':
+        return 'network', event.get('total_ms', 0.0)
+    if kind == 'parse':
+        return 'parse', event.get('parse_ms', 0.0)
+    if kind == 'write':
+        return 'write', event.get('write_ms', 0.0)
+    if kind == 'sleep':
+        return 'sleep', event.get('ms', 0.0)
+    if kind == 'phase':
+        return event.get('name', 'phase'), event.get('ms', 0.0)
+    return None
+
+class Reservoir:
+    """Every value up to size, then a uniform sample of size values; count and max stay exact"""
+
+    def __init__(self, size=RESERVOIR_SIZE, rng=None):
+        self.size = size
+        self.rng = rng or random.Random(0)
+        self.values = []
+        self.count = 0
+        self.max = 0.0
+
+    def add(self, value):
+        self.count += 1
+        self.max = value if self.count == 1 else max(self.max, value)
+        if len(self.values) < self.size:
+            self.values.append(value)
+        else:
+            slot = self.rng.randrange(self.count)
+            if slot < self.size:
+                self.values[slot] = value
+
+class RunSummary:
+    """Running totals of a stream of events: request counts, latency samples and time by phase"""
+
+    def __init__(self):
+        self.events = 0
+        self.first_ts = None
+        self.last_ts = None
+        self.requests = 0
+        self.statuses = Counter()
+        self.retries = 0
+        self.received = 0
+        self.latencies = {pair: Reservoir() for pair in LATENCY_FIELDS}
+        self.phases = Counter()
+
+    def add(self, event):
+        self.events += 1
+        if self.first_ts is None:
+            self.first_ts = event['ts']
+        self.last_ts = event['ts']
+        kind = event.get('event')
+        if kind == 'request':
+            self.requests += 1
+            self.statuses[str(event.get('status') or 'error')] += 1
+            if event.get('attempt', 1) > 1:
+                self.retries += 1
+            self.received += event.get('bytes', 0)
+        for (latency_kind, field), reservoir in self.latencies.items():
+            if kind == latency_kind and field in event:
+                reservoir.add(event[field])
+        phase = event_phase_ms(event)
+        if phase:
+            self.phases[phase[0]] += phase[1]
+
+    def lines(self, wall_ms=None):
+        """Summary lines: counts, latency percentiles and time by phase"""
+        if not self.events:
+            return ["No metric events recorded"]
+        if wall_ms is None:
+            wall_ms = (self.last_ts - self.first_ts) * 1000
+
+        lines = []
+        if self.requests:
+            status_text = ', '.join(f"{status} x{count}" for status, count in sorted(self.statuses.items()))
+            lines.append(f"requests: {self.requests} ({status_text}), {self.retries} retries, {self.received / 1e6:.1f} MB received")
+
+        for (kind, field), reservoir in self.latencies.items():
+            if reservoir.count:
+                values = sorted(reservoir.values)
+                lines.append(f"{kind + ' ' + field:<20} n={reservoir.count:<6} p50 {percentile(values, 50):8.1f}  "
+                             f"p95 {percentile(values, 95):8.1f}  p99 {percentile(values, 99):8.1f}  max {reservoir.max:8.1f} ms")
+
+        phases = Counter(self.phases)
+        accounted = sum(phases.values())
+        if wall_ms > accounted:
+            phases['other'] = wall_ms - accounted
+        total = max(wall_ms, accounted) or 1.0
+        breakdown = '  '.join(f"{name} {ms / 1000:.1f}s ({ms * 100 / total:.0f}%)" for name, ms in phases.most_common())
+        lines.append(f"time: {wall_ms / 1000:.1f}s wall - {breakdown}")
+        return lines
+
+def summarize(events, wall_ms=None):
+    """Summary lines for an iterable of events: counts, latency percentiles and time by phase"""
+    summary = RunSummary()
+    for event in events:
+        summary.add(event)
+    return summary.lines(wall_ms)
+
+# Shared no-op context for profiled() while profiling is off
+NOT_PROFILED = nullcontext()
+
+def iter_events(path):
+    """The events of a JSONL log, one at a time"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
+
+def load_events(path):
+    return list(iter_events(path))
+
+class MetricsRecorder:
+    """Appends metric events to a JSONL log and prints a summary when the process exits
+
+    Events are written and passed on, not kept: the summary comes from running totals.
+    """
+
+    def __init__(self, tool, log_path=None, live=None):
+        self.tool = tool
+        self.log_path = log_path
+        self.live = live
+        self.observers = []
+        self.profiler = None
+        self.summary = RunSummary()
+        self.started = time.time()
+        self._file = None
+        self._registered = False
+
+    def event(self, event, **fields):
+        record = {'ts': round(time.time(), 3), 'event': event, **fields}
+        self.summary.add(record)
+        if not self._registered:
+            atexit.register(self.finish)
+            self._registered = True
+        if self.log_path is not None:
+            if self._file is None:
+                os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+                self._file = open(self.log_path, 'a', encoding='utf-8')
+            self._file.write(json.dumps(record, ensure_ascii=False) + '\n')
+            self._file.flush()
+        if self.live is not None:
+            self.live.observe(record)
+        for observer in self.observers:
+            observer.observe(record)
+        return record
+
+    def add_observer(self, observer):
+        """Pass every later event to observer.observe(record); its close(), if any, runs at finish"""
+        self.observers.append(observer)
+
+    def fetch(self, session, url, attempt=1, **kwargs):
+        """session.get(url) with a request event for the outcome; exceptions are recorded and re-raised"""
+        start = time.perf_counter()
+        try:
+            with self.profiled('fetch'):
+                response = session.get(url, **kwargs)
+        except Exception as e:
+            self.event('request', url=url, status=None, bytes=0, total_ms=round((time.perf_counter() - start) * 1000, 1),
+                       attempt=attempt, error=type(e).__name__)
+            raise
+        total_ms = (time.perf_counter() - start) * 1000
+        self.event('request', url=url, status=response.status_code, bytes=len(response.content),
+                   ttfb_ms=round(response.elapsed.total_seconds() * 1000, 1), total_ms=round(total_ms, 1), attempt=attempt)
+        return response
+
+    def sleep(self, seconds, reason):
+        """time.sleep() recorded as a sleep event"""
+        if self.live is not None:
+            self.live.set_backoff(seconds, reason)
+        start = time.perf_counter()
+        time.sleep(seconds)
+        self.event('sleep', reason=reason, ms=round((time.perf_counter() - start) * 1000, 1))
+
+    def timed(self, event, field, **fields):
+        """Context manager recording an event with its duration in field; extra fields can be set on the yielded dict"""
+        return _Timed(self, event, field, fields)
+
+    def profiled(self, phase):
+        """Context manager profiling a section as phase while --profile is on"""
+        if self.profiler is None:
+            return NOT_PROFILED
+        return self.profiler.phase(phase)
+
+    def finish(self):
+        """Print the run summary once (also called at exit)"""
+        for observer in self.observers:
+            if hasattr(observer, 'close'):
+                observer.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        if self.live is not None:
+            self.live.close()
+        if self.profiler is not None:
+            self.profiler.close()
+        if not self.summary.events:
+            return
+        print(f"\nMetrics summary ({self.tool}){': ' + str(self.log_path) if self.log_path else ''}")
+        for line in self.summary.lines((time.time() - self.started) * 1000):
+            print(f"  {line}")
+        self.summary = RunSummary()
+
+class _Timed:
+    def __init__(self, recorder, event, field, fields):
+        self.recorder = recorder
+        self.event = event
+        self.field = field
+        self.fields = fields
+
+    def __enter__(self):
+        if self.recorder.profiler is not None:
+            self.recorder.profiler.enter(self.fields.get('name', self.event) if self.event == 'phase' else self.event)
+        self.start = time.perf_counter()
+        return self.fields
+
+    def __exit__(self, exc_type, exc, tb):
+        self.fields[self.field] = round((time.perf_counter() - self.start) * 1000, 2)
+        if self.recorder.profiler is not None:
+            self.recorder.profiler.exit()
+        if exc_type is not None:
+            self.fields['error'] = exc_type.__name__
+        self.recorder.event(self.event, **self.fields)
+        return False
+
+def main():
+    parser = argparse.ArgumentParser(description='Summarize a downloader or converter metrics log')
+    parser.add_argument('log', help='JSONL metrics log')
+    args = parser.parse_args()
+
+    for line in summarize(iter_events(args.log)):
+        print(line)
+
+if __name__ == '__main__':
+    main()
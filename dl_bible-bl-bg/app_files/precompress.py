@@ -0,0 +1,95 @@
+#!/usr/bin/env python3
+"""
+Write precompressed .gz and .br siblings for static Bible files.
+
+  txt_bibles/english/ylt/01-genesis-ylt.txt
+  txt_bibles/english/ylt/01-genesis-ylt.txt.gz
+  txt_bibles/english/ylt/01-genesis-ylt.txt.br
+
+Siblings are compressed at maximum level and carry the source file's mtime,
+so they are only regenerated when the source changes. Brotli output needs
+the optional 'brotli' package; without it only .gz files are written.
+"""
+
+import argparse
+import gzip
+import os
+from pathlib import Path
+
+try:
+    import brotli
+    HAS_BROTLI = True
+except ImportError:
+    HAS_BROTLI = False
+
+PRECOMPRESS_NAMES = ('versions.json',)
+PRECOMPRESS_SUFFIXES = ('.txt', '.align.json', '.bundle')
+
+def get_encoders():
+    """List (suffix, compress function) pairs for the available encodings"""
+    encoders = [('.gz', lambda data: gzip.compress(data, compresslevel=9, mtime=0))]
+    if HAS_BROTLI:
+        encoders.append(('.br', lambda data: brotli.compress(data, mode=brotli.MODE_TEXT, quality=11)))
+    return encoders
+
+def should_precompress(filename):
+    """Whether a file in txt_bibles gets precompressed siblings"""
+    return filename in PRECOMPRESS_NAMES or filename.endswith(PRECOMPRESS_SUFFIXES)
+
+def precompress_file(path):
+    """Write any stale compressed siblings of path and return the paths written"""
+    path = str(path)
+    source_stat = os.stat(path)
+    data = None
+    written = []
+
+    for suffix, compress in get_encoders():
+        target = path + suffix
+        try:
+            if os.stat(target).st_mtime_ns == source_stat.st_mtime_ns:
+                continue
+        except FileNotFoundError:
+            pass
+
+        if data is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+
+        temp_file = f"{target}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(compress(data))
+        os.utime(temp_file, ns=(source_stat.st_atime_ns, source_stat.st_mtime_ns))
+        os.replace(temp_file, target)
+        written.append(target)
+
+    return written
+
+def precompress_tree(root):
+    """Precompress every eligible file under root and return the paths written"""
+    written = []
+    for dirpath, _, filenames in os.walk(root):
+        for filename in sorted(filenames):
+            if should_precompress(filename):
+                written.extend(precompress_file(os.path.join(dirpath, filename)))
+    return written
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Write .gz/.br siblings for TXT Bibles, bundles and versions.json')
+    parser.add_argument('paths', nargs='*', default=[str(default_base)], help='Files or directories (default: %(default)s)')
+    args = parser.parse_args()
+
+    if not HAS_BROTLI:
+        print("brotli not installed - writing .gz only (pip install brotli)")
+
+    written = []
+    for path in args.paths:
+        if os.path.isdir(path):
+            written.extend(precompress_tree(path))
+        elif os.path.isfile(path):
+            written.extend(precompress_file(path))
+
+    print(f"Precompressed {len(written)} file(s)")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,200 @@
+#!/usr/bin/env python3
+"""
+Per-phase profiling for the downloaders and the converter (--profile).
+
+Phases are the sections the metrics recorder already times (see metrics.py):
+fetch, parse, write and the converter's build phases, plus normalise and
+convert around the TXT conversion. Nested phases are exclusive: while a
+write runs inside convert, its time counts for write only.
+
+  --profile            cProfile per phase: {phase}.pstats
+  --profile sample     stack sampling every few milliseconds: profile.folded
+
+Both go to dl_bible-bl-bg/metrics/profiles/{tool}-{YYYYmmdd-HHMMSS}/, with a
+short per-phase report printed at exit. The pstats files open with
+`python3 -m pstats` or snakeviz. The folded stacks (one line per stack, the
+phase as the root frame) feed flamegraph.pl or speedscope directly. cProfile
+counts every call and inflates call-heavy code such as BeautifulSoup, so its
+timings are best compared with each other; sampling keeps the proportions.
+
+Without --profile the recorder holds no profiler and each timed section
+costs one attribute check, and cProfile/pstats are only imported once a
+profile is taken.
+
+  python3 profiling.py ../metrics/profiles/converter-20250101-120000/parse.pstats
+"""
+
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager
+
+from metrics import DEFAULT_METRICS_DIR
+
+PROFILE_MODES = ('cprofile', 'sample')
+
+SAMPLE_INTERVAL = 0.005
+
+def profile_dir(tool):
+    return DEFAULT_METRICS_DIR / 'profiles' / f"{tool}-{time.strftime('%Y%m%d-%H%M%S')}"
+
+def frame_label(frame):
+    code = frame.f_code
+    return f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+class PhaseProfiler:
+    """cProfile with one profile per phase; only the innermost phase is recording"""
+
+    mode = 'cprofile'
+
+    def __init__(self, tool, directory=None):
+        self.tool = tool
+        self.directory = directory or profile_dir(tool)
+        self.stack = []
+        self.profiles = {}
+        self.seconds = Counter()
+        self.entered = []
+
+    def enter(self, phase):
+        now = time.perf_counter()
+        if self.stack:
+            self.profiles[self.stack[-1]].disable()
+            self.seconds[self.stack[-1]] += now - self.entered[-1]
+        self.stack.append(phase)
+        self.entered.append(now)
+        if phase not in self.profiles:
+            import cProfile
+            self.profiles[phase] = cProfile.Profile()
+        self.profiles[phase].enable()
+
+    def exit(self):
+        now = time.perf_counter()
+        phase = self.stack.pop()
+        self.profiles[phase].disable()
+        self.seconds[phase] += now - self.entered.pop()
+        if self.stack:
+            self.entered[-1] = now
+            self.profiles[self.stack[-1]].enable()
+
+    @contextmanager
+    def phase(self, phase):
+        self.enter(phase)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def close(self):
+        """Write one .pstats file per phase and print the costliest functions of each"""
+        while self.stack:
+            self.exit()
+        if not self.profiles:
+            return
+        import pstats
+        os.makedirs(self.directory, exist_ok=True)
+        print(f"\nProfile ({self.tool}, cProfile): {self.directory}")
+        for phase, seconds in self.seconds.most_common():
+            path = os.path.join(self.directory, f"{phase}.pstats")
+            self.profiles[phase].dump_stats(path)
+            print(f"  {phase:<18} {seconds:8.2f}s")
+            stats = pstats.Stats(path).sort_stats('tottime')
+            for func in stats.fcn_list[:3]:
+                filename, line, name = func
+                tottime = stats.stats[func][2]
+                print(f"      {tottime:8.3f}s  {name} ({os.path.basename(filename)}:{line})")
+        self.profiles = {}
+
+class SamplingProfiler:
+    """Samples the profiled thread's stack from a background thread into folded stacks"""
+
+    mode = 'sample'
+
+    def __init__(self, tool, directory=None, interval=SAMPLE_INTERVAL):
+        self.tool = tool
+        self.directory = directory or profile_dir(tool)
+        self.interval = interval
+        self.stack = []
+        self.samples = Counter()
+        self.thread_id = threading.get_ident()
+        self.stopped = threading.Event()
+        self.thread = None
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            try:
+                phase = self.stack[-1]
+            except IndexError:
+                continue
+            frame = sys._current_frames().get(self.thread_id)
+            frames = []
+            while frame is not None:
+                frames.append(frame_label(frame))
+                frame = frame.f_back
+            self.samples[';'.join([phase] + frames[::-1])] += 1
+
+    def enter(self, phase):
+        if self.thread is None:
+            self.thread = threading.Thread(target=self._run, daemon=True)
+            self.thread.start()
+        self.stack.append(phase)
+
+    def exit(self):
+        self.stack.pop()
+
+    @contextmanager
+    def phase(self, phase):
+        self.enter(phase)
+        try:
+            yield
+        finally:
+            self.exit()
+
+    def close(self):
+        """Write profile.folded and print the sample share of each phase"""
+        self.stopped.set()
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+        if not self.samples:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = os.path.join(self.directory, 'profile.folded')
+        with open(path, 'w', encoding='utf-8') as f:
+            for stack, count in sorted(self.samples.items()):
+                f.write(f"{stack} {count}\n")
+        phases = Counter()
+        for stack, count in self.samples.items():
+            phases[stack.split(';', 1)[0]] += count
+        total = sum(phases.values())
+        print(f"\nProfile ({self.tool}, {total} samples every {self.interval * 1000:.0f} ms): {path}")
+        for phase, count in phases.most_common():
+            print(f"  {phase:<18} {count * self.interval:8.2f}s  ({count * 100 / total:.0f}%)")
+        self.samples = Counter()
+
+def attach_profiler(recorder, mode):
+    """Profile the phases of a metrics recorder with mode 'cprofile' or 'sample'; None leaves it off"""
+    if not mode:
+        return None
+    profiler = SamplingProfiler(recorder.tool) if mode == 'sample' else PhaseProfiler(recorder.tool)
+    recorder.profiler = profiler
+    return profiler
+
+def add_profile_argument(parser):
+    parser.add_argument('--profile', nargs='?', const='cprofile', choices=PROFILE_MODES,
+                        help='Profile each phase with cProfile (default) or stack sampling')
+
+def main():
+    parser = argparse.ArgumentParser(description='Print the costliest functions of a phase profile')
+    parser.add_argument('pstats', help='{phase}.pstats file written by --profile')
+    parser.add_argument('--sort', default='cumulative', help='pstats sort key (default: %(default)s)')
+    parser.add_argument('--limit', type=int, default=25, help='Number of functions (default: %(default)s)')
+    args = parser.parse_args()
+
+    import pstats
+    pstats.Stats(args.pstats).strip_dirs().sort_stats(args.sort).print_stats(args.limit)
+
+if __name__ == '__main__':
+    main()
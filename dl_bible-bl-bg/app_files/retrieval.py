@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+"""
+BM25 verse retrieval over the search indexes, for grounding chat answers.
+
+  python3 retrieval.py "who is the good shepherd" -v ylt --testament nt -k 5
+
+Scores come straight from the {translation}.search postings (term counts per
+verse and verse token counts), so no second index is built. Book and
+testament filters narrow each term's postings with a binary search over the
+canonically ordered verse keys before anything is scored.
+
+Terms found in more than MAX_DOCUMENT_RATIO of the verses ("the", "and",
+"of") are skipped unless the question has nothing else, which keeps the
+postings walked per question small without a per-language stopword list.
+"""
+
+import argparse
+import heapq
+import math
+from bisect import bisect_left
+from pathlib import Path
+
+from bible_references import book_name, book_number
+from search_index import LANGUAGE_FOLD_PROFILES, load_translation_index
+from txt_corpus import list_translations, split_verse_key
+
+K1 = 1.2
+B = 0.75
+MAX_DOCUMENT_RATIO = 0.1
+
+TESTAMENT_BOOKS = {'ot': range(1, 40), 'nt': range(40, 67)}
+
+def parse_book_filter(books=None, testament=None):
+    """Sorted book numbers allowed by a books list ('John', 'Rom', '43') and/or a testament ('ot'/'nt'), or None for all.
+
+    Raises ValueError for unknown book names or testaments.
+    """
+    allowed = None
+    if testament:
+        if testament.lower() not in TESTAMENT_BOOKS:
+            raise ValueError(f"Unknown testament '{testament}' (use ot or nt)")
+        allowed = set(TESTAMENT_BOOKS[testament.lower()])
+    if books:
+        numbers = set()
+        for name in books:
+            number = book_number(name)
+            if number is None:
+                raise ValueError(f"Unknown book '{name}'")
+            numbers.add(number)
+        allowed = numbers if allowed is None else allowed & numbers
+    return None if allowed is None else sorted(allowed)
+
+def _book_ranges(books):
+    """Merge sorted book numbers into [first key, end key) verse key ranges"""
+    ranges = []
+    for book in books:
+        if ranges and ranges[-1][1] == book * 1000000:
+            ranges[-1][1] = (book + 1) * 1000000
+        else:
+            ranges.append([book * 1000000, (book + 1) * 1000000])
+    return ranges
+
+class BM25Retriever:
+    """Top-k verses of one translation for a free-text question"""
+
+    def __init__(self, index, k1=K1, b=B):
+        self.index = index
+        self.k1 = k1
+        lengths = index.verse_lengths
+        average = sum(lengths) / len(lengths) if len(lengths) else 1.0
+        # k1 * (1 - b + b * length / average), precomputed per verse
+        self._norms = dict(zip(index.verse_keys, (k1 * (1 - b + b * length / average) for length in lengths)))
+
+    def idf(self, document_frequency):
+        count = len(self.index)
+        return math.log(1 + (count - document_frequency + 0.5) / (document_frequency + 0.5))
+
+    def query_terms(self, question):
+        """Distinct index terms of a question, without the very common ones"""
+        terms = [term for term in dict.fromkeys(self.index.tokenize(question)) if self.index.document_frequency(term)]
+        limit = MAX_DOCUMENT_RATIO * len(self.index)
+        selective = [term for term in terms if self.index.document_frequency(term) <= limit]
+        return selective or terms
+
+    def retrieve(self, question, k=10, books=None):
+        """List (score, verse key) of the k best verses, best first; books limits the search to those book numbers"""
+        ranges = _book_ranges(books) if books is not None else None
+        scores = {}
+        k1_plus_one = self.k1 + 1
+        norms = self._norms
+        for term in self.query_terms(question):
+            idf = self.idf(self.index.document_frequency(term))
+            keys, counts = self.index.postings(term)
+            slices = [(0, len(keys))] if ranges is None else [
+                (bisect_left(keys, start), bisect_left(keys, end)) for start, end in ranges]
+            for first, last in slices:
+                for key, count in zip(keys[first:last], counts[first:last]):
+                    scores[key] = scores.get(key, 0.0) + idf * count * k1_plus_one / (count + norms[key])
+        return heapq.nlargest(k, ((score, key) for key, score in scores.items()))
+
+def load_retriever(language, translation_path, translation, exact=False):
+    """BM25 retriever over a translation's search index (the folded one for Hebrew/Greek unless exact)"""
+    profile = None if exact else LANGUAGE_FOLD_PROFILES.get(language)
+    return BM25Retriever(load_translation_index(translation_path, translation, profile))
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Retrieve the verses most relevant to a question (BM25)')
+    parser.add_argument('question', help='Free-text question, e.g. "who is the good shepherd"')
+    parser.add_argument('--txt-bibles', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--version', '-v', action='append', help='Translation to search (repeatable, default: all)')
+    parser.add_argument('--testament', choices=sorted(TESTAMENT_BOOKS), help='Limit to one testament')
+    parser.add_argument('--book', '-b', action='append', help='Limit to a book (repeatable)')
+    parser.add_argument('-k', type=int, default=10, help='Verses to return per translation (default: %(default)s)')
+    args = parser.parse_args()
+
+    try:
+        books = parse_book_filter(args.book, args.testament)
+    except ValueError as e:
+        parser.error(str(e))
+
+    from verse_store import load_translation_store
+    for language, translation, translation_path in list_translations(args.txt_bibles):
+        if args.version and translation not in args.version:
+            continue
+        results = load_retriever(language, translation_path, translation).retrieve(args.question, args.k, books)
+        print(f"{translation}: {len(results)} verse(s)")
+        with load_translation_store(translation_path, translation) as store:
+            for score, key in results:
+                book, chapter, verse = split_verse_key(key)
+                print(f"  {score:6.2f}  {book_name(book)} {chapter}:{verse}  {store.get(book, chapter, verse)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,222 @@
+#!/usr/bin/env python3
+"""
+Retries for the downloaders: one policy for every page fetch.
+
+Each answer is classified before anything is retried:
+
+  ok        200 with verses parsed from it
+  missing   404/410: the version does not have this book or chapter; not retried
+  retry     429, 408, 425, 5xx, connection errors and timeouts, and pages
+            that parse to no verses
+  fail      any other 4xx (the request itself is wrong); not retried
+
+Retries wait with full-jitter exponential backoff, a random delay between 0
+and min(retry_max_delay, retry_base_delay * 2 ** (attempt - 1)), so clients
+that failed together do not come back together. When the answer carries
+Retry-After (seconds or an HTTP date), that wait is used instead.
+
+All fetches from one host share a circuit breaker. After circuit_failures
+consecutive failed requests (or a Retry-After), the circuit opens and every
+fetch to that host waits out the cooldown, in place of its own backoff.
+Without the breaker, each chapter would spend its own retry budget against
+an upstream that is down. When the cooldown ends, one trial request goes
+through: success closes the circuit, and failure reopens it with twice the
+cooldown (up to ten times the configured one). Pages that parse to nothing
+do not count against the host; when every attempt gets one, the fetch is
+reported as empty rather than failed, so a caller can stop asking for a book
+the version does not carry.
+
+Settings (options.cfg or environment): max_retries (retries after the first
+attempt), retry_base_delay, retry_max_delay, circuit_failures and
+circuit_cooldown.
+"""
+
+import random
+import threading
+import time
+
+RETRY_STATUSES = {408, 425, 429, 500, 502, 503, 504}
+MISSING_STATUSES = {404, 410}
+
+# Longest Retry-After honoured; anything beyond is treated as this
+MAX_RETRY_AFTER = 600.0
+
+# How long callers wait while another caller's trial request is in flight
+TRIAL_WAIT = 1.0
+
+def parse_retry_after(value, now=None):
+    """Seconds to wait from a Retry-After header (delta-seconds or HTTP date), or None"""
+    if value is None:
+        return None
+    value = str(value).strip()
+    if not value:
+        return None
+    if value.isdigit():
+        return min(float(value), MAX_RETRY_AFTER)
+    from email.utils import parsedate_to_datetime
+    try:
+        when = parsedate_to_datetime(value)
+    except (TypeError, ValueError, IndexError):
+        return None
+    if when is None:
+        return None
+    seconds = when.timestamp() - (time.time() if now is None else now)
+    return min(max(seconds, 0.0), MAX_RETRY_AFTER)
+
+def classify(status):
+    """'ok', 'missing', 'retry' or 'fail' for an HTTP status; None (no response) is 'retry'"""
+    if status is None or status in RETRY_STATUSES:
+        return 'retry'
+    if status in MISSING_STATUSES:
+        return 'missing'
+    if 200 <= status < 300:
+        return 'ok'
+    if 500 <= status < 600:
+        return 'retry'
+    return 'fail'
+
+class RetryPolicy:
+    """Attempt count and full-jitter backoff delays"""
+
+    def __init__(self, attempts=4, base_delay=2.0, max_delay=60.0, rng=None):
+        self.attempts = max(int(attempts), 1)
+        self.base_delay = float(base_delay)
+        self.max_delay = float(max_delay)
+        self.rng = rng or random.Random()
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait after failed attempt number attempt (1-based)"""
+        if retry_after is not None:
+            return retry_after
+        return self.rng.uniform(0, min(self.max_delay, self.base_delay * 2 ** (attempt - 1)))
+
+class CircuitBreaker:
+    """Consecutive-failure breaker shared by all fetches to one host"""
+
+    def __init__(self, host, failures=5, cooldown=30.0, clock=time.monotonic):
+        self.host = host
+        self.failures = max(int(failures), 1)
+        self.base_cooldown = float(cooldown)
+        self.cooldown = self.base_cooldown
+        self.clock = clock
+        self.lock = threading.Lock()
+        self.consecutive = 0
+        self.open_until = 0.0
+        self.trial = False
+
+    def is_open(self):
+        return self.consecutive >= self.failures
+
+    def wait_time(self):
+        """Seconds a fetch must wait before its request, 0 if it may go now"""
+        with self.lock:
+            now = self.clock()
+            if now < self.open_until:
+                return self.open_until - now
+            if self.is_open():
+                # Half-open: one trial request at a time
+                if self.trial:
+                    return TRIAL_WAIT
+                self.trial = True
+            return 0.0
+
+    def record_success(self):
+        with self.lock:
+            was_open = self.is_open()
+            self.consecutive = 0
+            self.cooldown = self.base_cooldown
+            self.trial = False
+        if was_open:
+            print(f"  Circuit closed: {self.host} is answering again")
+
+    def record_failure(self, retry_after=None):
+        """Count a failed request; returns the pause it started, or 0"""
+        with self.lock:
+            self.consecutive += 1
+            was_trial, self.trial = self.trial, False
+            pause = 0.0
+            if retry_after:
+                pause = retry_after
+            if self.is_open() and (was_trial or self.consecutive == self.failures):
+                pause = max(pause, self.cooldown)
+                if was_trial:
+                    self.cooldown = min(self.cooldown * 2, self.base_cooldown * 10)
+            if pause:
+                self.open_until = max(self.open_until, self.clock() + pause)
+        if pause and self.is_open():
+            print(f"  Circuit open: {self.consecutive} failed request(s) to {self.host}, pausing all fetches for {pause:.0f}s")
+        return pause
+
+_breakers = {}
+_breakers_lock = threading.Lock()
+
+def circuit_for(host, failures=5, cooldown=30.0):
+    """The process-wide breaker for host (created with these settings on first use)"""
+    with _breakers_lock:
+        if host not in _breakers:
+            _breakers[host] = CircuitBreaker(host, failures, cooldown)
+        return _breakers[host]
+
+def fetch_with_retry(recorder, session, url, parse, policy, breaker, label, attempts=None, empty='retry', **kwargs):
+    """GET url and parse(response) under policy and breaker.
+
+    Returns (outcome, result): ('ok', parsed), ('missing', None), ('empty',
+    None) when every attempt got a page that parsed to nothing, or ('failed',
+    None) for 'fail' answers and for running out of attempts otherwise. A page
+    that parses to nothing is retried, or reported as missing at once with
+    empty='missing' (for probes of books a version may lack).
+    Requests and waits go through the metrics recorder, so they show up as
+    request and sleep events (reasons 'retry' and 'circuit_open').
+    """
+    attempts = policy.attempts if attempts is None else max(int(attempts), 1)
+    all_empty = True
+    for attempt in range(1, attempts + 1):
+        while True:
+            wait = breaker.wait_time()
+            if wait <= 0:
+                break
+            recorder.sleep(wait, 'circuit_open')
+
+        retry_after = None
+        try:
+            response = recorder.fetch(session, url, attempt=attempt, **kwargs)
+        except Exception as e:
+            outcome, reason = 'retry', f"{type(e).__name__}: {e}"
+        else:
+            outcome, reason = classify(response.status_code), f"HTTP {response.status_code}"
+            retry_after = parse_retry_after(response.headers.get('Retry-After'))
+
+        if outcome in ('missing', 'fail'):
+            breaker.record_success()
+            print(f"  {label}: {reason}, not retrying")
+            return ('missing' if outcome == 'missing' else 'failed'), None
+        all_empty = all_empty and outcome == 'ok'
+        if outcome == 'ok':
+            breaker.record_success()
+            try:
+                parsed = parse(response)
+            except Exception as e:
+                parsed, reason = None, f"parse error {type(e).__name__}: {e}"
+                all_empty = False
+            if parsed:
+                return 'ok', parsed
+            if parsed is not None:
+                if empty == 'missing':
+                    print(f"  {label}: no verses on the page, not retrying")
+                    return 'missing', None
+                reason = 'no verses on the page'
+        elif breaker.record_failure(retry_after) or breaker.is_open():
+            # The breaker holds every fetch to the host; its wait replaces the backoff
+            if attempt < attempts:
+                when = 'once the circuit closes' if breaker.is_open() else f"in {retry_after:.1f}s (Retry-After)"
+                print(f"  {label}: {reason}, retry {attempt}/{attempts - 1} {when}")
+                continue
+
+        if attempt < attempts:
+            delay = policy.delay(attempt, retry_after)
+            print(f"  {label}: {reason}, retry {attempt}/{attempts - 1} in {delay:.1f}s"
+                  f"{' (Retry-After)' if retry_after is not None else ''}")
+            recorder.sleep(delay, 'retry')
+        else:
+            print(f"  {label}: {reason}, giving up after {attempts} attempt(s)")
+    return ('empty' if all_empty else 'failed'), None
@@ -0,0 +1,542 @@
+#!/usr/bin/env python3
+"""
+Positional full-text index over a translation's TXT files, with a small query
+engine on top.
+
+Output structure:
+  txt_bibles/{language}/{translation}/{translation}.search
+  txt_bibles/{language}/{translation}/{translation}.folded.search   (Hebrew and Greek)
+
+Query syntax:
+  light darkness        verses containing both words (AND)
+  light OR darkness     verses containing either word
+  "in the beginning"    exact phrase
+  begin*                any word starting with 'begin'
+
+OR binds loosest, so 'faith hope OR love' means (faith AND hope) OR love.
+Matching is case-insensitive. In the main index Hebrew points/cantillation and
+Greek accents are part of the word, so words match only as written in the text.
+Hebrew and Greek translations also get a folded index whose terms went through
+a folding profile at build time:
+
+  hebrew         strip points, cantillation and other marks (בְּרֵאשִׁ֖ית -> בראשית)
+  hebrew-finals  as hebrew, and fold final letters to their medial form (ם -> מ)
+  greek          strip accents, breathings and iota subscripts, fold final sigma (λόγος -> λογοσ)
+
+The profile is recorded in the index header and applied to queries as well, so
+plain consonants or unaccented Greek find the pointed/accented verses.
+
+File layout (all integers little-endian):
+  header         magic 'BSI1', u16 format version, u16 folding profile, u32 term count,
+                 u32 verse count, u32 term text size, u32 posting count,
+                 u32 position count, 20-byte SHA-1 of the TXT files
+  terms          UTF-8 terms in sorted order, '\\n'-separated
+  term table     term count x (u32 first posting, u32 posting count, u32 first position)
+  verse table    verse count x u32 verse key, then verse count x u16 token count
+  postings       posting count x u32 verse key, then posting count x u16 positions in verse
+  positions      position count x u16 token positions, grouped by posting
+
+Postings are fixed width rather than varint-coded so a term's postings load
+with a single array.frombytes() instead of a Python decode loop.
+"""
+
+import argparse
+import os
+import re
+import struct
+import sys
+import time
+import unicodedata
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
+from itertools import accumulate, compress, islice
+from pathlib import Path
+
+from txt_corpus import iter_translation_verses, list_translations, split_verse_key, translation_fingerprint, verse_key
+
+MAGIC = b'BSI1'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sHHIIIII20s')
+TERM_ENTRY = struct.Struct('<III')
+
+# Word characters plus Hebrew points/cantillation and Greek combining accents
+TOKEN_PATTERN = re.compile(r'[\w\u0591-\u05BD\u05BF\u05C1\u05C2\u05C4\u05C5\u05C7\u0300-\u036F]+')
+QUERY_PATTERN = re.compile(r'"([^"]*)"?|(\S+)')
+
+HEBREW_MARKS = re.compile(r'[\u0591-\u05C7]')
+GREEK_MARKS = re.compile(r'[\u0300-\u036F]')
+HEBREW_FINAL_FORMS = str.maketrans('ךםןףץ', 'כמנפצ')
+
+# Stored in the index header - never renumber
+FOLD_PROFILES = {None: 0, 'hebrew': 1, 'hebrew-finals': 2, 'greek': 3}
+FOLD_PROFILE_NAMES = {number: name for name, number in FOLD_PROFILES.items()}
+
+# Folding profile of the secondary index built for each language directory
+LANGUAGE_FOLD_PROFILES = {'hebrew': 'hebrew-finals', 'greek': 'greek'}
+
+MAX_POSITION = 0xFFFF
+
+# Terms whose position bounds are kept for phrase queries
+POSITION_CACHE_SIZE = 256
+
+# Candidates are located in a term's postings by bisection when there are
+# fewer than 1/BISECT_RATIO as many as postings, otherwise by one scan
+BISECT_RATIO = 16
+
+# Candidate verses whose positions a limited search checks at first; each later batch doubles
+FIRST_PHRASE_BATCH = 32
+
+@lru_cache(maxsize=65536)
+def fold_term(term, profile):
+    """Apply a folding profile to a lowercase term"""
+    if profile in ('hebrew', 'hebrew-finals'):
+        term = HEBREW_MARKS.sub('', unicodedata.normalize('NFD', term))
+        if profile == 'hebrew-finals':
+            term = term.translate(HEBREW_FINAL_FORMS)
+    elif profile == 'greek':
+        # casefold() has already turned final sigma into σ
+        term = GREEK_MARKS.sub('', unicodedata.normalize('NFD', term))
+    return unicodedata.normalize('NFC', term)
+
+def tokenize(text, profile=None):
+    """Split text into lowercase index terms, folded with a profile if one is given"""
+    tokens = [token.casefold() for token in TOKEN_PATTERN.findall(text)]
+    if profile:
+        tokens = [folded for folded in (fold_term(token, profile) for token in tokens) if folded]
+    return tokens
+
+def index_path(translation_path, translation, profile=None):
+    """Path of the search index for a translation directory (the folded one if a profile is given)"""
+    if profile:
+        return os.path.join(translation_path, f"{translation}.folded.search")
+    return os.path.join(translation_path, f"{translation}.search")
+
+def _u32_array(data):
+    values = array('I')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _u16_array(data):
+    values = array('H')
+    values.frombytes(data)
+    if sys.byteorder == 'big':
+        values.byteswap()
+    return values
+
+def _array_bytes(values):
+    if sys.byteorder == 'big':
+        values = array(values.typecode, values)
+        values.byteswap()
+    return values.tobytes()
+
+def pack_index(verses, fingerprint=b'', profile=None):
+    """Pack (book, chapter, verse, text) tuples into the bytes of a search index"""
+    postings = {}
+    lengths = {}
+    for book, chapter, verse, text in verses:
+        key = verse_key(book, chapter, verse)
+        # Duplicate verse lines continue the same verse, as in the verse store
+        offset = lengths.get(key, 0)
+        tokens = tokenize(text, profile)
+        for position, term in enumerate(tokens, offset):
+            if position > MAX_POSITION:
+                break
+            term_postings = postings.setdefault(term, {})
+            term_postings.setdefault(key, []).append(position)
+        lengths[key] = offset + len(tokens)
+
+    terms = sorted(postings)
+    term_table = []
+    posting_keys = array('I')
+    posting_counts = array('H')
+    positions = array('H')
+    for term in terms:
+        term_table.append((len(posting_keys), len(postings[term]), len(positions)))
+        for key in sorted(postings[term]):
+            verse_positions = postings[term][key]
+            posting_keys.append(key)
+            posting_counts.append(len(verse_positions))
+            positions.extend(verse_positions)
+
+    verse_keys = array('I', sorted(lengths))
+    verse_lengths = array('H', (min(lengths[key], MAX_POSITION) for key in verse_keys))
+    term_text = '\n'.join(terms).encode('utf-8')
+
+    packed = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, FOLD_PROFILES[profile], len(terms), len(verse_keys), len(term_text),
+                                   len(posting_keys), len(positions), fingerprint.ljust(20, b'\0')[:20]))
+    packed += term_text
+    for entry in term_table:
+        packed += TERM_ENTRY.pack(*entry)
+    for values in (verse_keys, verse_lengths, posting_keys, posting_counts, positions):
+        packed += _array_bytes(values)
+    return bytes(packed)
+
+def read_index_header(index_file):
+    """(folding profile, source fingerprint) of an index file, or None if it is missing or unreadable"""
+    try:
+        with open(index_file, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, profile_id, *_, fingerprint = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION or profile_id not in FOLD_PROFILE_NAMES:
+        return None
+    return FOLD_PROFILE_NAMES[profile_id], fingerprint
+
+def build_translation_index(translation_path, translation, profile=None, force=False):
+    """Build a translation's search index unless it is already up to date with the TXT files.
+
+    Returns (index file, True if it was rebuilt).
+    """
+    output_file = index_path(translation_path, translation, profile)
+    fingerprint = translation_fingerprint(translation_path, translation)
+    if not force and read_index_header(output_file) == (profile, fingerprint):
+        return output_file, False
+
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(pack_index(iter_translation_verses(translation_path, translation), fingerprint, profile))
+    os.replace(temp_file, output_file)
+    return output_file, True
+
+def build_translation_indexes(language, translation_path, translation, force=False):
+    """Build the main index and, for Hebrew and Greek, the folded index.
+
+    Returns a list of (index file, True if it was rebuilt).
+    """
+    results = [build_translation_index(translation_path, translation, force=force)]
+    profile = LANGUAGE_FOLD_PROFILES.get(language)
+    if profile:
+        results.append(build_translation_index(translation_path, translation, profile, force=force))
+    return results
+
+def load_translation_index(translation_path, translation, profile=None):
+    """Open a translation's search index, building it in memory if the file is missing or stale"""
+    index_file = index_path(translation_path, translation, profile)
+    fingerprint = translation_fingerprint(translation_path, translation)
+    if read_index_header(index_file) == (profile, fingerprint):
+        return SearchIndex.open(index_file)
+    return SearchIndex(pack_index(iter_translation_verses(translation_path, translation), fingerprint, profile))
+
+class SearchIndex:
+    """Read-only search index held in memory.
+
+    Term lookups are a dict hit; prefix queries bisect the sorted term list.
+    A term's postings and positions are sliced out of the shared arrays on
+    demand; the per-term position bounds used by phrase matching are cached.
+    """
+
+    def __init__(self, data):
+        (magic, version, profile_id, term_count, verse_count, term_size,
+         posting_count, position_count, fingerprint) = HEADER.unpack_from(data, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a search index")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported search index version {version}")
+
+        if profile_id not in FOLD_PROFILE_NAMES:
+            raise ValueError(f"Unknown folding profile {profile_id}")
+
+        self.profile = FOLD_PROFILE_NAMES[profile_id]
+        self.fingerprint = fingerprint
+        offset = HEADER.size
+        self.terms = data[offset:offset + term_size].decode('utf-8').split('\n') if term_count else []
+        self._term_ids = {term: i for i, term in enumerate(self.terms)}
+        offset += term_size
+
+        self._term_table = _u32_array(data[offset:offset + term_count * TERM_ENTRY.size])
+        offset += term_count * TERM_ENTRY.size
+
+        sections = []
+        for count, width in ((verse_count, 4), (verse_count, 2), (posting_count, 4), (posting_count, 2), (position_count, 2)):
+            sections.append(data[offset:offset + count * width])
+            offset += count * width
+        self.verse_keys = _u32_array(sections[0])
+        self.verse_lengths = _u16_array(sections[1])
+        self._posting_keys = _u32_array(sections[2])
+        self._posting_counts = _u16_array(sections[3])
+        self._positions = _u16_array(sections[4])
+        self._position_cache = {}
+
+    @classmethod
+    def open(cls, path):
+        """Read an index file"""
+        with open(path, 'rb') as f:
+            return cls(f.read())
+
+    def __len__(self):
+        return len(self.verse_keys)
+
+    def tokenize(self, text):
+        """Tokenize query text with the index's folding profile"""
+        return tokenize(text, self.profile)
+
+    def _entry(self, term_id):
+        base = term_id * 3
+        return self._term_table[base], self._term_table[base + 1], self._term_table[base + 2]
+
+    def document_frequency(self, term):
+        """Number of verses containing a term"""
+        term_id = self._term_ids.get(term)
+        return 0 if term_id is None else self._entry(term_id)[1]
+
+    def verses_for(self, term):
+        """Verse keys containing a term, in canonical order"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return array('I')
+        first, count, _ = self._entry(term_id)
+        return self._posting_keys[first:first + count]
+
+    def postings(self, term):
+        """(verse keys, occurrence counts) of a term, in canonical order"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return array('I'), array('H')
+        first, count, _ = self._entry(term_id)
+        return self._posting_keys[first:first + count], self._posting_counts[first:first + count]
+
+    def _position_bounds(self, term):
+        """Offsets into the position array where each of a term's postings starts, plus the end, cached"""
+        cached = self._position_cache.get(term)
+        if cached is not None:
+            return cached
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return []
+        first, count, first_position = self._entry(term_id)
+        bounds = list(accumulate(self._posting_counts[first:first + count], initial=first_position))
+        if len(self._position_cache) >= POSITION_CACHE_SIZE:
+            self._position_cache.clear()
+        self._position_cache[term] = bounds
+        return bounds
+
+    def _position_spans(self, term, keys):
+        """(starts, ends) in the position array of a term's postings for sorted verse keys it occurs in"""
+        bounds = self._position_bounds(term)
+        first, count, _ = self._entry(self._term_ids[term])
+        if len(keys) == count:
+            return bounds[:-1], bounds[1:]
+        term_keys = self._posting_keys[first:first + count]
+        if len(keys) * BISECT_RATIO < count:
+            picked = []
+            i = 0
+            for key in keys:
+                i = bisect_left(term_keys, key, i)
+                picked.append(i)
+        else:
+            wanted = set(keys)
+            picked = list(compress(range(count), map(wanted.__contains__, term_keys)))
+        return [bounds[i] for i in picked], [bounds[i + 1] for i in picked]
+
+    def positions(self, term, key):
+        """Token positions of a term within one verse"""
+        term_id = self._term_ids.get(term)
+        if term_id is None:
+            return array('H')
+        first, count, _ = self._entry(term_id)
+        i = bisect_left(self._posting_keys, key, first, first + count)
+        if i == first + count or self._posting_keys[i] != key:
+            return array('H')
+        bounds = self._position_bounds(term)
+        return self._positions[bounds[i - first]:bounds[i - first + 1]]
+
+    def expand_prefix(self, prefix):
+        """Terms starting with prefix, in sorted order"""
+        start = bisect_left(self.terms, prefix)
+        end = start
+        while end < len(self.terms) and self.terms[end].startswith(prefix):
+            end += 1
+        return self.terms[start:end]
+
+    def _word_terms(self, word):
+        """Terms a query word stands for: prefix expansions, its single term, or the tokens of a phrase"""
+        if word.endswith('*') and len(word) > 1:
+            return [term for prefix in self.tokenize(word[:-1])[-1:] for term in self.expand_prefix(prefix)]
+        return self.tokenize(word)
+
+    def _item_cost(self, kind, value):
+        """Upper bound on the verses a clause item can match, to order the items by"""
+        if kind == 'word' and value.endswith('*') and len(value) > 1:
+            return sum(map(self.document_frequency, self._word_terms(value)))
+        tokens = self._word_terms(value) if kind == 'word' else self.tokenize(value)
+        return min(map(self.document_frequency, tokens), default=0)
+
+    def _word_keys(self, word, within=None):
+        if word.endswith('*') and len(word) > 1:
+            keys = set()
+            for term in self._word_terms(word):
+                keys.update(self.verses_for(term))
+            return keys if within is None else keys & within
+        # "God's" tokenizes to two terms - match them as a phrase
+        return self._phrase_keys(self.tokenize(word), within)
+
+    def _phrase_candidates(self, tokens, within=None):
+        """Verses containing every token (limited to the verse keys within, if given)"""
+        # Intersect the verse lists from the rarest term up, before any positions are read
+        candidates = within
+        for token in sorted(set(tokens), key=self.document_frequency):
+            postings = self.verses_for(token)
+            candidates = set(postings) if candidates is None else candidates.intersection(postings)
+            if not candidates:
+                return set()
+        return candidates
+
+    def _iter_phrase_matches(self, tokens, keys, batch=None):
+        """Yield the sorted verse keys whose positions hold tokens as a phrase, checking batch keys at a time"""
+        positions = self._positions
+        batch = batch or len(keys)
+        done = 0
+        while done < len(keys):
+            # Positions are decoded only for this batch, aligned by candidate across tokens
+            batch_keys = keys[done:done + batch]
+            spans = {token: self._position_spans(token, batch_keys) for token in set(tokens)}
+            first_starts, first_ends = spans[tokens[0]]
+            following = [(offset,) + spans[token] for offset, token in enumerate(tokens[1:], 1)]
+            for n, key in enumerate(batch_keys):
+                # Phrase start positions still possible after each following token
+                starts = set(positions[first_starts[n]:first_ends[n]])
+                for offset, token_starts, token_ends in following:
+                    starts.intersection_update([position - offset for position in positions[token_starts[n]:token_ends[n]]])
+                    if not starts:
+                        break
+                else:
+                    yield key
+            done += batch
+            batch *= 2
+
+    def _phrase_keys(self, tokens, within=None):
+        """Verses containing tokens as a phrase (limited to the verse keys within, if given)"""
+        if not tokens:
+            return set()
+        candidates = self._phrase_candidates(tokens, within)
+        if len(tokens) == 1 or not candidates:
+            return candidates
+        return set(self._iter_phrase_matches(tokens, sorted(candidates)))
+
+    def _first_matches(self, kind, value, within, limit):
+        """(first limit verse keys an item matches within, total, True if the total is estimated)"""
+        if kind == 'word' and value.endswith('*') and len(value) > 1:
+            keys = sorted(self._word_keys(value, within))
+            return keys[:limit], len(keys), False
+        tokens = self.tokenize(value)
+        if not tokens:
+            return [], 0, False
+        if len(tokens) == 1 and within is None:
+            # Postings are already in canonical order
+            postings = self.verses_for(tokens[0])
+            return list(postings[:limit]), len(postings), False
+        candidates = sorted(self._phrase_candidates(tokens, within))
+        if len(tokens) == 1:
+            return candidates[:limit], len(candidates), False
+
+        if limit == 0:
+            # Nothing checked: every candidate might match
+            return [], len(candidates), True
+        batch = None if limit is None else max(limit, FIRST_PHRASE_BATCH)
+        matches = list(islice(self._iter_phrase_matches(tokens, candidates, batch), limit))
+        checked = bisect_right(candidates, matches[-1]) if matches else 0
+        if limit is None or len(matches) < limit or checked == len(candidates):
+            return matches, len(matches), False
+        # Stopped early: extrapolate from the share of checked candidates that matched
+        return matches, round(len(matches) * len(candidates) / checked), True
+
+    def _clauses(self, query):
+        clauses = [[]]
+        for phrase, word in QUERY_PATTERN.findall(query):
+            if word == 'OR':
+                clauses.append([])
+            elif word:
+                clauses[-1].append(('word', word))
+            else:
+                clauses[-1].append(('phrase', phrase))
+        return [clause for clause in clauses if clause]
+
+    def search_page(self, query, limit=None):
+        """(first limit verse keys matching a query in canonical order, total matches, True if the total is estimated)
+
+        With a limit, phrase positions are only checked until each clause has
+        limit verses, and the total of a phrase is extrapolated from the
+        candidates checked so far. Totals over several OR clauses that were
+        cut short assume the clauses match independently.
+        """
+        results = []
+        for clause in self._clauses(query):
+            # Evaluate the most selective items first; each later item only checks the verses left
+            items = sorted(clause, key=lambda item: self._item_cost(*item))
+            keys = None
+            for kind, value in items[:-1]:
+                keys = self._phrase_keys(self.tokenize(value), keys) if kind == 'phrase' else self._word_keys(value, keys)
+                if not keys:
+                    break
+            else:
+                results.append(self._first_matches(*items[-1], keys, limit))
+
+        if not results:
+            return [], 0, False
+        if len(results) == 1:
+            return results[0]
+        keys = sorted(set().union(*(clause_keys for clause_keys, _, _ in results)))
+        if all(len(clause_keys) == total for clause_keys, total, _ in results):
+            # Every clause is complete, so the union is exact
+            return keys[:limit], len(keys), False
+        verse_count = len(self) or 1
+        missed = 1.0
+        for _, total, _ in results:
+            missed *= 1 - total / verse_count
+        total = max(round(verse_count * (1 - missed)), len(keys), *(total for _, total, _ in results))
+        return keys[:limit], total, True
+
+    def search(self, query, limit=None):
+        """Verse keys matching a query, in canonical order"""
+        return self.search_page(query, limit)[0]
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Build and query full-text search indexes for TXT Bibles')
+    parser.add_argument('--txt-bibles', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    build_parser = subparsers.add_parser('build', help='Build indexes for translations whose TXT files changed')
+    build_parser.add_argument('--force', action='store_true', help='Rebuild every index')
+
+    search_parser = subparsers.add_parser('search', help='Search one or more translations')
+    search_parser.add_argument('query', help='Query, e.g. \'"in the beginning" OR logos\'')
+    search_parser.add_argument('--version', '-v', action='append', help='Translation to search (repeatable, default: all)')
+    search_parser.add_argument('--exact', action='store_true', help='Match Hebrew/Greek points and accents exactly instead of folding them')
+    search_parser.add_argument('--limit', type=int, default=20, help='Verses to print per translation (default: %(default)s)')
+    args = parser.parse_args()
+
+    translations = list_translations(args.txt_bibles)
+    if args.command == 'build':
+        for language, translation, translation_path in translations:
+            started = time.perf_counter()
+            results = build_translation_indexes(language, translation_path, translation, force=args.force)
+            summary = ', '.join(f"{os.path.basename(output_file)} {'built' if rebuilt else 'up to date'}"
+                                for output_file, rebuilt in results)
+            print(f"  {language}/{translation}: {summary} ({time.perf_counter() - started:.2f}s)")
+        return
+
+    from verse_store import load_translation_store
+    for language, translation, translation_path in translations:
+        if args.version and translation not in args.version:
+            continue
+        profile = None if args.exact else LANGUAGE_FOLD_PROFILES.get(language)
+        index = load_translation_index(translation_path, translation, profile)
+        started = time.perf_counter()
+        keys = index.search(args.query)
+        elapsed = (time.perf_counter() - started) * 1000
+        print(f"{translation}: {len(keys)} verse(s) in {elapsed:.2f} ms")
+        with load_translation_store(translation_path, translation) as store:
+            for key in keys[:args.limit]:
+                book, chapter, verse = split_verse_key(key)
+                print(f"  {book:02d} {chapter}:{verse} {store.get(book, chapter, verse)}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,212 @@
+#!/usr/bin/env python3
+"""
+Strong's number concordance captured from tagged verse text.
+
+BlueLetterBible text carries Strong's tags after the words they belong to
+("In the beginning H7225 God H430 created H1254 ..."). The converter and the
+downloaders pull the tags out before the text is cleaned for display and
+record them here instead of throwing them away.
+
+Output structure:
+  txt_bibles/{language}/{translation}/{translation}.strongs.json
+
+  {"format": 1, "numbers": {"G26": [43003016, 5, 43013004, 12, ...], ...}}
+
+Each number maps to flat (verse key, position) pairs in canonical order. The
+position is the index of the tagged word among the search index tokens of the
+verse text, so it lines up with search_index phrase positions.
+"""
+
+import argparse
+import json
+import os
+import re
+from pathlib import Path
+
+from search_index import TOKEN_PATTERN
+from txt_corpus import list_translations, parse_verse_line, split_verse_key, verse_key
+
+FORMAT_VERSION = 1
+
+STRONGS_PATTERN = re.compile(r'[\s\u00A0\u2000-\u200F]+([HG])(\d+)\b')
+NUMBER_PATTERN = re.compile(r'^\s*([HGhg])0*(\d+)\s*$')
+
+def normalize_number(number):
+    """Canonical form of a Strong's number ('g0026' -> 'G26'), or None if it is not one"""
+    match = NUMBER_PATTERN.match(str(number))
+    if not match:
+        return None
+    return f"{match.group(1).upper()}{int(match.group(2))}"
+
+def extract_strongs(text):
+    """Split Strong's tags out of verse text.
+
+    Returns (text without the tags, [(number, position)]) where position is
+    the token index of the word each tag follows.
+    """
+    tags = []
+    parts = []
+    last = 0
+    tokens = 0
+    for match in STRONGS_PATTERN.finditer(text):
+        segment = text[last:match.start()]
+        tokens += len(TOKEN_PATTERN.findall(segment))
+        parts.append(segment)
+        tags.append((f"{match.group(1)}{int(match.group(2))}", max(tokens - 1, 0)))
+        last = match.end()
+    if not tags:
+        return text, tags
+    parts.append(text[last:])
+    return ''.join(parts), tags
+
+def concordance_path(translation_path, translation):
+    """Path of the Strong's concordance for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.strongs.json")
+
+def _number_sort_key(number):
+    return number[0], int(number[1:])
+
+class StrongsConcordance:
+    """Strong's number -> [(verse key, position)] for one translation"""
+
+    def __init__(self, numbers=None):
+        self.numbers = numbers or {}
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def add(self, key, tags):
+        """Record (number, position) tags found in one verse"""
+        for number, position in tags:
+            self.numbers.setdefault(number, []).append((key, position))
+
+    def extract_lines(self, book, lines):
+        """Strip Strong's tags from 'Book C:V text' lines, recording them under book.
+
+        Lines that repeat a verse continue its token positions, matching how the
+        verse store and search index join them.
+        """
+        cleaned = []
+        token_counts = {}
+        for line in lines:
+            parsed = parse_verse_line(line)
+            if parsed is None:
+                cleaned.append(line)
+                continue
+            chapter, verse, text = parsed
+            key = verse_key(book, chapter, verse)
+            stripped, tags = extract_strongs(text)
+            offset = token_counts.get(key, 0)
+            self.add(key, [(number, position + offset) for number, position in tags])
+            token_counts[key] = offset + len(TOKEN_PATTERN.findall(stripped))
+            if tags:
+                line = line[:len(line) - len(text)] + re.sub(r'\s+', ' ', stripped).strip()
+            cleaned.append(line)
+        return cleaned
+
+    def replace_book(self, book, other):
+        """Replace this concordance's entries for one book with those of another concordance"""
+        for number in list(self.numbers):
+            kept = [entry for entry in self.numbers[number] if entry[0] // 1000000 != book]
+            if kept:
+                self.numbers[number] = kept
+            else:
+                del self.numbers[number]
+        for number, entries in other.numbers.items():
+            self.numbers.setdefault(number, []).extend(entry for entry in entries if entry[0] // 1000000 == book)
+
+    def occurrences(self, number):
+        """(verse key, position) pairs for a Strong's number, in canonical order"""
+        return self.numbers.get(normalize_number(number), [])
+
+    def to_json(self):
+        numbers = {}
+        for number in sorted(self.numbers, key=_number_sort_key):
+            numbers[number] = [value for entry in sorted(set(self.numbers[number])) for value in entry]
+        return json.dumps({'format': FORMAT_VERSION, 'numbers': numbers}, separators=(',', ':'))
+
+    def write(self, output_file):
+        """Write the concordance (left untouched if unchanged); an empty one removes the file"""
+        if not self.numbers:
+            if os.path.exists(output_file):
+                os.remove(output_file)
+            return False
+        content = self.to_json().encode('utf-8')
+        try:
+            with open(output_file, 'rb') as f:
+                if f.read() == content:
+                    return False
+        except FileNotFoundError:
+            pass
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+        os.replace(temp_file, output_file)
+        return True
+
+    @classmethod
+    def load(cls, path):
+        """Read a concordance file (empty if it is missing)"""
+        try:
+            with open(path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+        except FileNotFoundError:
+            return cls()
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported Strong's concordance format {data.get('format')}")
+        return cls({
+            number: list(zip(values[::2], values[1::2]))
+            for number, values in data.get('numbers', {}).items()
+        })
+
+def merge_book_concordance(translation_path, translation, book, concordance):
+    """Merge one book's tags into a translation's concordance file, as the downloaders convert book by book"""
+    output_file = concordance_path(translation_path, translation)
+    merged = StrongsConcordance.load(output_file)
+    merged.replace_book(book, concordance)
+    return merged.write(output_file)
+
+def load_concordances(bible_base):
+    """Concordances of every translation that has one, keyed by translation"""
+    concordances = {}
+    for _, translation, translation_path in list_translations(bible_base):
+        path = concordance_path(translation_path, translation)
+        if os.path.exists(path):
+            concordances[translation] = StrongsConcordance.load(path)
+    return concordances
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description="Look up every occurrence of a Strong's number across translations")
+    parser.add_argument('number', help="Strong's number, e.g. G26 or H430")
+    parser.add_argument('--txt-bibles', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--version', '-v', action='append', help='Translation to search (repeatable, default: all)')
+    parser.add_argument('--limit', type=int, default=20, help='Occurrences to print per translation (default: %(default)s)')
+    args = parser.parse_args()
+
+    number = normalize_number(args.number)
+    if number is None:
+        parser.error(f"Not a Strong's number: {args.number}")
+
+    from verse_store import load_translation_store
+    found = False
+    for language, translation, translation_path in list_translations(args.txt_bibles):
+        if args.version and translation not in args.version:
+            continue
+        path = concordance_path(translation_path, translation)
+        if not os.path.exists(path):
+            continue
+        occurrences = StrongsConcordance.load(path).occurrences(number)
+        print(f"{translation}: {len(occurrences)} occurrence(s) of {number}")
+        found = True
+        with load_translation_store(translation_path, translation) as store:
+            for key, position in occurrences[:args.limit]:
+                book, chapter, verse = split_verse_key(key)
+                words = TOKEN_PATTERN.findall(store.get(book, chapter, verse) or '')
+                word = words[position] if position < len(words) else '?'
+                print(f"  {book:02d} {chapter}:{verse} {word}")
+    if not found:
+        print("No Strong's concordances found - convert a Strong's-tagged (BlueLetterBible) translation first")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,168 @@
+#!/usr/bin/env python3
+"""
+Synthetic json_bibles trees for benchmarking the converter at full scale.
+
+  python3 synthetic_corpus.py /tmp/bench --languages 12 --versions 3
+
+writes {output}/json_bibles/{language}/{translation}/... for the given
+number of languages x translations, cycling through the three layouts the
+converter reads:
+
+  chapters   {t}_{NN}-{book}/{t}_{NN}-{book}_chapter-{CC}.json, one file per
+             chapter as the downloaders write them, with cross-references and
+             footnotes on some verses (BibleGateway) or Strong's tags
+             (BlueLetterBible)
+  opengnt    {t}_{NN}-{book}/{t}_{NN}-{book}.json, one OpenGNT file per book
+             holding all its chapters
+  flat       {NN}-{book}-{t}.json, OpenGNT books directly in the
+             translation directory
+
+Books have their real chapter counts and 10-39 verses per chapter (about
+31,000 verses per full Bible); every fourth translation is New Testament only.
+Content is derived from --seed, so the same options give the same tree.
+"""
+
+import argparse
+import json
+import os
+import random
+from pathlib import Path
+
+LAYOUTS = ('chapters', 'opengnt', 'flat')
+
+# (book key, display name, chapter count) in canonical order
+BOOKS = [
+    ('genesis', 'Genesis', 50), ('exodus', 'Exodus', 40), ('leviticus', 'Leviticus', 27),
+    ('numbers', 'Numbers', 36), ('deuteronomy', 'Deuteronomy', 34), ('joshua', 'Joshua', 24),
+    ('judges', 'Judges', 21), ('ruth', 'Ruth', 4), ('1-samuel', '1 Samuel', 31), ('2-samuel', '2 Samuel', 24),
+    ('1-kings', '1 Kings', 22), ('2-kings', '2 Kings', 25), ('1-chronicles', '1 Chronicles', 29),
+    ('2-chronicles', '2 Chronicles', 36), ('ezra', 'Ezra', 10), ('nehemiah', 'Nehemiah', 13),
+    ('esther', 'Esther', 10), ('job', 'Job', 42), ('psalms', 'Psalms', 150), ('proverbs', 'Proverbs', 31),
+    ('ecclesiastes', 'Ecclesiastes', 12), ('song-of-solomon', 'Song of Solomon', 8), ('isaiah', 'Isaiah', 66),
+    ('jeremiah', 'Jeremiah', 52), ('lamentations', 'Lamentations', 5), ('ezekiel', 'Ezekiel', 48),
+    ('daniel', 'Daniel', 12), ('hosea', 'Hosea', 14), ('joel', 'Joel', 3), ('amos', 'Amos', 9),
+    ('obadiah', 'Obadiah', 1), ('jonah', 'Jonah', 4), ('micah', 'Micah', 7), ('nahum', 'Nahum', 3),
+    ('habakkuk', 'Habakkuk', 3), ('zephaniah', 'Zephaniah', 3), ('haggai', 'Haggai', 2),
+    ('zechariah', 'Zechariah', 14), ('malachi', 'Malachi', 4), ('matthew', 'Matthew', 28), ('mark', 'Mark', 16),
+    ('luke', 'Luke', 24), ('john', 'John', 21), ('acts', 'Acts', 28), ('romans', 'Romans', 16),
+    ('1-corinthians', '1 Corinthians', 16), ('2-corinthians', '2 Corinthians', 13), ('galatians', 'Galatians', 6),
+    ('ephesians', 'Ephesians', 6), ('philippians', 'Philippians', 4), ('colossians', 'Colossians', 4),
+    ('1-thessalonians', '1 Thessalonians', 5), ('2-thessalonians', '2 Thessalonians', 3),
+    ('1-timothy', '1 Timothy', 6), ('2-timothy', '2 Timothy', 4), ('titus', 'Titus', 3),
+    ('philemon', 'Philemon', 1), ('hebrews', 'Hebrews', 13), ('james', 'James', 5), ('1-peter', '1 Peter', 5),
+    ('2-peter', '2 Peter', 3), ('1-john', '1 John', 5), ('2-john', '2 John', 1), ('3-john', '3 John', 1),
+    ('jude', 'Jude', 1), ('revelation', 'Revelation', 22),
+]
+FIRST_NT_BOOK = 40
+
+# Languages in the converter's LANGUAGES list, most common first
+LANGUAGES = ['english', 'spanish', 'french', 'german', 'portuguese', 'italian', 'dutch', 'russian', 'korean',
+             'chinese', 'greek', 'hebrew', 'arabic', 'romanian', 'polish', 'swedish', 'norwegian', 'danish',
+             'finnish', 'czech', 'hungarian', 'ukrainian', 'bulgarian', 'croatian', 'serbian', 'turkish',
+             'indonesian', 'vietnamese', 'thai', 'japanese', 'hindi', 'tamil', 'telugu', 'filipino', 'latin']
+
+WORDS = ('and', 'the', 'of', 'unto', 'land', 'people', 'went', 'said', 'house', 'day', 'city', 'word', 'came',
+         'upon', 'their', 'sons', 'king', 'brought', 'water', 'field', 'bread', 'blessed', 'spake', 'before',
+         'children', 'according', 'behold', 'heaven', 'earth', 'shall', 'covenant', 'mercy', 'light')
+
+OSIS_TARGETS = (('Gen', 50), ('Exod', 40), ('Ps', 150), ('Isa', 66), ('Matt', 28), ('John', 21), ('Rom', 16), ('Rev', 22))
+
+def verse_text(rng, strongs=False, heading=False):
+    words = [rng.choice(WORDS) for _ in range(rng.randint(6, 40))]
+    if strongs:
+        words = [f"{word} {rng.choice('HG')}{rng.randint(1, 8674)}" if rng.random() < 0.6 else word for word in words]
+    text = f"{words[0].capitalize()} {' '.join(words[1:])}."
+    if heading:
+        title = f"{rng.choice(WORDS).capitalize()} {rng.choice(WORDS)}"
+        text = f"({title}) {title} {text}"
+    return text
+
+def chapter_verses(rng, strongs=False, notes=False):
+    """Verse dicts of one chapter in the downloaders' chapter JSON format"""
+    verses = []
+    for verse in range(1, rng.randint(10, 39) + 1):
+        verse_data = {'verse': verse, 'text': verse_text(rng, strongs, heading=verse == 1 and rng.random() < 0.3)}
+        if notes and rng.random() < 0.2:
+            osis, chapters = rng.choice(OSIS_TARGETS)
+            chapter = rng.randint(1, chapters)
+            verse_data['crossrefs'] = [f"{osis}.{chapter}.{rng.randint(1, 10)}"]
+            if rng.random() < 0.3:
+                verse_data['footnotes'] = [f"Or {rng.choice(WORDS)} {rng.choice(WORDS)}"]
+        verses.append(verse_data)
+    return verses
+
+def write_json(path, data):
+    with open(path, 'w', encoding='utf-8') as f:
+        json.dump(data, f, indent=2, ensure_ascii=False)
+
+def generate_translation(translation_dir, translation, layout, rng, books, nt_only=False, strongs=False, notes=False):
+    """Write one translation in a layout; returns the number of files written"""
+    os.makedirs(translation_dir, exist_ok=True)
+    files = 0
+    for book_num, (book, display_name, chapter_count) in enumerate(BOOKS, 1):
+        if book_num > books or (nt_only and book_num < FIRST_NT_BOOK):
+            continue
+        if layout == 'chapters':
+            book_dir = os.path.join(translation_dir, f"{translation}_{book_num:02d}-{book}")
+            os.makedirs(book_dir, exist_ok=True)
+            for chapter in range(1, chapter_count + 1):
+                write_json(os.path.join(book_dir, f"{translation}_{book_num:02d}-{book}_chapter-{chapter:02d}.json"), {
+                    'book': book, 'chapter': chapter, 'translation': translation,
+                    'verses': chapter_verses(rng, strongs, notes),
+                })
+                files += 1
+            continue
+
+        chapters = {}
+        for chapter in range(1, chapter_count + 1):
+            verses = chapter_verses(rng, strongs)
+            # OpenGNT verses are plain strings or {"text": ...} objects
+            chapters[str(chapter)] = {'verses': {str(v['verse']): ({'text': v['text']} if v['verse'] % 2 else v['text'])
+                                                 for v in verses}}
+        data = {'book_number': book_num, 'book_name': display_name, 'chapters': chapters}
+        if layout == 'opengnt':
+            book_dir = os.path.join(translation_dir, f"{translation}_{book_num:02d}-{book}")
+            os.makedirs(book_dir, exist_ok=True)
+            write_json(os.path.join(book_dir, f"{translation}_{book_num:02d}-{book}.json"), data)
+        else:
+            write_json(os.path.join(translation_dir, f"{book_num:02d}-{book}-{translation}.json"), data)
+        files += 1
+    return files
+
+def generate_corpus(output_dir, languages=4, versions=2, books=66, layouts=LAYOUTS, seed=1):
+    """Write a synthetic json_bibles tree under output_dir; returns [(language, translation, layout, files)]"""
+    json_base = Path(output_dir) / 'json_bibles'
+    rng = random.Random(seed)
+    written = []
+    index = 0
+    for language in LANGUAGES[:languages]:
+        for version in range(1, versions + 1):
+            layout = layouts[index % len(layouts)]
+            translation = f"syn{language[:3]}{version}"
+            files = generate_translation(json_base / language / translation, translation, layout, rng, books,
+                                         nt_only=index % 4 == 3, strongs=index % 4 == 1, notes=index % 4 == 0)
+            written.append((language, translation, layout, files))
+            index += 1
+    return written
+
+def main():
+    parser = argparse.ArgumentParser(description='Write a synthetic json_bibles tree for converter benchmarks')
+    parser.add_argument('output', help='Directory to create json_bibles/ in')
+    parser.add_argument('--languages', type=int, default=4, help=f'Number of languages, up to {len(LANGUAGES)} (default: %(default)s)')
+    parser.add_argument('--versions', type=int, default=2, help='Translations per language (default: %(default)s)')
+    parser.add_argument('--books', type=int, default=66, help='Books per translation, in canonical order (default: %(default)s)')
+    parser.add_argument('--layouts', default=','.join(LAYOUTS), help='Comma-separated layouts to cycle through (default: %(default)s)')
+    parser.add_argument('--seed', type=int, default=1, help='Random seed (default: %(default)s)')
+    args = parser.parse_args()
+
+    layouts = tuple(layout.strip() for layout in args.layouts.split(',') if layout.strip())
+    unknown = [layout for layout in layouts if layout not in LAYOUTS]
+    if unknown or not layouts:
+        parser.error(f"unknown layout(s) {', '.join(unknown)}; choose from {', '.join(LAYOUTS)}")
+    written = generate_corpus(args.output, args.languages, args.versions, args.books, layouts, args.seed)
+    for language, translation, layout, files in written:
+        print(f"  {language}/{translation:<12} {layout:<9} {files:5d} file(s)")
+    print(f"Wrote {len(written)} translation(s), {sum(entry[3] for entry in written)} file(s) to {Path(args.output) / 'json_bibles'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+"""
+Whole-translation bundles: every book file of a translation in one file.
+
+  txt_bibles/{language}/{translation}/{translation}.bundle
+
+Layout (all integers little-endian):
+  header      magic 'BTB1', u16 format version, u16 book count
+  book table  book count x (u16 book number, u16 reserved, u32 offset, u32 length)
+  books       the book files' bytes, concatenated in canonical order
+
+Offsets are from the start of the bundle, so a client holding the bundle
+slices a book out with a single subarray. Bundles are written by
+build_manifest.py in the same pass that hashes the book files, so a bundle
+always matches the versions.json entry that points at it, and get .gz/.br
+siblings like the TXT files.
+
+  python3 translation_bundle.py txt_bibles/english/ylt/ylt.bundle
+"""
+
+import argparse
+import os
+import struct
+
+from precompress import precompress_file
+from txt_corpus import VERSE_LINE_PATTERN
+
+MAGIC = b'BTB1'
+FORMAT_VERSION = 1
+
+HEADER = struct.Struct('<4sHH')
+BOOK_ENTRY = struct.Struct('<HHII')
+
+def bundle_path(translation_path, translation):
+    """Path of the bundle for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.bundle")
+
+def pack_bundle(books):
+    """Bytes of a bundle from (book number, book bytes) pairs"""
+    books = sorted(books)
+    offset = HEADER.size + BOOK_ENTRY.size * len(books)
+    packed = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, len(books)))
+    for book, data in books:
+        packed += BOOK_ENTRY.pack(book, 0, offset, len(data))
+        offset += len(data)
+    for _, data in books:
+        packed += data
+    return bytes(packed)
+
+def read_bundle(data):
+    """book number -> book bytes of a bundle"""
+    magic, version, count = HEADER.unpack_from(data, 0)
+    if magic != MAGIC:
+        raise ValueError("Not a translation bundle")
+    if version != FORMAT_VERSION:
+        raise ValueError(f"Unsupported translation bundle version {version}")
+    books = {}
+    for i in range(count):
+        book, _, offset, length = BOOK_ENTRY.unpack_from(data, HEADER.size + i * BOOK_ENTRY.size)
+        books[book] = data[offset:offset + length]
+    return books
+
+def write_bundle(translation_path, translation, books):
+    """Write a translation's bundle unless unchanged and refresh its siblings; returns (path, bytes, written)"""
+    output_file = bundle_path(translation_path, translation)
+    content = pack_bundle(books)
+    try:
+        with open(output_file, 'rb') as f:
+            unchanged = f.read() == content
+    except FileNotFoundError:
+        unchanged = False
+    if not unchanged:
+        temp_file = f"{output_file}.tmp"
+        with open(temp_file, 'wb') as f:
+            f.write(content)
+        os.replace(temp_file, output_file)
+    precompress_file(output_file)
+    return output_file, content, not unchanged
+
+def main():
+    parser = argparse.ArgumentParser(description='List the books in a translation bundle')
+    parser.add_argument('bundle', help='Path of a {translation}.bundle file')
+    args = parser.parse_args()
+
+    with open(args.bundle, 'rb') as f:
+        books = read_bundle(f.read())
+    for book, data in sorted(books.items()):
+        match = VERSE_LINE_PATTERN.match(data.split(b'\n', 1)[0].decode('utf-8', errors='replace'))
+        print(f"{book:2d}  {len(data):9,d} bytes  {match.group(1) if match else '?'}")
+    print(f"{len(books)} book(s), {sum(len(data) for data in books.values()):,d} bytes")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+"""
+Helpers for reading the TXT Bibles written by the converter and downloaders.
+
+Expected input structure:
+  txt_bibles/{language}/{translation}/{book_number:02d}-{book_name}-{translation}.txt
+
+Line format:
+  BookName Chapter:Verse Text
+
+Verses are identified across the tools by a verse key of the form
+BBCCCVVV (book * 1000000 + chapter * 1000 + verse), which sorts in
+canonical order and doubles as a verse ordinal.
+"""
+
+import hashlib
+import os
+import re
+
+VERSE_LINE_PATTERN = re.compile(r'^(.+?) (\d+):(\d+)\S* ?(.*)$')
+
+def verse_key(book, chapter, verse):
+    """Pack a (book, chapter, verse) reference into a BBCCCVVV verse key"""
+    return book * 1000000 + chapter * 1000 + verse
+
+def split_verse_key(key):
+    """Unpack a BBCCCVVV verse key into (book, chapter, verse)"""
+    return key // 1000000, key // 1000 % 1000, key % 1000
+
+def parse_verse_line(line):
+    """Parse 'Genesis 1:1 Text' into (chapter, verse, text), or None if it is not a verse line"""
+    match = VERSE_LINE_PATTERN.match(line.rstrip('\r\n'))
+    if not match:
+        return None
+    return int(match.group(2)), int(match.group(3)), match.group(4)
+
+def list_translations(bible_base):
+    """List (language, translation, path) for every translation directory under txt_bibles"""
+    translations = []
+    if not os.path.isdir(bible_base):
+        return translations
+    for language in sorted(os.listdir(bible_base)):
+        lang_path = os.path.join(bible_base, language)
+        if not os.path.isdir(lang_path):
+            continue
+        for translation in sorted(os.listdir(lang_path)):
+            translation_path = os.path.join(lang_path, translation)
+            if os.path.isdir(translation_path):
+                translations.append((language, translation, translation_path))
+    return translations
+
+def list_book_files(translation_path, translation):
+    """List (book_number, book_key, path) for a translation's book files, in canonical order"""
+    suffix = f"-{translation}.txt"
+    books = []
+    for filename in os.listdir(translation_path):
+        if not filename.endswith(suffix) or len(filename) < 4 or filename[2] != '-':
+            continue
+        try:
+            book_num = int(filename[:2])
+        except ValueError:
+            continue
+        book_key = filename[3:-len(suffix)]
+        books.append((book_num, book_key, os.path.join(translation_path, filename)))
+    return sorted(books)
+
+def iter_book_verses(book_file):
+    """Yield (chapter, verse, text) for every verse line of a book file"""
+    with open(book_file, 'r', encoding='utf-8') as f:
+        for line in f:
+            parsed = parse_verse_line(line)
+            if parsed:
+                yield parsed
+
+def iter_translation_verses(translation_path, translation):
+    """Yield (book, chapter, verse, text) for every verse of a translation"""
+    for book_num, _, book_file in list_book_files(translation_path, translation):
+        for chapter, verse, text in iter_book_verses(book_file):
+            yield book_num, chapter, verse, text
+
+def translation_fingerprint(translation_path, translation):
+    """SHA-1 over the names and contents of a translation's book files, to detect changed TXT output"""
+    digest = hashlib.sha1()
+    for _, _, book_file in list_book_files(translation_path, translation):
+        digest.update(os.path.basename(book_file).encode('utf-8') + b'\0')
+        with open(book_file, 'rb') as f:
+            digest.update(f.read())
+    return digest.digest()
@@ -0,0 +1,300 @@
+#!/usr/bin/env python3
+"""
+Packed, memory-mappable verse store - one file per translation.
+
+Output structure:
+  txt_bibles/{language}/{translation}/{translation}.verses
+
+File layout (all integers little-endian):
+  header         magic 'BVS1', u16 format version, u16 book slots (66),
+                 u32 chapter count, u32 verse slot count, u32 text size,
+                 20-byte SHA-1 of the TXT files
+  book table     66 x (u32 first chapter index, u32 chapter count)
+  chapter table  chapter count x (u32 first verse slot, u32 verse count)
+  offset table   (verse slot count + 1) x u32 text offsets
+  text           UTF-8 verse text, verses back to back in canonical order
+
+Every chapter reserves one slot per verse number from 1 to its highest verse,
+so a (book, chapter, verse) lookup is three table reads and one slice of the
+mapped file. Missing verses are empty slots. The SHA-1 lets a rebuild leave
+the store alone while the TXT files are unchanged.
+"""
+
+import argparse
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from txt_corpus import iter_translation_verses, list_book_files, list_translations, translation_fingerprint
+
+MAGIC = b'BVS1'
+FORMAT_VERSION = 2
+BOOK_SLOTS = 66
+
+HEADER = struct.Struct('<4sHHIII20s')
+TABLE_ENTRY = struct.Struct('<II')
+OFFSET = struct.Struct('<I')
+
+def store_path(translation_path, translation):
+    """Path of the packed verse store for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.verses")
+
+def pack_verses(verses, fingerprint=b''):
+    """Pack (book, chapter, verse, text) tuples into the bytes of a verse store"""
+    books = {}
+    for book, chapter, verse, text in verses:
+        if not 1 <= book <= BOOK_SLOTS or chapter < 1 or verse < 1:
+            continue
+        chapter_verses = books.setdefault(book, {}).setdefault(chapter, {})
+        if verse in chapter_verses:
+            chapter_verses[verse] = f"{chapter_verses[verse]} {text}"
+        else:
+            chapter_verses[verse] = text
+
+    book_table = []
+    chapter_table = []
+    offsets = [0]
+    text = bytearray()
+
+    for book in range(1, BOOK_SLOTS + 1):
+        chapters = books.get(book)
+        if not chapters:
+            book_table.append((0, 0))
+            continue
+
+        last_chapter = max(chapters)
+        book_table.append((len(chapter_table), last_chapter))
+        for chapter in range(1, last_chapter + 1):
+            chapter_verses = chapters.get(chapter, {})
+            last_verse = max(chapter_verses) if chapter_verses else 0
+            chapter_table.append((len(offsets) - 1, last_verse))
+            for verse in range(1, last_verse + 1):
+                text += chapter_verses.get(verse, '').encode('utf-8')
+                offsets.append(len(text))
+
+    packed = bytearray(HEADER.pack(MAGIC, FORMAT_VERSION, BOOK_SLOTS, len(chapter_table), len(offsets) - 1, len(text),
+                                   fingerprint.ljust(20, b'\0')[:20]))
+    for entry in book_table + chapter_table:
+        packed += TABLE_ENTRY.pack(*entry)
+    packed += struct.pack(f'<{len(offsets)}I', *offsets)
+    packed += text
+    return bytes(packed)
+
+def write_verse_store(output_file, verses, fingerprint=b''):
+    """Write (book, chapter, verse, text) tuples to a packed verse store file"""
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(pack_verses(verses, fingerprint))
+    os.replace(temp_file, output_file)
+
+def read_store_fingerprint(store_file):
+    """Source fingerprint of a store file, or None if it is missing, unreadable or an older format"""
+    try:
+        with open(store_file, 'rb') as f:
+            header = f.read(HEADER.size)
+    except OSError:
+        return None
+    if len(header) < HEADER.size:
+        return None
+    magic, version, *_, fingerprint = HEADER.unpack(header)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        return None
+    return fingerprint
+
+def build_translation_store(translation_path, translation, force=False):
+    """Build a translation's verse store unless it is already up to date with the TXT files.
+
+    Returns (store file, True if it was rebuilt).
+    """
+    output_file = store_path(translation_path, translation)
+    fingerprint = translation_fingerprint(translation_path, translation)
+    if not force and read_store_fingerprint(output_file) == fingerprint:
+        # Same text: keep the file, only make it newer than rewritten book files so loaders still map it
+        store_mtime = os.stat(output_file).st_mtime
+        if any(os.stat(book_file).st_mtime > store_mtime
+               for _, _, book_file in list_book_files(translation_path, translation)):
+            os.utime(output_file)
+        return output_file, False
+
+    write_verse_store(output_file, iter_translation_verses(translation_path, translation), fingerprint)
+    return output_file, True
+
+def load_translation_store(translation_path, translation):
+    """Open a translation's verse store, packing its TXT files in memory if the file is missing or stale"""
+    store_file = store_path(translation_path, translation)
+    book_files = list_book_files(translation_path, translation)
+    try:
+        store_mtime = os.stat(store_file).st_mtime
+        if all(os.stat(book_file).st_mtime <= store_mtime for _, _, book_file in book_files):
+            return PackedVerseStore.open(store_file)
+    except (OSError, ValueError):
+        # Missing, or written in an older format
+        pass
+    return PackedVerseStore.from_bytes(pack_verses(iter_translation_verses(translation_path, translation)))
+
+class PackedVerseStore:
+    """Read-only view over a packed verse store.
+
+    Use PackedVerseStore.open() to map a file from disk or from_bytes() for a
+    store held in memory. Lookups never read more than the tables they need.
+    """
+
+    def __init__(self, buffer, file=None):
+        self._buffer = buffer
+        self._file = file
+        self._view = memoryview(buffer)
+
+        magic, version, book_slots, chapter_count, slot_count, text_size, fingerprint = HEADER.unpack_from(buffer, 0)
+        if magic != MAGIC:
+            raise ValueError("Not a packed verse store")
+        if version != FORMAT_VERSION:
+            raise ValueError(f"Unsupported verse store version {version}")
+
+        self.book_slots = book_slots
+        self.slot_count = slot_count
+        self.fingerprint = fingerprint
+        self._book_table = HEADER.size
+        self._chapter_table = self._book_table + book_slots * TABLE_ENTRY.size
+        self._offset_table = self._chapter_table + chapter_count * TABLE_ENTRY.size
+        self._text = self._offset_table + (slot_count + 1) * OFFSET.size
+
+    @classmethod
+    def open(cls, path):
+        """Memory-map a store file"""
+        f = open(path, 'rb')
+        try:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except Exception:
+            f.close()
+            raise
+        return cls(mapped, f)
+
+    @classmethod
+    def from_bytes(cls, data):
+        """Wrap a store that is already in memory"""
+        return cls(bytes(data))
+
+    def close(self):
+        """Release the mapping (views returned by get_bytes must be released first)"""
+        self._view.release()
+        if self._file is not None:
+            self._buffer.close()
+            self._file.close()
+            self._file = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def _book_entry(self, book):
+        if not 1 <= book <= self.book_slots:
+            return 0, 0
+        return TABLE_ENTRY.unpack_from(self._buffer, self._book_table + (book - 1) * TABLE_ENTRY.size)
+
+    def _chapter_entry(self, book, chapter):
+        first_chapter, chapter_count = self._book_entry(book)
+        if not 1 <= chapter <= chapter_count:
+            return None
+        return TABLE_ENTRY.unpack_from(self._buffer, self._chapter_table + (first_chapter + chapter - 1) * TABLE_ENTRY.size)
+
+    def _offsets(self, slot):
+        return struct.unpack_from('<II', self._buffer, self._offset_table + slot * OFFSET.size)
+
+    def _slot(self, book, chapter, verse):
+        entry = self._chapter_entry(book, chapter)
+        if entry is None:
+            return None
+        first_slot, verse_count = entry
+        if not 1 <= verse <= verse_count:
+            return None
+        return first_slot + verse - 1
+
+    def books(self):
+        """Book numbers present in the store"""
+        return [book for book in range(1, self.book_slots + 1) if self._book_entry(book)[1]]
+
+    def chapter_count(self, book):
+        """Number of chapters in a book (0 if the book is missing)"""
+        return self._book_entry(book)[1]
+
+    def verse_count(self, book, chapter):
+        """Highest verse number in a chapter (0 if the chapter is missing)"""
+        entry = self._chapter_entry(book, chapter)
+        return entry[1] if entry else 0
+
+    def get_bytes(self, book, chapter, verse):
+        """Zero-copy UTF-8 view of a verse's text, or None if it is missing"""
+        slot = self._slot(book, chapter, verse)
+        if slot is None:
+            return None
+        start, end = self._offsets(slot)
+        if start == end:
+            return None
+        return self._view[self._text + start:self._text + end]
+
+    def get(self, book, chapter, verse):
+        """Text of a verse, or None if it is missing"""
+        data = self.get_bytes(book, chapter, verse)
+        if data is None:
+            return None
+        try:
+            return str(data, 'utf-8')
+        finally:
+            data.release()
+
+    def get_range(self, book, start_chapter, start_verse, end_chapter=None, end_verse=None):
+        """List (chapter, verse, text) from start to end inclusive within one book.
+
+        end_chapter defaults to start_chapter and end_verse to the end of the
+        end chapter. Missing verses inside the range are skipped.
+        """
+        if end_chapter is None:
+            end_chapter = start_chapter
+        chapter_count = self.chapter_count(book)
+        end_chapter = min(end_chapter, chapter_count)
+
+        verses = []
+        for chapter in range(start_chapter, end_chapter + 1):
+            entry = self._chapter_entry(book, chapter)
+            if entry is None:
+                continue
+            first_slot, verse_count = entry
+            first = start_verse if chapter == start_chapter else 1
+            last = verse_count if end_verse is None or chapter != end_chapter else min(end_verse, verse_count)
+            if first > last:
+                continue
+
+            # Verses of a chapter are contiguous, so read their offsets in one go
+            slot = first_slot + first - 1
+            count = last - first + 1
+            offsets = struct.unpack_from(f'<{count + 1}I', self._buffer, self._offset_table + slot * OFFSET.size)
+            for i in range(count):
+                if offsets[i] != offsets[i + 1]:
+                    text = str(self._view[self._text + offsets[i]:self._text + offsets[i + 1]], 'utf-8')
+                    verses.append((chapter, first + i, text))
+        return verses
+
+    def iter_verses(self):
+        """Yield (book, chapter, verse, text) for every verse in the store"""
+        for book in self.books():
+            for chapter, verse, text in self.get_range(book, 1, 1, self.chapter_count(book)):
+                yield book, chapter, verse, text
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Build packed verse stores from TXT Bibles')
+    parser.add_argument('txt_bibles', nargs='?', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--force', action='store_true', help='Rebuild every store')
+    args = parser.parse_args()
+
+    for language, translation, translation_path in list_translations(args.txt_bibles):
+        output_file, rebuilt = build_translation_store(translation_path, translation, force=args.force)
+        with PackedVerseStore.open(output_file) as store:
+            print(f"  {language}/{translation}: {store.slot_count} verse slots -> {os.path.basename(output_file)}"
+                  f"{'' if rebuilt else ' (up to date)'}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,277 @@
+#!/usr/bin/env python3
+"""
+Versification rules and per-translation verse alignment tables.
+
+Canonical numbering is the English (KJV) one used by most translations. The
+Hebrew Bible (WLC) numbers some chapters differently - Malachi 4 is 3:19-24,
+Joel 2:28-3:21 is 3:1-4:21, most Psalm titles are verse 1 - and the Greek
+critical text (NA28) folds 2 Corinthians 13:14 into 13:13. The converter
+writes one alignment table per translation so split view can line verses up
+without reconciling reference strings on the client.
+
+Output structure:
+  txt_bibles/{language}/{translation}/{translation}.align.json
+
+  {"format": 1, "translation": "wlc", "schemes": {"ot": "hebrew", "nt": "english"},
+   "books": {"39": {"file": "39-malachi-wlc.txt",
+                    "verses": [4, 1, 3, 19, 81234, 120, ...]}}}
+
+verses holds flat (canonical chapter, canonical verse, local chapter, local
+verse, byte offset, byte length) rows sorted by canonical then local verse.
+Offset and length locate the verse text (after the "Book C:V " prefix) in the
+book file. A canonical verse spread over several local verses has several
+rows. Local verses with no canonical counterpart are attached to the previous
+canonical verse, except Psalm titles, which become verse 0 of their Psalm.
+"""
+
+import argparse
+import json
+import os
+from pathlib import Path
+
+from txt_corpus import VERSE_LINE_PATTERN, list_book_files, list_translations
+
+FORMAT_VERSION = 1
+
+# To the end of the chapter
+END = 999
+
+PSALMS = 19
+
+JOEL = 29
+MALACHI = 39
+
+# Highest verse of chapters whose length differs between the schemes: (book, chapter): (english, hebrew)
+SCHEME_VERSE_COUNTS = {(MALACHI, 3): (18, 24), (JOEL, 2): (32, 27)}
+
+# (book, canonical chapter, first verse, last verse, local chapter, local first verse),
+# first match wins - so narrower rules come before the chapter-wide rule they refine
+HEBREW_RULES = [
+    (1, 31, 55, 55, 32, 1), (1, 32, 1, END, 32, 2),
+    (2, 8, 1, 4, 7, 26), (2, 8, 5, END, 8, 1), (2, 22, 1, 1, 21, 37), (2, 22, 2, END, 22, 1),
+    (3, 6, 1, 7, 5, 20), (3, 6, 8, END, 6, 1),
+    (4, 16, 36, 50, 17, 1), (4, 17, 1, END, 17, 16), (4, 29, 40, 40, 30, 1), (4, 30, 1, END, 30, 2),
+    (5, 12, 32, 32, 13, 1), (5, 13, 1, END, 13, 2), (5, 22, 30, 30, 23, 1), (5, 23, 1, END, 23, 2),
+    (5, 29, 1, 1, 28, 69), (5, 29, 2, END, 29, 1),
+    (9, 21, 1, END, 21, 2), (9, 23, 29, 29, 24, 1), (9, 24, 1, END, 24, 2),
+    (10, 18, 33, 33, 19, 1), (10, 19, 1, END, 19, 2),
+    (11, 4, 21, 34, 5, 1), (11, 5, 1, END, 5, 15), (11, 22, 44, END, 22, 45),
+    (12, 11, 21, 21, 12, 1), (12, 12, 1, END, 12, 2),
+    (13, 6, 1, 15, 5, 27), (13, 6, 16, END, 6, 1),
+    (14, 2, 1, 1, 1, 18), (14, 2, 2, END, 2, 1), (14, 14, 1, 1, 13, 23), (14, 14, 2, END, 14, 1),
+    (16, 4, 1, 6, 3, 33), (16, 4, 7, END, 4, 1), (16, 9, 38, 38, 10, 1), (16, 10, 1, END, 10, 2),
+    (18, 41, 1, 8, 40, 25), (18, 41, 9, END, 41, 1),
+    (21, 5, 1, 1, 4, 17), (21, 5, 2, END, 5, 1),
+    (22, 6, 13, 13, 7, 1), (22, 7, 1, END, 7, 2),
+    (23, 9, 1, 1, 8, 23), (23, 9, 2, END, 9, 1), (23, 64, 1, 1, 63, 19), (23, 64, 2, END, 64, 1),
+    (24, 9, 1, 1, 8, 23), (24, 9, 2, END, 9, 1),
+    (26, 20, 45, 49, 21, 1), (26, 21, 1, END, 21, 6),
+    (27, 4, 1, 3, 3, 31), (27, 4, 4, END, 4, 1), (27, 5, 31, 31, 6, 1), (27, 6, 1, END, 6, 2),
+    (28, 1, 10, 11, 2, 1), (28, 2, 1, END, 2, 3), (28, 11, 12, 12, 12, 1), (28, 12, 1, END, 12, 2),
+    (28, 13, 16, 16, 14, 1), (28, 14, 1, END, 14, 2),
+    (29, 2, 28, 32, 3, 1), (29, 3, 1, END, 4, 1),
+    (32, 1, 17, 17, 2, 1), (32, 2, 1, END, 2, 2),
+    (33, 5, 1, 1, 4, 14), (33, 5, 2, END, 5, 1),
+    (34, 1, 15, 15, 2, 1), (34, 2, 1, END, 2, 2),
+    (38, 1, 18, 21, 2, 1), (38, 2, 1, END, 2, 5),
+    (39, 4, 1, END, 3, 19),
+]
+
+# Psalms whose title is verse 1 (or verses 1-2) in the Hebrew numbering
+PSALM_TITLE_VERSES = {
+    **dict.fromkeys([3, 4, 5, 6, 7, 8, 9, 12, 13, 18, 19, 20, 21, 22, 30, 31, 34, 36, 38, 39, 40, 41, 42,
+                     44, 45, 46, 47, 48, 49, 53, 55, 56, 57, 58, 59, 61, 62, 63, 64, 65, 67, 68, 69, 70,
+                     75, 76, 77, 80, 81, 83, 84, 85, 88, 89, 92, 102, 108, 140, 142], 1),
+    **dict.fromkeys([51, 52, 54, 60], 2),
+}
+
+# English Psalm 13:5-6 is Hebrew 13:6
+HEBREW_RULES.append((19, 13, 6, 6, 13, 6))
+HEBREW_RULES.extend((19, psalm, 1, END, psalm, 1 + offset) for psalm, offset in sorted(PSALM_TITLE_VERSES.items()))
+
+# NA28 joins the English 2 Corinthians 13:12-13 and numbers 13:14 as 13:13
+CRITICAL_RULES = [
+    (47, 13, 13, 13, 13, 12), (47, 13, 14, 14, 13, 13),
+]
+
+# Rules whose target verse also keeps its own canonical verse (Isaiah 63:19 holds 63:19 and 64:1)
+JOIN_RULES = {(23, 64, 1, 1, 63, 19), (47, 13, 13, 13, 13, 12)}
+
+SCHEME_RULES = {'english': [], 'hebrew': HEBREW_RULES, 'critical': CRITICAL_RULES}
+
+def _index_rules(rules):
+    by_source = {}
+    by_target = {}
+    for rule in rules:
+        book, chapter, _, _, local_chapter, _ = rule
+        by_source.setdefault((book, chapter), []).append(rule)
+        by_target.setdefault((book, local_chapter), []).append(rule)
+    return by_source, by_target
+
+class Versification:
+    """Maps canonical (book, chapter, verse) to a translation's local numbering and back"""
+
+    def __init__(self, ot_scheme='english', nt_scheme='english'):
+        self.schemes = {'ot': ot_scheme, 'nt': nt_scheme}
+        self._rules = _index_rules(SCHEME_RULES[ot_scheme] + SCHEME_RULES[nt_scheme])
+
+    def to_local(self, book, chapter, verse):
+        """Local (chapter, verse) of a canonical verse"""
+        for _, _, first, last, local_chapter, local_first in self._rules[0].get((book, chapter), ()):
+            if first <= verse <= last:
+                return local_chapter, local_first + verse - first
+        return chapter, verse
+
+    def to_canonical(self, book, chapter, verse):
+        """Canonical (chapter, verse) keys whose local verse is this one (empty if none)"""
+        candidates = set()
+        shifted_here = False
+        for rule in self._rules[1].get((book, chapter), ()):
+            _, canonical_chapter, first, last, _, local_first = rule
+            if local_first <= verse <= local_first + (last - first):
+                candidates.add((canonical_chapter, first + verse - local_first))
+                shifted_here = shifted_here or rule not in JOIN_RULES
+        if not shifted_here:
+            candidates.add((chapter, verse))
+        return sorted(candidate for candidate in candidates
+                      if candidate[1] >= 1 and self.to_local(book, *candidate) == (chapter, verse))
+
+def detect_versification(language, chapters):
+    """Pick the schemes of a translation from its {book: {chapter: verse count}} shape.
+
+    The OT scheme is only Hebrew when Malachi 3 or Joel 2 has the Hebrew verse
+    count and neither has the English one; a missing chapter says nothing, so
+    partial downloads fall back to English.
+    """
+    malachi = chapters.get(MALACHI, {})
+    joel = chapters.get(JOEL, {})
+    counts = {(book, chapter): chapters.get(book, {}).get(chapter) for book, chapter in SCHEME_VERSE_COUNTS}
+    english_shape = any(counts[key] == english for key, (english, _) in SCHEME_VERSE_COUNTS.items())
+    hebrew_shape = any(counts[key] == hebrew for key, (_, hebrew) in SCHEME_VERSE_COUNTS.items())
+    if hebrew_shape and not english_shape:
+        ot_scheme = 'hebrew'
+    elif language == 'hebrew' and not malachi and not joel:
+        ot_scheme = 'hebrew'
+    else:
+        ot_scheme = 'english'
+    second_corinthians = chapters.get(47, {})
+    nt_scheme = 'critical' if second_corinthians.get(13) == 13 else 'english'
+    return Versification(ot_scheme, nt_scheme)
+
+def read_book_lines(book_file):
+    """List (chapter, verse, text byte offset, text byte length) for every verse line of a book file"""
+    lines = []
+    offset = 0
+    with open(book_file, 'rb') as f:
+        for raw_line in f:
+            line = raw_line.rstrip(b'\r\n').decode('utf-8')
+            match = VERSE_LINE_PATTERN.match(line)
+            if match:
+                text_start = len(line[:match.start(4)].encode('utf-8'))
+                text_length = len(match.group(4).encode('utf-8'))
+                lines.append((int(match.group(2)), int(match.group(3)), offset + text_start, text_length))
+            offset += len(raw_line)
+    return lines
+
+def align_book(book, lines, versification):
+    """Alignment rows (canonical chapter, canonical verse, local chapter, local verse, offset, length) for a book"""
+    aligned = [versification.to_canonical(book, chapter, verse) for chapter, verse, _, _ in lines]
+
+    rows = []
+    for i, (chapter, verse, offset, length) in enumerate(lines):
+        canonical = aligned[i]
+        if not canonical:
+            # Orphans open a Psalm (its title) or continue the previous canonical verse
+            previous = next((aligned[j][-1] for j in range(i - 1, -1, -1) if aligned[j]), None)
+            if previous and not (book == PSALMS and previous[0] != chapter):
+                canonical = [previous]
+            else:
+                following = next((aligned[j][0] for j in range(i + 1, len(lines)) if lines[j][0] == chapter and aligned[j]), None)
+                canonical = [(following[0] if following else chapter, 0)]
+        for canonical_chapter, canonical_verse in canonical:
+            rows.append((canonical_chapter, canonical_verse, chapter, verse, offset, length))
+    rows.sort()
+    return rows
+
+def alignment_path(translation_path, translation):
+    """Path of the alignment table for a translation directory"""
+    return os.path.join(translation_path, f"{translation}.align.json")
+
+def build_alignment(language, translation_path, translation):
+    """Build a translation's alignment table from its TXT files"""
+    book_files = list_book_files(translation_path, translation)
+    book_lines = {book: read_book_lines(book_file) for book, _, book_file in book_files}
+
+    chapters = {}
+    for book, lines in book_lines.items():
+        for chapter, verse, _, _ in lines:
+            chapter_counts = chapters.setdefault(book, {})
+            chapter_counts[chapter] = max(chapter_counts.get(chapter, 0), verse)
+    versification = detect_versification(language, chapters)
+
+    books = {}
+    for book, _, book_file in book_files:
+        rows = align_book(book, book_lines[book], versification)
+        books[str(book)] = {
+            'file': os.path.basename(book_file),
+            'verses': [value for row in rows for value in row],
+        }
+    return {'format': FORMAT_VERSION, 'translation': translation, 'schemes': versification.schemes, 'books': books}
+
+def write_alignment(language, translation_path, translation):
+    """Write a translation's alignment table (left untouched if unchanged). Returns (path, True if written)"""
+    output_file = alignment_path(translation_path, translation)
+    content = json.dumps(build_alignment(language, translation_path, translation), separators=(',', ':')).encode('utf-8')
+    try:
+        with open(output_file, 'rb') as f:
+            if f.read() == content:
+                return output_file, False
+    except FileNotFoundError:
+        pass
+    temp_file = f"{output_file}.tmp"
+    with open(temp_file, 'wb') as f:
+        f.write(content)
+    os.replace(temp_file, output_file)
+    return output_file, True
+
+class AlignmentTable:
+    """Loaded alignment table with O(1) canonical verse lookups"""
+
+    def __init__(self, data):
+        if data.get('format') != FORMAT_VERSION:
+            raise ValueError(f"Unsupported alignment format {data.get('format')}")
+        self.translation = data['translation']
+        self.schemes = data['schemes']
+        self.files = {}
+        self._verses = {}
+        for book, entry in data['books'].items():
+            book = int(book)
+            self.files[book] = entry['file']
+            values = entry['verses']
+            for i in range(0, len(values), 6):
+                canonical_chapter, canonical_verse, *local = values[i:i + 6]
+                self._verses.setdefault((book, canonical_chapter, canonical_verse), []).append(tuple(local))
+
+    @classmethod
+    def load(cls, path):
+        with open(path, 'r', encoding='utf-8') as f:
+            return cls(json.load(f))
+
+    def lookup(self, book, chapter, verse):
+        """(local chapter, local verse, byte offset, byte length) rows for a canonical verse"""
+        return self._verses.get((book, chapter, verse), [])
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Build verse alignment tables for TXT Bibles')
+    parser.add_argument('txt_bibles', nargs='?', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    args = parser.parse_args()
+
+    for language, translation, translation_path in list_translations(args.txt_bibles):
+        output_file, written = write_alignment(language, translation_path, translation)
+        table = AlignmentTable.load(output_file)
+        schemes = ', '.join(f"{part} {scheme}" for part, scheme in table.schemes.items())
+        print(f"  {language}/{translation}: {os.path.basename(output_file)} {'written' if written else 'unchanged'} ({schemes})")
+
+if __name__ == '__main__':
+    main()
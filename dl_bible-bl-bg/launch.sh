@@ -66,56 +66,6 @@ load_custom_versions() {
     fi
 }
 
-update_versions_json() {
-    local version_code="$1"
-    local full_info="$2"
-    
-    if [[ -z "$version_code" || -z "$full_info" ]]; then
-        return
-    fi
-    
-    local language="${full_info%% - *}"
-    local name="${full_info#* - }"
-    
-    local versions_json="$SCRIPT_DIR/../public/txt_bibles/versions.json"
-    
-    if [[ ! -f "$versions_json" ]]; then
-        echo '{}' > "$versions_json"
-    fi
-    
-    if grep -q "\"$version_code\"" "$versions_json" 2>/dev/null; then
-        return
-    fi
-    
-    local temp_file=$(mktemp)
-    
-    if grep -q "\"$language\"" "$versions_json" 2>/dev/null; then
-        python3 -c "
-import json
-with open('$versions_json', 'r') as f:
-    data = json.load(f)
-if '$language' not in data.get('languages', {}):
-    data.setdefault('languages', {})['$language'] = {}
-data['languages']['$language']['$version_code'] = '$name'
-with open('$temp_file', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-" 2>/dev/null
-    else
-        python3 -c "
-import json
-with open('$versions_json', 'r') as f:
-    data = json.load(f)
-data.setdefault('languages', {})['$language'] = {'$version_code': '$name'}
-with open('$temp_file', 'w') as f:
-    json.dump(data, f, indent=2, ensure_ascii=False)
-" 2>/dev/null
-    fi
-    
-    if [[ -f "$temp_file" ]]; then
-        mv "$temp_file" "$versions_json"
-    fi
-}
-
 get_config_value() {
     local key="$1"
     local default="$2"
@@ -303,11 +253,6 @@ run_action() {
                 trans="${version%%:*}"
                 rest="${version#*:}"
                 source="${rest%%:*}"
-                full_info="${rest#*:}"
-                
-                if [[ "$full_info" == "$source" ]]; then
-                    full_info=""
-                fi
                 
                 echo "  ▸ Pulling $trans from $source..."
                 
@@ -321,10 +266,6 @@ run_action() {
                         python3 bible_gateway_downloader.py "$trans" 2>/dev/null || echo "    ⚠ $trans not available in BibleGateway"
                         ;;
                 esac
-                
-                if [[ -n "$full_info" ]]; then
-                    update_versions_json "$trans" "$full_info"
-                fi
             done
             
             echo ""
@@ -6,6 +6,47 @@ import { populateVersionDropdown } from './versionDropdown.js';
 import { loadBookList, loadChapter, navigate, collapseAllAndScrollTop, expandToSavedBook, highlightSavedChapter } from './navigation.js';
 import { setupHighlighting } from './highlighting.js';
 
+async function updateOfflineButton() {
+    // Shown when the selected version has a bundle and the browser has Cache Storage
+    const translations = BibleLoader.getTranslations(el.bibleVersion.value);
+    const hasBundles = (await Promise.all(translations.map(translation => BibleLoader.hasBundle(translation)))).every(Boolean);
+    el.offlineToggle.style.display = hasBundles ? '' : 'none';
+    if (!hasBundles) {
+        return;
+    }
+    const saved = (await Promise.all(translations.map(translation => BibleLoader.isAvailableOffline(translation)))).every(Boolean);
+    el.offlineToggle.classList.toggle('offline-active', saved);
+    el.offlineToggle.title = saved ? 'Available offline - click to remove the saved copy' : 'Save this version for offline reading';
+}
+
+async function toggleOffline() {
+    // Save the selected version's bundle (one request) for offline reading, or remove the saved copy
+    const translations = BibleLoader.getTranslations(el.bibleVersion.value);
+    let failed = false;
+    el.offlineToggle.disabled = true;
+    try {
+        if (el.offlineToggle.classList.contains('offline-active')) {
+            await Promise.all(translations.map(translation => BibleLoader.removeOfflineTranslation(translation)));
+        } else {
+            await Promise.all(translations.map(translation => BibleLoader.prefetchTranslation(translation)));
+            // A missing bundle (e.g. a deploy without the generated files) or a full cache leaves nothing saved
+            failed = !(await Promise.all(translations.map(translation => BibleLoader.isAvailableOffline(translation)))).every(Boolean);
+        }
+    } finally {
+        el.offlineToggle.disabled = false;
+    }
+    await updateOfflineButton();
+    if (failed) {
+        console.warn(`Could not save ${translations.join(', ')} for offline reading`);
+        el.offlineToggle.textContent = '⚠️';
+        el.offlineToggle.title = 'Could not save this version for offline reading';
+        setTimeout(() => {
+            el.offlineToggle.textContent = '📥';
+            updateOfflineButton();
+        }, 4000);
+    }
+}
+
 function setupEvents() {
     el.sendBtn.addEventListener('click', () => {
         if (chatState.isProcessing) {
@@ -194,6 +235,7 @@ function setupEvents() {
                 loadChapter(chatState.currentChapter, chatState.currentBook.name);
             }
         }
+        updateOfflineButton();
     });
     el.bibleHeader.addEventListener('click', function() {
         // Mobile only: if menu is open and at top, close it
@@ -234,6 +276,7 @@ function setupEvents() {
     });
     el.toggleAI.addEventListener('click', toggleChat);
     el.toggleTheme.addEventListener('click', toggleTheme);
+    el.offlineToggle.addEventListener('click', toggleOffline);
     el.title.addEventListener('click', function() {
         // Mobile only: if menu is open and at top, close it
         if (window.innerWidth <= 768) {
@@ -554,6 +597,7 @@ async function initializeApp() {
         el.bibleVersion.value = 'esv';
         BibleLoader.setVersion('esv');
     }
+    updateOfflineButton();
 
     loadChatHistory();
     
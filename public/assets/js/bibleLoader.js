@@ -71,6 +71,14 @@ const BibleLoader = {
     ],
 
     cache: new Map(),
+    manifest: null,
+    manifestPromise: null,
+    chapterIndexes: new Map(),
+    bundles: new Map(),
+    offlineBundles: new Map(),
+    bundleCacheName: 'bible-bundles',
+    alignments: new Map(),
+    alignmentIndexes: new Map(),
 
     setVersion(version) {
         if (this.currentVersion !== version) {
@@ -78,6 +86,13 @@ const BibleLoader = {
             this.cache.clear(); // Clear cache when version changes
             console.log(`Bible version changed to: ${version}`);
         }
+        // Pick up bundles saved for offline reading in an earlier visit
+        this.getTranslations(version).forEach(translation => this.loadOfflineBundle(translation));
+    },
+
+    getTranslations(version) {
+        // Translations behind a version choice: 'original' reads WLC and NA28/UBS5
+        return version === 'original' ? ['wlc', 'na28-ubs5'] : [version];
     },
 
 getBookFileName(bookNum) {
@@ -92,6 +107,212 @@ getBookFileName(bookNum) {
         return `${version}_${String(bookNum).padStart(2, '0')}-${name}`;
     },
 
+    loadManifest() {
+        // versions.json written by build_manifest.py: language directory, book files, sizes and hashes per version
+        if (!this.manifestPromise) {
+            this.manifestPromise = fetch('txt_bibles/versions.json')
+                .then(response => response.ok ? response.json() : null)
+                .catch(() => null)
+                .then(manifest => {
+                    this.manifest = manifest;
+                    return manifest;
+                });
+        }
+        return this.manifestPromise;
+    },
+
+    getBookPath(version, bookNum, bookNameLower) {
+        // Resolve a book file from the manifest, or null if the manifest lists the version without that book
+        const entry = this.manifest?.versions?.[version];
+        if (entry) {
+            const book = entry.books[bookNum];
+            if (!book) {
+                return null;
+            }
+            // The content hash keeps cached copies from outliving an updated file
+            return `txt_bibles/${entry.dir}/${version}/${book.file}?h=${book.sha1.slice(0, 12)}`;
+        }
+        return `txt_bibles/${this.getLanguageDir(version)}/${version}/${String(bookNum).padStart(2, '0')}-${bookNameLower}-${version}.txt`;
+    },
+
+    getBundleUrl(manifest, version) {
+        // Hashed URL of a translation's {version}.bundle, or null if the manifest lists none
+        const entry = manifest?.versions?.[version];
+        if (!entry?.bundle) {
+            return null;
+        }
+        return `txt_bibles/${entry.dir}/${version}/${entry.bundle.file}?h=${entry.bundle.sha1.slice(0, 12)}`;
+    },
+
+    async openBundleCache() {
+        // Cache Storage for saved bundles (null where unavailable, e.g. plain http on a LAN address)
+        try {
+            return window.caches ? await caches.open(this.bundleCacheName) : null;
+        } catch (error) {
+            return null;
+        }
+    },
+
+    async savedBundleRequests(cache, version) {
+        // Every saved copy of a translation's bundle, whatever its hash
+        const file = this.manifest?.versions?.[version]?.bundle?.file || `${version}.bundle`;
+        return (await cache.keys()).filter(request => new URL(request.url).pathname.endsWith(`/${version}/${file}`));
+    },
+
+    prefetchTranslation(version) {
+        // Pull every book of a translation in one request from its {version}.bundle and keep it in
+        // Cache Storage, so it stays available offline across reloads (resolves to null if unavailable)
+        if (!this.bundles.has(version)) {
+            const bundlePromise = this.loadManifest().then(async manifest => {
+                const url = this.getBundleUrl(manifest, version);
+                if (!url) {
+                    return null;
+                }
+                const cache = await this.openBundleCache();
+                let response = cache && await cache.match(url);
+                if (!response) {
+                    response = await fetch(url);
+                    if (!response.ok) {
+                        return null;
+                    }
+                    if (cache) {
+                        // Replace copies saved before the bundle last changed
+                        await Promise.all((await this.savedBundleRequests(cache, version)).map(request => cache.delete(request)));
+                        await cache.put(url, response.clone());
+                    }
+                }
+                const books = this.parseBundle(await response.arrayBuffer());
+                console.log(`Prefetched ${version}: ${books ? books.size : 0} books in one request`);
+                return books;
+            }).catch(() => null).then(books => {
+                if (!books) {
+                    this.bundles.delete(version);
+                }
+                return books;
+            });
+            this.bundles.set(version, bundlePromise);
+        }
+        return this.bundles.get(version);
+    },
+
+    loadOfflineBundle(version) {
+        // Use a bundle saved in an earlier visit without touching the network (resolves to null if none);
+        // a copy saved before the bundle changed is replaced in the background
+        if (!this.offlineBundles.has(version)) {
+            this.offlineBundles.set(version, this.loadManifest().then(async manifest => {
+                const url = this.getBundleUrl(manifest, version);
+                const cache = url && await this.openBundleCache();
+                if (!cache) {
+                    return null;
+                }
+                const response = await cache.match(url);
+                if (!response) {
+                    if ((await this.savedBundleRequests(cache, version)).length) {
+                        this.prefetchTranslation(version);
+                    }
+                    return null;
+                }
+                const books = this.parseBundle(await response.arrayBuffer());
+                if (books && !this.bundles.has(version)) {
+                    this.bundles.set(version, Promise.resolve(books));
+                }
+                return books;
+            }).catch(() => null));
+        }
+        return this.offlineBundles.get(version);
+    },
+
+    async isAvailableOffline(version) {
+        // Whether the current bundle of a translation is saved in Cache Storage
+        const url = this.getBundleUrl(await this.loadManifest(), version);
+        const cache = url && await this.openBundleCache();
+        return Boolean(cache && await cache.match(url));
+    },
+
+    async hasBundle(version) {
+        return Boolean(this.getBundleUrl(await this.loadManifest(), version)) && Boolean(window.caches);
+    },
+
+    async removeOfflineTranslation(version) {
+        // Drop a translation's saved bundle; books are fetched one by one again
+        const cache = await this.openBundleCache();
+        if (cache) {
+            await this.loadManifest();
+            await Promise.all((await this.savedBundleRequests(cache, version)).map(request => cache.delete(request)));
+        }
+        this.bundles.delete(version);
+        this.offlineBundles.delete(version);
+    },
+
+    parseBundle(buffer) {
+        // 'BTB1', u16 format version, u16 book count, then (u16 book, u16 reserved, u32 offset, u32 length) per book, little-endian
+        const view = new DataView(buffer);
+        const magic = String.fromCharCode(...new Uint8Array(buffer, 0, 4));
+        if (magic !== 'BTB1' || view.getUint16(4, true) !== 1) {
+            return null;
+        }
+        const books = new Map();
+        const count = view.getUint16(6, true);
+        for (let i = 0; i < count; i++) {
+            const row = 8 + i * 12;
+            books.set(view.getUint16(row, true), new Uint8Array(buffer, view.getUint32(row + 4, true), view.getUint32(row + 8, true)));
+        }
+        return books;
+    },
+
+    async fetchBookText(version, bookNum, textFilePath) {
+        // Slice the book out of a prefetched or saved bundle, else fetch its file (null if it cannot be loaded)
+        const bundle = this.bundles.has(version) ? await this.bundles.get(version) : await this.loadOfflineBundle(version);
+        const bytes = bundle && bundle.get(bookNum);
+        if (bytes) {
+            return new TextDecoder('utf-8').decode(bytes);
+        }
+        const response = await fetch(textFilePath);
+        return response.ok ? response.text() : null;
+    },
+
+    getLanguageDir(version) {
+        const entry = this.manifest?.versions?.[version];
+        if (entry) {
+            return entry.dir;
+        }
+
+        // Determine the language directory (versions missing from the manifest)
+        let languageDir = 'english';
+        if (version === 'wlc' || version === 'hhh') {
+            languageDir = 'hebrew';
+        } else if (version === 'na28' || version === 'na28-ubs5') {
+            languageDir = 'greek';
+        } else if (['csb', 'esv', 'kjv', 'nasb', 'net', 'niv', 'nlt', 'rsv', 'web', 'ylt'].includes(version)) {
+            languageDir = 'english';
+        } else if (['em', 'lbla', 'rvr1995', 'se'].includes(version)) {
+            languageDir = 'spanish';
+        } else if (['ls'].includes(version)) {
+            languageDir = 'french';
+        } else if (['lut'].includes(version)) {
+            languageDir = 'german';
+        } else if (['cht'].includes(version)) {
+            languageDir = 'chinese';
+        } else if (['nav', 'svd'].includes(version)) {
+            languageDir = 'arabic';
+        } else if (['kor'].includes(version)) {
+            languageDir = 'korean';
+        } else if (['rst'].includes(version)) {
+            languageDir = 'russian';
+        } else if (['vul'].includes(version)) {
+            languageDir = 'latin';
+        } else if (['abtag2001', 'apsd-ceb', 'ceb'].includes(version)) {
+            languageDir = 'filipino';
+        } else if (['erv-hi', 'shb'].includes(version)) {
+            languageDir = 'hindi';
+        } else if (['jlb'].includes(version)) {
+            languageDir = 'japanese';
+        } else if (['ukr'].includes(version)) {
+            languageDir = 'ukrainian';
+        }
+        return languageDir;
+    },
+
     async loadBook(bookNum) {
         const cacheKey = `book-${bookNum}-${this.currentVersion}`;
         if (this.cache.has(cacheKey)) {
@@ -101,39 +322,7 @@ getBookFileName(bookNum) {
         try {
             const version = this.currentVersion === 'original' ? (bookNum <= 39 ? 'wlc' : 'na28-ubs5') : this.currentVersion;
             
-            // Determine the language directory
-            let languageDir = 'english';
-            if (version === 'wlc' || version === 'hhh') {
-                languageDir = 'hebrew';
-            } else if (version === 'na28' || version === 'na28-ubs5') {
-                languageDir = 'greek';
-            } else if (['csb', 'esv', 'kjv', 'nasb', 'net', 'niv', 'nlt', 'rsv', 'web', 'ylt'].includes(version)) {
-                languageDir = 'english';
-            } else if (['em', 'lbla', 'rvr1995', 'se'].includes(version)) {
-                languageDir = 'spanish';
-            } else if (['ls'].includes(version)) {
-                languageDir = 'french';
-            } else if (['lut'].includes(version)) {
-                languageDir = 'german';
-            } else if (['cht'].includes(version)) {
-                languageDir = 'chinese';
-            } else if (['nav', 'svd'].includes(version)) {
-                languageDir = 'arabic';
-            } else if (['kor'].includes(version)) {
-                languageDir = 'korean';
-            } else if (['rst'].includes(version)) {
-                languageDir = 'russian';
-            } else if (['vul'].includes(version)) {
-                languageDir = 'latin';
-            } else if (['abtag2001', 'apsd-ceb', 'ceb'].includes(version)) {
-                languageDir = 'filipino';
-            } else if (['erv-hi', 'shb'].includes(version)) {
-                languageDir = 'hindi';
-            } else if (['jlb'].includes(version)) {
-                languageDir = 'japanese';
-            } else if (['ukr'].includes(version)) {
-                languageDir = 'ukrainian';
-            }
+            await this.loadManifest();
             
             // Get book name from the books array
             const bookName = this.books[bookNum - 1].name;
@@ -141,12 +330,11 @@ getBookFileName(bookNum) {
             
             // For Hebrew WLC, use Hebrew book names (for 'wlc' or 'original' versions in Old Testament)
             if ((version === 'wlc' || version === 'original') && bookNum <= 39) {
-                const textFilePath = `txt_bibles/hebrew/wlc/${String(bookNum).padStart(2, '0')}-${bookNameLower}-wlc.txt`;
+                const textFilePath = this.getBookPath('wlc', bookNum, bookNameLower);
                 console.log(`Loading Hebrew WLC: ${textFilePath}`);
                 
-                const response = await fetch(textFilePath);
-                if (response.ok) {
-                    const text = await response.text();
+                const text = textFilePath ? await this.fetchBookText('wlc', bookNum, textFilePath) : null;
+                if (text !== null) {
                     const bookData = this.parseBookText(text, bookNum, bookName);
                     bookData.isHebrew = true; // Mark as Hebrew for right-to-left display
                     console.log(`Loaded Hebrew WLC book ${bookNum} (${bookName}):`, Object.keys(bookData.chapters).length, 'chapters, hebrewBookName:', bookData.hebrewBookName);
@@ -175,16 +363,18 @@ getBookFileName(bookNum) {
             }
             
             // Build the text file path
-            const textFilePath = `txt_bibles/${languageDir}/${version}/${String(bookNum).padStart(2, '0')}-${bookNameLower}-${version}.txt`;
+            const textFilePath = this.getBookPath(version, bookNum, bookNameLower);
+            if (!textFilePath) {
+                console.log(`${version} has no book ${bookNum} (${bookName}) according to versions.json`);
+                return null;
+            }
             
-            // Fetch the entire book as a text file
-            const response = await fetch(textFilePath);
-            if (!response.ok) {
+            // Fetch the entire book as a text file (or take it from a prefetched bundle)
+            const text = await this.fetchBookText(version, bookNum, textFilePath);
+            if (text === null) {
                 throw new Error(`Failed to load book file: ${textFilePath}`);
             }
             
-            const text = await response.text();
-            
             // Parse the text file
             const bookData = this.parseBookText(text, bookNum, bookName);
             
@@ -338,7 +528,69 @@ getBookFileName(bookNum) {
         return book;
     },
 
+    loadChapterIndex(version, bookNum) {
+        // Chapter byte ranges from the book's .chapters.json sidecar (null if missing or not for this file)
+        const entry = this.manifest?.versions?.[version];
+        const book = entry?.books?.[bookNum];
+        if (!book) {
+            return Promise.resolve(null);
+        }
+        const indexKey = `${version}-${bookNum}`;
+        if (!this.chapterIndexes.has(indexKey)) {
+            const indexPath = `txt_bibles/${entry.dir}/${version}/${book.file.replace(/\.txt$/, '.chapters.json')}?h=${book.sha1.slice(0, 12)}`;
+            this.chapterIndexes.set(indexKey, fetch(indexPath)
+                .then(response => response.ok ? response.json() : null)
+                .then(index => index && index.sha1 === book.sha1 ? index : null)
+                .catch(() => null));
+        }
+        return this.chapterIndexes.get(indexKey);
+    },
+
+    async loadChapterRange(bookNum, chapter) {
+        // Fetch one chapter with an HTTP Range request; null means load the whole book instead
+        const cacheKey = `chapter-${bookNum}-${chapter}-${this.currentVersion}`;
+        if (this.cache.has(cacheKey)) {
+            return this.cache.get(cacheKey);
+        }
+        const version = this.currentVersion === 'original' ? (bookNum <= 39 ? 'wlc' : 'na28-ubs5') : this.currentVersion;
+        await this.loadManifest();
+        const index = await this.loadChapterIndex(version, bookNum);
+        const range = index && index.chapters[chapter];
+        if (!range) {
+            return null;
+        }
+
+        const [offset, length] = range;
+        const bookName = this.books[bookNum - 1].name;
+        const textFilePath = this.getBookPath(version, bookNum, bookName.toLowerCase().replace(/ /g, '-'));
+        try {
+            const response = await fetch(textFilePath, { headers: { Range: `bytes=${offset}-${offset + length - 1}` } });
+            if (response.status !== 206) {
+                // Server ignored the range - let loadBook fetch the whole file
+                response.body?.cancel();
+                return null;
+            }
+            const verses = this.parseBookText(await response.text(), bookNum, bookName).chapters[chapter];
+            if (!verses) {
+                return null;
+            }
+            console.log(`Loaded ${version} book ${bookNum} (${bookName}) chapter ${chapter}: ${length} of ${this.manifest.versions[version].books[bookNum].bytes} bytes`);
+            this.cache.set(cacheKey, verses);
+            return verses;
+        } catch (error) {
+            return null;
+        }
+    },
+
     async getChapterVerses(bookNum, chapter) {
+        const version = this.currentVersion === 'original' ? (bookNum <= 39 ? 'wlc' : 'na28-ubs5') : this.currentVersion;
+        if (!this.cache.has(`book-${bookNum}-${this.currentVersion}`) && !this.bundles.has(version)) {
+            // Until the whole book is needed, fetch only this chapter
+            const verses = await this.loadChapterRange(bookNum, chapter);
+            if (verses) {
+                return verses;
+            }
+        }
         const bookData = await this.loadBook(bookNum);
         if (!bookData || !bookData.chapters[chapter]) {
             return [];
@@ -346,6 +598,80 @@ getBookFileName(bookNum) {
         return bookData.chapters[chapter];
     },
 
+    async loadAlignment(version) {
+        // Per-translation verse alignment table written by the converter (null if missing)
+        if (this.alignments.has(version)) {
+            return this.alignments.get(version);
+        }
+        await this.loadManifest();
+        const alignmentPromise = fetch(`txt_bibles/${this.getLanguageDir(version)}/${version}/${version}.align.json`)
+            .then(response => response.ok ? response.json() : null)
+            .catch(() => null);
+        this.alignments.set(version, alignmentPromise);
+        return alignmentPromise;
+    },
+
+    getAlignmentIndex(version, bookNum, bookAlignment) {
+        // Canonical chapter -> [canonical verse, local chapter, local verse] rows, built once per book
+        const indexKey = `${version}-${bookNum}`;
+        if (!this.alignmentIndexes.has(indexKey)) {
+            const index = new Map();
+            const rows = bookAlignment.verses;
+            for (let i = 0; i < rows.length; i += 6) {
+                if (!index.has(rows[i])) {
+                    index.set(rows[i], []);
+                }
+                index.get(rows[i]).push([rows[i + 1], rows[i + 2], rows[i + 3]]);
+            }
+            this.alignmentIndexes.set(indexKey, index);
+        }
+        return this.alignmentIndexes.get(indexKey);
+    },
+
+    async getAlignedChapterVerses(bookNum, chapter) {
+        // Verses of a chapter in canonical (English) numbering, e.g. WLC Malachi 3:19-24 as Malachi 4:1-6
+        const version = this.currentVersion === 'original' ? (bookNum <= 39 ? 'wlc' : 'na28-ubs5') : this.currentVersion;
+        const alignment = await this.loadAlignment(version);
+        const bookAlignment = alignment && alignment.books[bookNum];
+        if (!bookAlignment) {
+            return this.getChapterVerses(bookNum, chapter);
+        }
+
+        const bookData = await this.loadBook(bookNum);
+        if (!bookData || !bookData.chapters) {
+            return [];
+        }
+        if (!bookData.verseIndex) {
+            bookData.verseIndex = new Map();
+            Object.values(bookData.chapters).forEach(chapterVerses => {
+                chapterVerses.forEach(v => bookData.verseIndex.set(`${v.chapter}:${v.verse}`, v));
+            });
+        }
+
+        const rows = this.getAlignmentIndex(version, bookNum, bookAlignment).get(chapter) || [];
+        const verses = [];
+        let heading = null;
+        rows.forEach(([verse, localChapter, localVerse]) => {
+            const local = bookData.verseIndex.get(`${localChapter}:${localVerse}`);
+            if (!local) return;
+            if (verse === 0) {
+                // Psalm titles numbered as verses in the source
+                heading = heading ? `${heading} ${local.text}` : local.text;
+                return;
+            }
+            const previous = verses[verses.length - 1];
+            if (previous && previous.verse === verse) {
+                previous.text = `${previous.text} ${local.text}`;
+                return;
+            }
+            verses.push({ ...local, chapter, verse, localChapter, localVerse });
+        });
+        if (heading && verses.length && !verses[0].title) {
+            verses[0] = { ...verses[0], title: heading };
+        }
+        return verses;
+    },
+
     getChapterText(bookNum, chapter) {
         return this.chapterCache && this.chapterCache.bookNum === bookNum && this.chapterCache.chapter === chapter
             ? this.chapterCache.text
@@ -1,4 +1,4 @@
-import { chatState, el, getOllamaUrl, getCloudflareUrl, getCloudAPIKey } from './state-ui-utils.js';
+import { chatState, el, getOllamaUrl, getCloudflareUrl, getCloudAPIKey, PASSAGE_API_URL } from './state-ui-utils.js';
 import { fmt, scroll, scrollToMessage, scrollToAIResponse } from './state-ui-utils.js';
 
 export function addMessage(text, type, avatar) {
@@ -236,6 +236,42 @@ export async function getFullChapterText() {
     return text;
 }
 
+// Verses retrieved for the question and attached after the current chapter
+const RELATED_VERSE_COUNT = 8;
+
+export async function getRelatedVerses(question) {
+    // BM25-ranked verses from the local passage API; null when it is not running
+    if (!PASSAGE_API_URL || !chatState.currentBook) {
+        return null;
+    }
+    const book = chatState.currentBook.num;
+    const version = BibleLoader.currentVersion === 'original' ? (book <= 39 ? 'wlc' : 'na28-ubs5') : BibleLoader.currentVersion;
+    const params = new URLSearchParams({ q: question, v: version, k: RELATED_VERSE_COUNT });
+    try {
+        const response = await fetch(`${PASSAGE_API_URL}/api/retrieve?${params}`, { signal: AbortSignal.timeout(1500) });
+        if (!response.ok) {
+            return null;
+        }
+        const data = await response.json();
+        // The current chapter is already in the prompt
+        const verses = (data.results[version]?.verses || [])
+            .filter(([b, chapter]) => b !== book || chapter !== chatState.currentChapter);
+        console.log('getRelatedVerses: retrieved', verses.length, 'verses');
+        return verses.length ? verses.map(([, , , , ref, text]) => `${ref} ${text}`).join('\n') : null;
+    } catch (e) {
+        console.log('getRelatedVerses: passage API unavailable:', e.message);
+        return null;
+    }
+}
+
+export async function getScripture(question) {
+    const [chapterText, relatedVerses] = await Promise.all([getFullChapterText(), getRelatedVerses(question)]);
+    if (!relatedVerses) {
+        return chapterText;
+    }
+    return `${chapterText || ''}\n\nRELATED VERSES (retrieved for this question):\n${relatedVerses}`.trim();
+}
+
 export function estimateTokens(text) {
     // Rough estimate: 1 token ≈ 4 characters for English
     // Hebrew is more compact: 1 token ≈ 2-3 characters
@@ -381,7 +417,7 @@ export async function sendToCloud(userMessage, requestId) {
         throw new Error('Please open the AI chat panel first.');
     }
     
-    const scripture = await getFullChapterText();
+    const scripture = await getScripture(userMessage);
     const conversationHistory = buildConversationHistory();
     const cloudUrl = getCloudflareUrl();
     
@@ -456,7 +492,7 @@ export async function sendToCloud(userMessage, requestId) {
 }
 
 async function sendToOllama(userMessage, requestId) {
-    const scripture = await getFullChapterText();
+    const scripture = await getScripture(userMessage);
     console.log('sendToOllama: scripture is', scripture ? 'defined' : 'NULL');
     
     const conversationHistory = buildConversationHistory();
@@ -267,7 +267,7 @@ async function createDuplicatePanel() {
     
     // Load verses for duplicate panel
     window.BibleLoader.setVersion(panel1Version);
-    const verses = await window.BibleLoader.getChapterVerses(chatState.currentBook.num, chatState.currentChapter);
+    const verses = await window.BibleLoader.getAlignedChapterVerses(chatState.currentBook.num, chatState.currentChapter);
     await renderVersesInPanel(verses, chatState.currentBook.name, versesContainer, 'panel-1');
 
     // Setup events for this panel
@@ -308,7 +308,9 @@ async function renderVersesInPanel(verses, displayName, container, panelId) {
         const verseClass = getVerseClassForPanel(panelId);
         const refBookName = hebrewBookName || displayName;
         const cleanText = v.text.replace(/\s*\([A-C]\)\s*/g, '').trim();
-        html += `<div class="verse ${verseClass}" data-book="${refBookName}" data-chapter="${v.chapter}" data-verse="${v.verse}"><span class="verse-ref">${refBookName} ${v.chapter}:${v.verse}</span><span class="verse-text">${cleanText}</span></div>`;
+        // Panels line up on canonical numbering; show the translation's own reference where it differs
+        const localRef = v.localChapter && (v.localChapter !== v.chapter || v.localVerse !== v.verse) ? ` (${v.localChapter}:${v.localVerse})` : '';
+        html += `<div class="verse ${verseClass}" data-book="${refBookName}" data-chapter="${v.chapter}" data-verse="${v.verse}"><span class="verse-ref">${refBookName} ${v.chapter}:${v.verse}${localRef}</span><span class="verse-text">${cleanText}</span></div>`;
     });
 
     container.innerHTML = html;
@@ -657,7 +659,7 @@ async function updatePanelContent(panelId) {
     }
     
     // Load verses for this panel
-    const verses = await window.BibleLoader.getChapterVerses(panelState.book.num, panelState.chapter);
+    const verses = await window.BibleLoader.getAlignedChapterVerses(panelState.book.num, panelState.chapter);
     console.log(`Got ${verses.length} verses for panel ${panelId} using version ${window.BibleLoader.currentVersion}`);
     console.log(`Verses container found: ${!!versesContainer}, container ID: ${versesContainer.id}`);
     await renderVersesInPanel(verses, panelState.book.name, versesContainer, panelId);
@@ -27,6 +27,11 @@ export const OLLAMA_URL = window.location.hostname === 'localhost' || window.loc
 
 export const CLOUDFLARE_URL = 'https://ai-web-dba1.armorofgod.life';
 
+// Local passage API (server/passage_api.py) - only started by start.sh, so not available on the hosted site
+export const PASSAGE_API_URL = window.location.hostname === 'localhost' || window.location.hostname === '127.0.0.1'
+  ? 'http://localhost:8002'
+  : null;
+
 export function getOllamaUrl() {
     try {
         const savedSettings = JSON.parse(localStorage.getItem('aiSettings') || '{}');
@@ -100,7 +105,8 @@ export const el = {
     customPrompt: document.getElementById('customPrompt'),
     ollamaUrl: document.getElementById('ollamaUrl'),
     aiPassword: document.getElementById('aiPassword'),
-    splitBtn: document.getElementById('splitView')
+    splitBtn: document.getElementById('splitView'),
+    offlineToggle: document.getElementById('offlineToggle')
 };
 
 export function setDarkTheme(value) {
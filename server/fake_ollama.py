@@ -0,0 +1,121 @@
+#!/usr/bin/env python3
+"""
+Fake Ollama server for trying out server/llm_proxy.py without a model.
+
+  python3 server/fake_ollama.py --port 11434 --tokens 20 --delay 0.05
+
+/api/tags lists a few fake models. /api/generate and /api/chat answer with
+--tokens words, one every --delay seconds, as NDJSON chunks when streaming
+(the default) or as one JSON object with "stream": false, like Ollama does.
+Each generation is logged with a running count, so cache hits and coalesced
+requests show up as generations that never happen. A client that goes away
+mid-stream is logged as cancelled.
+"""
+
+import argparse
+import itertools
+import json
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+MODELS = ('llama3.2:latest', 'qwen2.5:7b', 'mistral:latest')
+
+class FakeOllamaHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def __init__(self, *args, tokens=20, delay=0.05, counter=None, **kwargs):
+        self.tokens = tokens
+        self.delay = delay
+        self.counter = counter
+        super().__init__(*args, **kwargs)
+
+    def log_message(self, format, *args):
+        pass
+
+    def send_json(self, payload, status=HTTPStatus.OK):
+        body = json.dumps(payload).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def do_GET(self):
+        if self.path == '/api/tags':
+            self.send_json({'models': [{'name': name, 'model': name, 'size': 0} for name in MODELS]})
+        else:
+            self.send_json({'error': 'not found'}, HTTPStatus.NOT_FOUND)
+
+    do_HEAD = do_GET
+
+    def do_POST(self):
+        body = self.rfile.read(int(self.headers.get('Content-Length', 0) or 0))
+        try:
+            payload = json.loads(body or b'{}')
+        except ValueError:
+            self.send_json({'error': 'invalid JSON'}, HTTPStatus.BAD_REQUEST)
+            return
+        if self.path not in ('/api/generate', '/api/chat'):
+            self.send_json({'error': 'not found'}, HTTPStatus.NOT_FOUND)
+            return
+
+        number = next(self.counter)
+        model = payload.get('model', MODELS[0])
+        print(f"generation #{number}: {self.path} {model} {str(payload.get('prompt') or payload.get('messages'))[:60]!r}", flush=True)
+        words = [f"word{i}" for i in range(self.tokens)]
+
+        def message(text, done):
+            response = {'model': model, 'created_at': time.strftime('%Y-%m-%dT%H:%M:%SZ', time.gmtime()), 'done': done}
+            if self.path == '/api/chat':
+                response['message'] = {'role': 'assistant', 'content': text}
+            else:
+                response['response'] = text
+            if done:
+                response['eval_count'] = self.tokens
+            return response
+
+        if payload.get('stream', True) is False:
+            time.sleep(self.delay * self.tokens)
+            self.send_json(message(' '.join(words), True))
+            return
+
+        self.send_response(HTTPStatus.OK)
+        self.send_header('Content-Type', 'application/x-ndjson')
+        self.send_header('Transfer-Encoding', 'chunked')
+        self.end_headers()
+        try:
+            for i, word in enumerate(words + ['']):
+                line = json.dumps(message(word + ' ' if word else '', i == len(words))).encode('utf-8') + b'\n'
+                self.wfile.write(b'%x\r\n%s\r\n' % (len(line), line))
+                self.wfile.flush()
+                if word:
+                    time.sleep(self.delay)
+            self.wfile.write(b'0\r\n\r\n')
+        except (BrokenPipeError, ConnectionResetError):
+            print(f"generation #{number}: cancelled by client", flush=True)
+
+class FakeOllamaServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+def main():
+    parser = argparse.ArgumentParser(description='Fake Ollama server that streams canned answers')
+    parser.add_argument('--bind', default='127.0.0.1', help='Address to bind (default: %(default)s)')
+    parser.add_argument('--port', type=int, default=11434, help='Port (default: %(default)s)')
+    parser.add_argument('--tokens', type=int, default=20, help='Words per answer (default: %(default)s)')
+    parser.add_argument('--delay', type=float, default=0.05, help='Seconds between words (default: %(default)s)')
+    args = parser.parse_args()
+
+    handler = partial(FakeOllamaHandler, tokens=args.tokens, delay=args.delay, counter=itertools.count(1))
+    server = FakeOllamaServer((args.bind, args.port), handler)
+    print(f"Fake Ollama on http://{args.bind}:{args.port}", flush=True)
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
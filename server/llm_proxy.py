@@ -0,0 +1,433 @@
+#!/usr/bin/env python3
+"""
+Caching, request-coalescing proxy between the web app and Ollama.
+
+  python3 server/llm_proxy.py --port 11436 --upstream http://localhost:11434
+
+Drop-in replacement for proxy.js: every request is forwarded to the upstream
+with CORS headers added. /api/generate and /api/chat additionally get:
+  - an LRU + TTL response cache keyed by (endpoint, model, normalised prompt,
+    options), so a repeated question is answered without a new generation
+  - coalescing - identical requests arriving while one is being generated
+    share that generation and receive its chunks as they stream in
+  - a cap on concurrent generations per model; further requests queue
+
+Cached and shared responses are replayed chunk for chunk with the upstream
+status and Content-Type, so streaming (NDJSON) clients get the same format
+as a live answer. The X-Cache header says which path served a response
+(MISS, SHARED or HIT). A generation is cancelled upstream as soon as every
+client waiting for it has disconnected, e.g. after the chat's Stop button.
+
+server/fake_ollama.py stands in for Ollama when trying the proxy out.
+"""
+
+import argparse
+import asyncio
+import json
+import os
+import re
+import ssl
+import time
+from collections import OrderedDict
+from http import HTTPStatus
+from urllib.parse import urlsplit
+
+CACHEABLE_PATHS = ('/api/generate', '/api/chat')
+
+MAX_HEADER_LINES = 100
+MAX_BODY_SIZE = 16 * 1024 * 1024
+READ_SIZE = 64 * 1024
+
+# How often a client waiting on a generation is checked for having gone away
+DISCONNECT_POLL = 0.5
+
+CORS_HEADERS = (
+    ('Access-Control-Allow-Origin', '*'),
+    ('Access-Control-Allow-Methods', 'GET, POST, OPTIONS'),
+    ('Access-Control-Allow-Headers', 'Content-Type'),
+)
+
+class UpstreamError(Exception):
+    pass
+
+def normalize_prompt(text):
+    """Collapse whitespace so prompts that differ only in spacing share a cache entry"""
+    return re.sub(r'\s+', ' ', text or '').strip()
+
+def cache_key(path, payload):
+    """Cache key of a generation request, or None if it should not be cached or shared"""
+    if not isinstance(payload, dict) or not payload.get('model') or payload.get('images'):
+        return None
+    if path == '/api/chat':
+        messages = payload.get('messages') or []
+        if any(not isinstance(message, dict) or message.get('images') for message in messages):
+            return None
+        prompt = [[message.get('role'), normalize_prompt(message.get('content'))] for message in messages]
+    else:
+        prompt = [normalize_prompt(payload.get('system')), normalize_prompt(payload.get('prompt')), payload.get('context')]
+    return json.dumps([path, payload['model'], prompt, payload.get('options') or {}, payload.get('stream', True),
+                       payload.get('format'), payload.get('template'), payload.get('raw', False)],
+                      sort_keys=True, ensure_ascii=False)
+
+class ResponseCache:
+    """LRU cache of complete responses that also expire after ttl seconds"""
+
+    def __init__(self, max_entries=256, ttl=3600):
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        expires, response = entry
+        if expires < time.monotonic():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return response
+
+    def put(self, key, response):
+        if self.max_entries <= 0 or self.ttl <= 0:
+            return
+        self.entries[key] = (time.monotonic() + self.ttl, response)
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+class Flight:
+    """One upstream generation, shared by every client that asked for it"""
+
+    def __init__(self):
+        self.status = None
+        self.content_type = 'application/json'
+        self.chunks = []
+        self.done = False
+        self.subscribers = 0
+        self.task = None
+        self.condition = asyncio.Condition()
+
+    async def update(self, status=None, content_type=None, chunk=None, done=False):
+        async with self.condition:
+            if status is not None:
+                self.status = status
+            if content_type:
+                self.content_type = content_type
+            if chunk:
+                self.chunks.append(chunk)
+            self.done = self.done or done
+            self.condition.notify_all()
+
+    async def wait_status(self, disconnected):
+        """Wait until the upstream status is known; False if the client went away first"""
+        while True:
+            async with self.condition:
+                try:
+                    await asyncio.wait_for(self.condition.wait_for(lambda: self.status is not None or self.done), DISCONNECT_POLL)
+                    return True
+                except asyncio.TimeoutError:
+                    pass
+            if disconnected():
+                return False
+
+    async def follow(self, disconnected):
+        """Yield the response chunks, from the first one, as they arrive"""
+        sent = 0
+        while True:
+            async with self.condition:
+                try:
+                    await asyncio.wait_for(self.condition.wait_for(lambda: len(self.chunks) > sent or self.done), DISCONNECT_POLL)
+                except asyncio.TimeoutError:
+                    pass
+                chunks = self.chunks[sent:]
+                done = self.done
+            for chunk in chunks:
+                yield chunk
+            sent += len(chunks)
+            if done and sent == len(self.chunks):
+                return
+            if not chunks and disconnected():
+                return
+
+async def read_request(reader):
+    """Read one HTTP request as (method, target, headers, body), or None at end of connection"""
+    line = await reader.readline()
+    if not line.strip():
+        return None
+    try:
+        method, target, _ = line.decode('latin-1').split()
+    except ValueError:
+        raise ValueError(f"Malformed request line {line[:80]!r}")
+    headers = await read_headers(reader)
+    length = int(headers.get('content-length', 0) or 0)
+    if length > MAX_BODY_SIZE:
+        raise ValueError("Request body too large")
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        body = b''.join([chunk async for chunk in read_chunked(reader)])
+    else:
+        body = await reader.readexactly(length) if length else b''
+    return method.upper(), target, headers, body
+
+async def read_headers(reader):
+    headers = {}
+    for _ in range(MAX_HEADER_LINES):
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            return headers
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+    raise ValueError("Too many header lines")
+
+async def read_chunked(reader):
+    """Decode a chunked transfer-coded body"""
+    while True:
+        size_line = await reader.readline()
+        if not size_line:
+            raise asyncio.IncompleteReadError(b'', None)
+        size = int(size_line.split(b';', 1)[0].strip() or b'0', 16)
+        if size == 0:
+            await read_headers(reader)
+            return
+        yield await reader.readexactly(size)
+        await reader.readexactly(2)
+
+async def read_body(reader, headers):
+    """Yield a response body as it arrives (chunked, Content-Length or read to EOF)"""
+    if headers.get('transfer-encoding', '').lower() == 'chunked':
+        async for chunk in read_chunked(reader):
+            yield chunk
+        return
+    if 'content-length' in headers:
+        remaining = int(headers['content-length'])
+        while remaining > 0:
+            chunk = await reader.read(min(remaining, READ_SIZE))
+            if not chunk:
+                raise asyncio.IncompleteReadError(b'', remaining)
+            remaining -= len(chunk)
+            yield chunk
+        return
+    while True:
+        chunk = await reader.read(READ_SIZE)
+        if not chunk:
+            return
+        yield chunk
+
+class LLMProxy:
+    def __init__(self, upstream, cache, max_concurrent=2, quiet=False):
+        self.upstream = urlsplit(upstream.rstrip('/'))
+        if self.upstream.scheme not in ('http', 'https') or not self.upstream.hostname:
+            raise ValueError(f"Upstream must be an http(s) URL, got '{upstream}'")
+        self.cache = cache
+        self.max_concurrent = max_concurrent
+        self.quiet = quiet
+        self.flights = {}
+        self.semaphores = {}
+
+    def log(self, message):
+        if not self.quiet:
+            print(message, flush=True)
+
+    async def open_upstream(self, method, target, body):
+        """Send a request upstream and return (status, headers, reader, writer)"""
+        secure = self.upstream.scheme == 'https'
+        port = self.upstream.port or (443 if secure else 80)
+        try:
+            reader, writer = await asyncio.open_connection(self.upstream.hostname, port,
+                                                           ssl=ssl.create_default_context() if secure else None)
+        except OSError as e:
+            raise UpstreamError(f"Failed to connect to {self.upstream.geturl()}: {e}")
+        path = (self.upstream.path or '') + target
+        head = (f"{method} {path} HTTP/1.1\r\nHost: {self.upstream.netloc}\r\n"
+                f"Content-Type: application/json\r\nContent-Length: {len(body)}\r\nConnection: close\r\n\r\n")
+        try:
+            writer.write(head.encode('latin-1') + body)
+            await writer.drain()
+            status_line = await reader.readline()
+            status = int(status_line.split()[1])
+            headers = await read_headers(reader)
+        except (OSError, ValueError, IndexError, asyncio.IncompleteReadError) as e:
+            writer.close()
+            raise UpstreamError(f"Bad response from {self.upstream.geturl()}: {e}")
+        return status, headers, reader, writer
+
+    def semaphore(self, model):
+        if model not in self.semaphores:
+            self.semaphores[model] = asyncio.Semaphore(self.max_concurrent)
+        return self.semaphores[model]
+
+    async def generate(self, key, flight, model, method, target, body):
+        """Run a flight's upstream request under its model's concurrency cap, caching a complete answer"""
+        writer = None
+        try:
+            async with self.semaphore(model):
+                status, headers, reader, writer = await self.open_upstream(method, target, body)
+                await flight.update(status=status, content_type=headers.get('content-type'))
+                async for chunk in read_body(reader, headers):
+                    await flight.update(chunk=chunk)
+            if flight.status == 200:
+                self.cache.put(key, (flight.status, flight.content_type, tuple(flight.chunks)))
+        except UpstreamError as e:
+            if flight.status is None:
+                await flight.update(status=502, chunk=json.dumps({'error': 'Failed to connect to Ollama'}).encode())
+            self.log(f"Upstream error: {e}")
+        except (OSError, ValueError, asyncio.IncompleteReadError) as e:
+            self.log(f"Upstream response cut short: {e}")
+        finally:
+            if writer is not None:
+                writer.close()
+            if self.flights.get(key) is flight:
+                del self.flights[key]
+            await flight.update(done=True)
+
+    async def send_head(self, writer, status, content_type, extra=()):
+        try:
+            reason = HTTPStatus(status).phrase
+        except ValueError:
+            reason = ''
+        lines = [f"HTTP/1.1 {status} {reason}"]
+        lines += [f"{name}: {value}" for name, value in CORS_HEADERS + tuple(extra)]
+        lines += [f"Content-Type: {content_type}", 'Transfer-Encoding: chunked', '', '']
+        writer.write('\r\n'.join(lines).encode('latin-1'))
+
+    async def send_chunk(self, writer, chunk):
+        writer.write(b'%x\r\n%s\r\n' % (len(chunk), chunk))
+        await writer.drain()
+
+    async def send_end(self, writer):
+        writer.write(b'0\r\n\r\n')
+        await writer.drain()
+
+    async def handle_generation(self, key, payload, method, target, body, reader, writer):
+        cached = self.cache.get(key)
+        if cached is not None:
+            status, content_type, chunks = cached
+            await self.send_head(writer, status, content_type, [('X-Cache', 'HIT')])
+            for chunk in chunks:
+                await self.send_chunk(writer, chunk)
+            await self.send_end(writer)
+            return status, 'HIT'
+
+        flight = self.flights.get(key)
+        state = 'SHARED'
+        if flight is None:
+            flight = self.flights[key] = Flight()
+            flight.task = asyncio.ensure_future(self.generate(key, flight, payload['model'], method, target, body))
+            state = 'MISS'
+
+        disconnected = lambda: reader.at_eof() or writer.is_closing()
+        flight.subscribers += 1
+        try:
+            if not await flight.wait_status(disconnected):
+                return None, state
+            await self.send_head(writer, flight.status or 502, flight.content_type, [('X-Cache', state)])
+            async for chunk in flight.follow(disconnected):
+                await self.send_chunk(writer, chunk)
+            if not flight.done:
+                return None, state
+            await self.send_end(writer)
+            return flight.status, state
+        finally:
+            flight.subscribers -= 1
+            if flight.subscribers == 0 and not flight.done:
+                # Nobody is waiting any more - stop the generation upstream
+                if self.flights.get(key) is flight:
+                    del self.flights[key]
+                flight.task.cancel()
+
+    async def handle_passthrough(self, method, target, body, writer):
+        try:
+            status, headers, upstream_reader, upstream_writer = await self.open_upstream(method, target, body)
+        except UpstreamError as e:
+            self.log(f"Upstream error: {e}")
+            await self.send_head(writer, 502, 'application/json')
+            await self.send_chunk(writer, json.dumps({'error': 'Failed to connect to Ollama'}).encode())
+            await self.send_end(writer)
+            return 502
+        try:
+            await self.send_head(writer, status, headers.get('content-type', 'application/json'))
+            if method == 'HEAD':
+                await writer.drain()
+                return status
+            if status not in (204, 304):
+                async for chunk in read_body(upstream_reader, headers):
+                    await self.send_chunk(writer, chunk)
+            await self.send_end(writer)
+        finally:
+            upstream_writer.close()
+        return status
+
+    async def handle_connection(self, reader, writer):
+        try:
+            while True:
+                request = await read_request(reader)
+                if request is None:
+                    break
+                method, target, headers, body = request
+                started = time.perf_counter()
+                state = ''
+
+                if method == 'OPTIONS':
+                    lines = ['HTTP/1.1 200 OK'] + [f"{name}: {value}" for name, value in CORS_HEADERS] + ['Content-Length: 0', '', '']
+                    writer.write('\r\n'.join(lines).encode('latin-1'))
+                    await writer.drain()
+                    continue
+
+                path = urlsplit(target).path
+                key = None
+                payload = None
+                if method == 'POST' and path in CACHEABLE_PATHS:
+                    try:
+                        payload = json.loads(body or b'{}')
+                        key = cache_key(path, payload)
+                    except ValueError:
+                        pass
+
+                if key is not None:
+                    status, state = await self.handle_generation(key, payload, method, target, body, reader, writer)
+                    if status is None:
+                        self.log(f"{method} {target} client gone after {(time.perf_counter() - started) * 1000:.0f} ms ({state})")
+                        break
+                else:
+                    status = await self.handle_passthrough(method, target, body, writer)
+                self.log(f"{method} {target} {status}{' ' + state if state else ''} {(time.perf_counter() - started) * 1000:.0f} ms")
+
+                if headers.get('connection', '').lower() == 'close':
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        except ValueError as e:
+            self.log(f"Bad request: {e}")
+        finally:
+            writer.close()
+
+async def serve(args):
+    cache = ResponseCache(args.cache_size, args.cache_ttl)
+    proxy = LLMProxy(args.upstream, cache, args.max_concurrent, args.quiet)
+    server = await asyncio.start_server(proxy.handle_connection, args.bind or None, args.port)
+    print(f"LLM proxy on http://{args.bind or 'localhost'}:{args.port} -> {args.upstream} "
+          f"(cache {args.cache_size} entries / {args.cache_ttl}s, {args.max_concurrent} concurrent per model)", flush=True)
+    async with server:
+        await server.serve_forever()
+
+def main():
+    parser = argparse.ArgumentParser(description='Caching, request-coalescing CORS proxy for Ollama')
+    parser.add_argument('--upstream', default=os.environ.get('OLLAMA_UPSTREAM', 'http://localhost:11434'),
+                        help='Ollama base URL (default: $OLLAMA_UPSTREAM or %(default)s)')
+    parser.add_argument('--bind', default='', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--port', type=int, default=11436, help='Port (default: %(default)s)')
+    parser.add_argument('--cache-size', type=int, default=256, help='Cached responses to keep, 0 disables the cache (default: %(default)s)')
+    parser.add_argument('--cache-ttl', type=float, default=3600, help='Seconds a cached response stays valid (default: %(default)s)')
+    parser.add_argument('--max-concurrent', type=int, default=2, help='Concurrent generations per model (default: %(default)s)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+    if args.max_concurrent < 1:
+        parser.error('--max-concurrent must be at least 1')
+
+    try:
+        asyncio.run(serve(args))
+    except KeyboardInterrupt:
+        pass
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,369 @@
+#!/usr/bin/env python3
+"""
+Verse and passage lookup API backed by the packed verse stores.
+
+  python3 server/passage_api.py --txt-bibles public/txt_bibles --port 8002
+
+Every translation under txt_bibles is opened at startup - memory-mapped from
+its {translation}.verses file when that is up to date, otherwise packed in
+memory from the TXT files - so lookups never touch the TXT files.
+
+Endpoints:
+  GET /api/passage?ref=John+3:16-18&v=ylt,wlc,na28-ubs5
+      {"ref":"John 3:16-18","passages":[{"ref":"John 3:16-18","book":43,
+       "verses":{"ylt":[[3,16,"..."],...],"wlc":[],...}}],"unknown":[]}
+      ref accepts several ';'-separated references; v defaults to every
+      loaded translation and 'original' means WLC (OT) / NA28-UBS5 (NT).
+      'Ps 119:175-' runs to the end of the chapter; a reversed range such
+      as 'John 3:18-16' is a 400.
+  GET /api/search?q="son+of+man"+OR+logos&v=ylt&limit=50
+      {"q":"...","results":{"ylt":{"total":84,"verses":[[40,8,20,"..."],...]}},"unknown":[]}
+      q uses the search_index query syntax; limit caps verses per translation.
+      When matching stopped at limit, total is an estimate and
+      "estimated":true is added.
+      Hebrew and Greek are searched with points and accents folded away
+      unless exact=1 is given.
+  GET /api/strongs?n=G26&v=kjv&limit=50
+      {"n":"G26","results":{"kjv":{"total":116,"occurrences":[[40,24,12,9,"love","..."],...]}},"unknown":[]}
+      Occurrences are [book, chapter, verse, word position, word, verse text]
+      from the Strong's concordances of translations that have one.
+  GET /api/retrieve?q=who+is+the+good+shepherd&v=ylt&k=5&testament=nt&books=John,Heb
+      {"q":"...","results":{"ylt":{"verses":[[43,10,11,15.88,"John 10:11","..."],...]}},"unknown":[]}
+      BM25-ranked [book, chapter, verse, score, reference, text] rows, best
+      first, for grounding chat answers. testament (ot/nt) and books are
+      optional filters; v defaults to every loaded translation.
+  GET /api/related?ref=Gen+1:1&v=esv
+      {"ref":"Genesis 1:1","results":{"esv":{"related":["Job 38:4-7","Psalms 33:6",...],"footnotes":["Or ..."]}},"unknown":[]}
+      Cross-references and footnotes of the first verse of ref, from the
+      graphs compiled for BibleGateway translations.
+  GET /api/versions
+      {"versions":{"ylt":{"language":"english","books":66,"strongs":false,"xref":false},...}}
+"""
+
+import argparse
+import json
+import os
+import sys
+import time
+from functools import partial
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlsplit
+
+APP_FILES = Path(__file__).resolve().parent.parent / 'dl_bible-bl-bg' / 'app_files'
+sys.path.insert(0, str(APP_FILES))
+from bible_references import book_name, format_passage, parse_reference
+from cross_references import CrossReferenceGraph, footnotes_path, load_footnotes, xref_path
+from retrieval import BM25Retriever, parse_book_filter
+from search_index import LANGUAGE_FOLD_PROFILES, TOKEN_PATTERN, load_translation_index
+from strongs import StrongsConcordance, concordance_path, normalize_number
+from txt_corpus import list_translations, split_verse_key, verse_key
+from verse_store import load_translation_store
+
+# Upper bound on verses returned per translation and request
+MAX_VERSES = 2000
+
+DEFAULT_SEARCH_LIMIT = 100
+
+DEFAULT_RETRIEVE_COUNT = 10
+MAX_RETRIEVE_COUNT = 100
+
+ORIGINAL_LANGUAGE_VERSIONS = ('wlc', 'na28-ubs5')
+
+class TranslationLibrary:
+    """All installed translations, keyed by version code"""
+
+    def __init__(self, bible_base):
+        self.bible_base = bible_base
+        self.stores = {}
+        self.indexes = {}
+        self.folded_indexes = {}
+        self.concordances = {}
+        self.retrievers = {}
+        self.graphs = {}
+        self.footnotes = {}
+        self.languages = {}
+
+    def load(self):
+        for language, translation, translation_path in list_translations(self.bible_base):
+            store = load_translation_store(translation_path, translation)
+            if store.books():
+                self.stores[translation] = store
+                self.indexes[translation] = load_translation_index(translation_path, translation)
+                profile = LANGUAGE_FOLD_PROFILES.get(language)
+                if profile:
+                    self.folded_indexes[translation] = load_translation_index(translation_path, translation, profile)
+                self.languages[translation] = language
+                strongs_file = concordance_path(translation_path, translation)
+                if os.path.exists(strongs_file):
+                    self.concordances[translation] = StrongsConcordance.load(strongs_file)
+                graph_file = xref_path(translation_path, translation)
+                if os.path.exists(graph_file):
+                    self.graphs[translation] = CrossReferenceGraph.open(graph_file)
+                self.footnotes[translation] = load_footnotes(footnotes_path(translation_path, translation))
+        return self
+
+    def resolve_version(self, version, book):
+        """Map a requested version code to a loaded translation for a book"""
+        if version == 'original':
+            return ORIGINAL_LANGUAGE_VERSIONS[0] if book <= 39 else ORIGINAL_LANGUAGE_VERSIONS[1]
+        return version
+
+    def passage_verses(self, translation, passage):
+        """List [chapter, verse, text] for a passage in one translation, and whether it was truncated"""
+        store = self.stores.get(translation)
+        if store is None:
+            return [], False
+        book, start_chapter, start_verse, end_chapter, end_verse = passage
+        if end_chapter is None:
+            end_chapter = store.chapter_count(book)
+        verses = store.get_range(book, start_chapter, start_verse, end_chapter, end_verse)
+        truncated = len(verses) > MAX_VERSES
+        return [list(verse) for verse in verses[:MAX_VERSES]], truncated
+
+    def lookup(self, reference, versions):
+        passages = []
+        for passage in parse_reference(reference):
+            book = passage[0]
+            result = {'ref': format_passage(passage), 'book': book, 'verses': {}}
+            for version in versions:
+                verses, truncated = self.passage_verses(self.resolve_version(version, book), passage)
+                result['verses'][version] = verses
+                if truncated:
+                    result.setdefault('truncated', []).append(version)
+            passages.append(result)
+        return passages
+
+    def search(self, query, versions, limit, exact=False):
+        results = {}
+        for version in versions:
+            index = self.indexes[version] if exact else self.folded_indexes.get(version, self.indexes[version])
+            keys, total, estimated = index.search_page(query, limit)
+            store = self.stores[version]
+            verses = []
+            for key in keys:
+                book, chapter, verse = split_verse_key(key)
+                verses.append([book, chapter, verse, store.get(book, chapter, verse)])
+            results[version] = {'total': total, 'verses': verses}
+            if estimated:
+                results[version]['estimated'] = True
+        return results
+
+    def retriever(self, version, exact=False):
+        """BM25 retriever of a translation, built on first use"""
+        cache_key = (version, exact)
+        retriever = self.retrievers.get(cache_key)
+        if retriever is None:
+            index = self.indexes[version] if exact else self.folded_indexes.get(version, self.indexes[version])
+            retriever = self.retrievers[cache_key] = BM25Retriever(index)
+        return retriever
+
+    def retrieve(self, question, versions, count, books=None, exact=False):
+        results = {}
+        for version in versions:
+            store = self.stores[version]
+            rows = []
+            for score, key in self.retriever(version, exact).retrieve(question, count, books):
+                book, chapter, verse = split_verse_key(key)
+                rows.append([book, chapter, verse, round(score, 3), f"{book_name(book)} {chapter}:{verse}",
+                             store.get(book, chapter, verse)])
+            results[version] = {'verses': rows}
+        return results
+
+    def strongs(self, number, versions, limit):
+        results = {}
+        for version in versions:
+            concordance = self.concordances.get(version)
+            if concordance is None:
+                continue
+            occurrences = concordance.occurrences(number)
+            store = self.stores[version]
+            rows = []
+            for key, position in occurrences[:limit]:
+                book, chapter, verse = split_verse_key(key)
+                text = store.get(book, chapter, verse) or ''
+                words = TOKEN_PATTERN.findall(text)
+                rows.append([book, chapter, verse, position, words[position] if position < len(words) else '', text])
+            results[version] = {'total': len(occurrences), 'occurrences': rows}
+        return results
+
+    def related(self, passage, versions):
+        book, chapter, verse = passage[:3]
+        results = {}
+        for version in versions:
+            graph = self.graphs.get(version)
+            notes = self.footnotes.get(version, {}).get(verse_key(book, chapter, verse), [])
+            if graph is None and not notes:
+                continue
+            related = graph.related(book, chapter, verse) if graph is not None else []
+            results[version] = {'related': [format_passage(target) for target in related], 'footnotes': notes}
+        return results
+
+    def describe(self):
+        return {
+            translation: {'language': self.languages[translation], 'books': len(store.books()),
+                          'strongs': translation in self.concordances, 'xref': translation in self.graphs}
+            for translation, store in sorted(self.stores.items())
+        }
+
+class PassageRequestHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+
+    def __init__(self, *args, library=None, **kwargs):
+        self.library = library
+        super().__init__(*args, **kwargs)
+
+    def send_json(self, status, payload, started=None):
+        body = json.dumps(payload, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(body)))
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Cache-Control', 'public, max-age=300' if status == HTTPStatus.OK else 'no-store')
+        if started is not None:
+            self.send_header('Server-Timing', f"lookup;dur={(time.perf_counter() - started) * 1000:.2f}")
+        self.end_headers()
+        if self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_OPTIONS(self):
+        self.send_response(HTTPStatus.NO_CONTENT)
+        self.send_header('Access-Control-Allow-Origin', '*')
+        self.send_header('Access-Control-Allow-Methods', 'GET, OPTIONS')
+        self.send_header('Access-Control-Allow-Headers', 'Content-Type')
+        self.send_header('Content-Length', '0')
+        self.end_headers()
+
+    def requested_versions(self, params, allow_original=False):
+        """Split the 'v' parameter into (loaded versions, unknown versions), defaulting to every loaded one"""
+        requested = ','.join(params.get('v', [])).lower()
+        versions = [v.strip() for v in requested.split(',') if v.strip()] or sorted(self.library.stores)
+        known = [v for v in versions if (allow_original and v == 'original') or v in self.library.stores]
+        unknown = [v for v in versions if v not in known]
+        return known, unknown
+
+    def do_GET(self):
+        started = time.perf_counter()
+        url = urlsplit(self.path)
+        params = parse_qs(url.query)
+
+        if url.path == '/api/passage':
+            reference = params.get('ref', [''])[0].strip()
+            if not reference:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Missing 'ref' parameter"})
+                return
+
+            known, unknown = self.requested_versions(params, allow_original=True)
+            passages = self.library.lookup(reference, known)
+            if not passages:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': f"Could not parse reference '{reference}'"})
+                return
+            self.send_json(HTTPStatus.OK, {'ref': reference, 'passages': passages, 'unknown': unknown}, started)
+
+        elif url.path == '/api/search':
+            query = params.get('q', [''])[0].strip()
+            if not query:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Missing 'q' parameter"})
+                return
+            try:
+                limit = min(int(params.get('limit', [DEFAULT_SEARCH_LIMIT])[0]), MAX_VERSES)
+            except ValueError:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "'limit' must be a number"})
+                return
+
+            known, unknown = self.requested_versions(params)
+            exact = params.get('exact', ['0'])[0].lower() in ('1', 'true', 'yes')
+            results = self.library.search(query, known, max(limit, 0), exact)
+            self.send_json(HTTPStatus.OK, {'q': query, 'results': results, 'unknown': unknown}, started)
+
+        elif url.path == '/api/retrieve':
+            question = params.get('q', [''])[0].strip()
+            if not question:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Missing 'q' parameter"})
+                return
+            try:
+                count = min(int(params.get('k', [DEFAULT_RETRIEVE_COUNT])[0]), MAX_RETRIEVE_COUNT)
+            except ValueError:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "'k' must be a number"})
+                return
+            try:
+                books = [name for name in ','.join(params.get('books', [])).split(',') if name.strip()]
+                books = parse_book_filter(books, params.get('testament', [''])[0].strip())
+            except ValueError as e:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': str(e)})
+                return
+
+            known, unknown = self.requested_versions(params)
+            exact = params.get('exact', ['0'])[0].lower() in ('1', 'true', 'yes')
+            results = self.library.retrieve(question, known, max(count, 0), books, exact)
+            self.send_json(HTTPStatus.OK, {'q': question, 'results': results, 'unknown': unknown}, started)
+
+        elif url.path == '/api/strongs':
+            number = normalize_number(params.get('n', [''])[0])
+            if number is None:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Missing or invalid 'n' parameter (e.g. G26 or H430)"})
+                return
+            try:
+                limit = min(int(params.get('limit', [DEFAULT_SEARCH_LIMIT])[0]), MAX_VERSES)
+            except ValueError:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "'limit' must be a number"})
+                return
+
+            known, unknown = self.requested_versions(params)
+            results = self.library.strongs(number, known, max(limit, 0))
+            self.send_json(HTTPStatus.OK, {'n': number, 'results': results, 'unknown': unknown}, started)
+
+        elif url.path == '/api/related':
+            passages = parse_reference(params.get('ref', [''])[0])
+            if not passages:
+                self.send_json(HTTPStatus.BAD_REQUEST, {'error': "Missing or invalid 'ref' parameter"})
+                return
+
+            passage = passages[0]
+            known, unknown = self.requested_versions(params)
+            reference = format_passage((passage[0], passage[1], passage[2], passage[1], passage[2]))
+            results = self.library.related(passage, known)
+            self.send_json(HTTPStatus.OK, {'ref': reference, 'results': results, 'unknown': unknown}, started)
+
+        elif url.path == '/api/versions':
+            self.send_json(HTTPStatus.OK, {'versions': self.library.describe()}, started)
+
+        else:
+            self.send_json(HTTPStatus.NOT_FOUND, {'error': 'Not found'})
+
+    do_HEAD = do_GET
+
+class PassageServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def main():
+    default_base = Path(__file__).resolve().parent.parent / 'public' / 'txt_bibles'
+    parser = argparse.ArgumentParser(description='Serve verse and passage lookups from the installed Bibles')
+    parser.add_argument('--txt-bibles', default=str(default_base), help='txt_bibles directory (default: %(default)s)')
+    parser.add_argument('--bind', default='', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--port', type=int, default=8002, help='Port (default: %(default)s)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+
+    started = time.perf_counter()
+    library = TranslationLibrary(args.txt_bibles).load()
+    print(f"Loaded {len(library.stores)} translation(s) in {(time.perf_counter() - started) * 1000:.0f} ms: {', '.join(sorted(library.stores))}")
+
+    handler_class = PassageRequestHandler
+    if args.quiet:
+        handler_class = type('Handler', (PassageRequestHandler,), {'log_message': lambda self, *a: None})
+
+    server = PassageServer((args.bind, args.port), partial(handler_class, library=library))
+    print(f"Passage API on http://{args.bind or 'localhost'}:{args.port}/api/passage?ref=John+3:16")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()
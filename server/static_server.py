@@ -0,0 +1,276 @@
+#!/usr/bin/env python3
+"""
+Static file server for the Bible web app (public/).
+
+  python3 server/static_server.py --root public --port 8001
+
+Threaded drop-in replacement for 'python3 -m http.server' that adds:
+  - zero-copy sendfile() for response bodies
+  - strong ETags, Last-Modified and 304 responses
+  - Cache-Control (long-lived for Bible TXT files and bundles, revalidate for the rest)
+  - single-range HTTP Range requests (206 / 416)
+  - precompressed .br / .gz siblings picked by Accept-Encoding
+
+Siblings are written by dl_bible-bl-bg/app_files/precompress.py and are only
+used while their mtime matches the source file, so a stale sibling is never
+served.
+"""
+
+import argparse
+import email.utils
+import os
+import re
+from functools import partial
+from http import HTTPStatus
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+# Preferred first
+PRECOMPRESSED_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+LONG_CACHE_SUFFIXES = ('.txt', '.bundle')
+RANGE_PATTERN = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+def parse_accept_encoding(header):
+    """Return the set of content codings the client accepts (q > 0)"""
+    accepted = set()
+    for part in (header or '').split(','):
+        coding, _, params = part.strip().partition(';')
+        coding = coding.strip().lower()
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params.split(';'):
+            name, _, value = param.strip().partition('=')
+            if name.strip().lower() == 'q':
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if quality > 0:
+            accepted.add(coding)
+    return accepted
+
+def parse_range(header, size):
+    """Parse a single 'bytes=' range into (start, end) inclusive.
+
+    Returns None when the header should be ignored (missing, malformed or
+    multi-range) and 'unsatisfiable' when it cannot be served.
+    """
+    if not header:
+        return None
+    match = RANGE_PATTERN.match(header.strip())
+    if not match:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        suffix_length = int(last)
+        if suffix_length == 0:
+            return 'unsatisfiable'
+        return max(size - suffix_length, 0), size - 1
+    start = int(first)
+    end = int(last) if last else size - 1
+    if start >= size or (last and end < start):
+        return 'unsatisfiable'
+    return start, min(end, size - 1)
+
+def make_etag(stat_result, encoding=None):
+    """Strong validator from the file's mtime and size, distinct per content coding"""
+    tag = f"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"
+    if encoding:
+        tag = f"{tag}-{encoding}"
+    return f'"{tag}"'
+
+def etag_matches(header, etag):
+    """Weak comparison of an If-None-Match header against an ETag"""
+    if header is None:
+        return False
+    if header.strip() == '*':
+        return True
+    candidates = [candidate.strip() for candidate in header.split(',')]
+    return any(candidate.removeprefix('W/') == etag for candidate in candidates)
+
+class StaticRequestHandler(SimpleHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+    timeout = 30
+    max_age = 3600
+
+    extensions_map = {
+        **SimpleHTTPRequestHandler.extensions_map,
+        '.txt': 'text/plain; charset=utf-8',
+        '.json': 'application/json; charset=utf-8',
+        '.js': 'text/javascript; charset=utf-8',
+        '.css': 'text/css; charset=utf-8',
+        '.html': 'text/html; charset=utf-8',
+    }
+
+    def do_GET(self):
+        self.serve_file(send_body=True)
+
+    def do_HEAD(self):
+        self.serve_file(send_body=False)
+
+    def resolve_file(self):
+        """Map the request path to a file, following directories to index.html"""
+        path = self.translate_path(self.path)
+        if os.path.isdir(path):
+            request_path = urlsplit(self.path).path
+            if not request_path.endswith('/'):
+                return None, request_path + '/'
+            path = os.path.join(path, 'index.html')
+        if not os.path.isfile(path):
+            return None, None
+        return path, None
+
+    def select_representation(self, path, source_stat):
+        """Pick a fresh precompressed sibling the client accepts, or the file itself"""
+        if 'Range' not in self.headers:
+            accepted = parse_accept_encoding(self.headers.get('Accept-Encoding'))
+            for encoding, suffix in PRECOMPRESSED_ENCODINGS:
+                if encoding not in accepted:
+                    continue
+                try:
+                    sibling_stat = os.stat(path + suffix)
+                except OSError:
+                    continue
+                if sibling_stat.st_mtime_ns == source_stat.st_mtime_ns:
+                    return path + suffix, encoding
+        return path, None
+
+    def cache_control(self, path):
+        if path.endswith(LONG_CACHE_SUFFIXES):
+            return f"public, max-age={self.max_age}"
+        return "no-cache"
+
+    def is_not_modified(self, etag, last_modified):
+        if_none_match = self.headers.get('If-None-Match')
+        if if_none_match is not None:
+            return etag_matches(if_none_match, etag)
+        if_modified_since = self.headers.get('If-Modified-Since')
+        if if_modified_since:
+            try:
+                since = email.utils.parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError, IndexError, OverflowError):
+                return False
+            return since.timestamp() >= int(last_modified)
+        return False
+
+    def range_allowed(self, etag, last_modified):
+        """Honour Range only if If-Range (when present) still matches"""
+        if_range = self.headers.get('If-Range')
+        if if_range is None:
+            return True
+        if_range = if_range.strip()
+        if if_range.startswith('"'):
+            return if_range == etag
+        try:
+            return email.utils.parsedate_to_datetime(if_range).timestamp() >= int(last_modified)
+        except (TypeError, ValueError, IndexError, OverflowError):
+            return False
+
+    def serve_file(self, send_body):
+        path, redirect = self.resolve_file()
+        if redirect:
+            self.send_response(HTTPStatus.MOVED_PERMANENTLY)
+            self.send_header('Location', redirect)
+            self.send_header('Content-Length', '0')
+            self.end_headers()
+            return
+        if path is None:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        try:
+            source_stat = os.stat(path)
+            served_path, encoding = self.select_representation(path, source_stat)
+            f = open(served_path, 'rb')
+        except OSError:
+            self.send_error(HTTPStatus.NOT_FOUND, "File not found")
+            return
+
+        with f:
+            stat_result = os.fstat(f.fileno())
+            size = stat_result.st_size
+            etag = make_etag(stat_result, encoding)
+            last_modified = source_stat.st_mtime
+
+            if self.is_not_modified(etag, last_modified):
+                self.send_response(HTTPStatus.NOT_MODIFIED)
+                self.send_common_headers(path, etag, last_modified)
+                self.end_headers()
+                return
+
+            start, end = 0, size - 1
+            status = HTTPStatus.OK
+            byte_range = None
+            if encoding is None and self.range_allowed(etag, last_modified):
+                byte_range = parse_range(self.headers.get('Range'), size)
+            if byte_range == 'unsatisfiable':
+                self.send_response(HTTPStatus.REQUESTED_RANGE_NOT_SATISFIABLE)
+                self.send_header('Content-Range', f"bytes */{size}")
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            if byte_range:
+                start, end = byte_range
+                status = HTTPStatus.PARTIAL_CONTENT
+
+            self.send_response(status)
+            self.send_common_headers(path, etag, last_modified)
+            self.send_header('Content-Type', self.guess_type(path))
+            if encoding:
+                self.send_header('Content-Encoding', encoding)
+            if status == HTTPStatus.PARTIAL_CONTENT:
+                self.send_header('Content-Range', f"bytes {start}-{end}/{size}")
+            self.send_header('Content-Length', str(end - start + 1 if size else 0))
+            self.end_headers()
+
+            if send_body and size:
+                self.send_file_body(f, start, end - start + 1)
+
+    def send_common_headers(self, path, etag, last_modified):
+        self.send_header('ETag', etag)
+        self.send_header('Last-Modified', email.utils.formatdate(last_modified, usegmt=True))
+        self.send_header('Cache-Control', self.cache_control(path))
+        self.send_header('Accept-Ranges', 'bytes')
+        self.send_header('Vary', 'Accept-Encoding')
+
+    def send_file_body(self, f, offset, count):
+        """Send count bytes from offset with sendfile(), falling back to copies where unsupported"""
+        self.wfile.flush()
+        try:
+            self.connection.sendfile(f, offset, count)
+        except (BrokenPipeError, ConnectionResetError):
+            self.close_connection = True
+
+class StaticServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024
+
+def main():
+    default_root = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), 'public')
+    parser = argparse.ArgumentParser(description='Serve the Bible web app with caching, ranges and precompressed files')
+    parser.add_argument('--root', default=default_root, help='Directory to serve (default: %(default)s)')
+    parser.add_argument('--bind', default='', help='Address to bind (default: all interfaces)')
+    parser.add_argument('--port', type=int, default=8001, help='Port (default: %(default)s)')
+    parser.add_argument('--max-age', type=int, default=3600, help='Cache-Control max-age for Bible TXT files and bundles (default: %(default)s)')
+    parser.add_argument('--quiet', '-q', action='store_true', help='Do not log requests')
+    args = parser.parse_args()
+
+    handler_class = type('Handler', (StaticRequestHandler,), {'max_age': args.max_age})
+    if args.quiet:
+        handler_class.log_message = lambda self, *a: None
+
+    server = StaticServer((args.bind, args.port), partial(handler_class, directory=args.root))
+    print(f"Serving {args.root} on http://{args.bind or 'localhost'}:{args.port}")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+if __name__ == '__main__':
+    main()